@@ -2,9 +2,11 @@
 // Purpose: Evaluate document classification using single API calls for entire documents
 
 require('dotenv').config();
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
+const { httpClient } = require('./httpClient');
+const { getExpectedClassification, getDirectoryListing, summarizeForBatch, tallyBatchResults } = require('./evaluationUtils');
 const Papa = require('papaparse');
 const readline = require('readline');
 const { processDocument } = require('./newMistral');
@@ -86,7 +88,9 @@ function loadValidationDataset() {
     groupedByDocument[filename].push({
       pageNumber: parseInt(row.page_number),
       category: row.category,
-      subcategory: row.subcategory
+      subcategory: row.subcategory,
+      // Labelled once here rather than for every page evaluated
+      expectedClassification: getExpectedClassification(row.category, row.subcategory)
     });
   });
   
@@ -104,14 +108,8 @@ function findDocumentDirectory() {
   process.exit(1);
 }
 
-// Helper function to classify all pages in a single API call
-async function classifyAllPagesWithPDF(pdfPath, pagesContent) {
-  // Read the PDF file and convert to base64
-  const pdfData = fs.readFileSync(pdfPath);
-  const pdfBase64 = pdfData.toString('base64');
-  
-  // Construct the prompt with all pages
-  let promptText = `You are an expert maritime document analyst specialized in classifying pages from Cargo Documents for Port Operations. Your task is to analyze multiple pages from a maritime document and categorize each page accurately into one of three categories: "AGENT_SOF", "MASTER_SOF", or "OTHER".
+// Fixed parts of the whole-document classification prompt; only the page sections vary per call
+const CLASSIFICATION_PROMPT_HEADER = `You are an expert maritime document analyst specialized in classifying pages from Cargo Documents for Port Operations. Your task is to analyze multiple pages from a maritime document and categorize each page accurately into one of three categories: "AGENT_SOF", "MASTER_SOF", or "OTHER".
 
 I am providing you with:
 1. The OCR-extracted text for each page (which may be incomplete)
@@ -163,13 +161,7 @@ Below are the OCR-extracted texts for each page. For each page, provide your cla
 
 `;
 
-  // Add each page's content to the prompt
-  pagesContent.forEach((content, index) => {
-    promptText += `\n----- PAGE ${index + 1} -----\n`;
-    promptText += `<ocr_text>\n${content}\n</ocr_text>\n`;
-  });
-
-  promptText += `\nFor each page, provide a classification of AGENT_SOF, MASTER_SOF, or OTHER.
+const CLASSIFICATION_PROMPT_FOOTER = `\nFor each page, provide a classification of AGENT_SOF, MASTER_SOF, or OTHER.
 Use the following format for your response:
 PAGE 1: [Scratchpad Reasoning] - [CLASSIFICATION]
 PAGE 2: [Scratchpad Reasoning] - [CLASSIFICATION]
@@ -177,127 +169,317 @@ PAGE 2: [Scratchpad Reasoning] - [CLASSIFICATION]
 
 Examine each page individually and make your decision based on the characteristics described above. Take your time to analyze each page thoroughly before providing your classification.  The [Reasoning] component should include a short explanation of your reasoning for the classification extracted from scratchpad thinking you applied to the document.`;
 
+// One "PAGE X: [any reasoning text] - [CLASSIFICATION]" line of the response: reasoning
+// first, then the classification after the last dash. Compiled once at load.
+const PAGE_CLASSIFICATION_REGEX = /PAGE\s+(\d+)\s*:\s*(.*?)\s*-\s*(AGENT_SOF|MASTER_SOF|OTHER)\s*$/gmi;
+
+// Loose "page N ... - CATEGORY" mention, used when a page is missing from the
+// strict per-line format. The lookahead keeps a match from swallowing a later
+// page's mention on the same line.
+const PAGE_MENTION_REGEX = /page\s*(\d+)(?=\s*[:\-]?\s*(.*?)\s*-\s*(agent_sof|master_sof|other))/gi;
+
+// Anthropic Message Batches polling: start at 5s, back off to at most a minute
+const BATCH_POLL_INITIAL_MS = 5000;
+const BATCH_POLL_MAX_MS = 60000;
+
+const ANTHROPIC_HEADERS = {
+  'Content-Type': 'application/json',
+  'anthropic-version': '2023-06-01',
+  'x-api-key': ANTHROPIC_API_KEY
+};
+
+// Classification responses cached on disk by request content (PDF, prompt, model),
+// so re-running an unchanged document skips the API. Set CLASSIFICATION_CACHE=0 to disable.
+const CLASSIFICATION_CACHE_DIR = path.join(__dirname, 'cache', 'classification');
+const CLASSIFICATION_CACHE_ENABLED = process.env.CLASSIFICATION_CACHE !== '0';
+
+// Hash everything in a classification request that affects the response
+function classificationCacheKey(request) {
+  const hash = crypto.createHash('sha256');
+  hash.update(`${request.model}\0${request.max_tokens}\0${request.system}\0`);
+  for (const block of request.messages[0].content) {
+    hash.update(block.type === 'document' ? block.source.data : block.text);
+    hash.update('\0');
+  }
+  return hash.digest('hex');
+}
+
+// Helper function to read a cached response text, or null on a miss
+function readCachedResponse(cacheKey) {
+  if (!CLASSIFICATION_CACHE_ENABLED) {
+    return null;
+  }
+  try {
+    const cached = JSON.parse(fs.readFileSync(path.join(CLASSIFICATION_CACHE_DIR, `${cacheKey}.json`), 'utf8'));
+    return cached.responseText;
+  } catch (error) {
+    return null;
+  }
+}
+
+// Helper function to store a response text in the cache
+function writeCachedResponse(cacheKey, responseText) {
+  if (!CLASSIFICATION_CACHE_ENABLED) {
+    return;
+  }
   try {
-    console.log(`Making a single API call to classify all ${pagesContent.length} pages...`);
-    
-    // Create a message structure with both text and PDF
-    const messages = [
-      {
-        role: 'user',
-        content: [
-          {
-            type: 'document',
-            source: {
-              type: 'base64',
-              media_type: 'application/pdf',
-              data: pdfBase64
-            }
-          },
-          {
-            type: 'text',
-            text: promptText
+    fs.mkdirSync(CLASSIFICATION_CACHE_DIR, { recursive: true });
+    fs.writeFileSync(path.join(CLASSIFICATION_CACHE_DIR, `${cacheKey}.json`), JSON.stringify({ responseText }));
+  } catch (error) {
+    console.warn(`Could not cache classification response: ${error.message}`);
+  }
+}
+
+// Only complete answers are cached: a response cut off at max_tokens or with pages
+// left unclassified would otherwise be replayed on every later run
+function isCacheableClassification(message, pageClassifications) {
+  return message.stop_reason === 'end_turn'
+    && pageClassifications.every(page => page.classification !== 'UNKNOWN');
+}
+
+// Build the Messages API request that classifies all pages of a document at once
+function buildClassificationRequest(pdfPath, pagesContent) {
+  // Read the PDF file and convert to base64
+  const pdfData = fs.readFileSync(pdfPath);
+  const pdfBase64 = pdfData.toString('base64');
+  
+  // Construct the prompt from the fixed instructions and one section per page
+  const promptText = [
+    CLASSIFICATION_PROMPT_HEADER,
+    ...pagesContent.map((content, index) =>
+      `\n----- PAGE ${index + 1} -----\n<ocr_text>\n${content}\n</ocr_text>\n`
+    ),
+    CLASSIFICATION_PROMPT_FOOTER
+  ].join('');
+
+  // Create a message structure with both text and PDF
+  const messages = [
+    {
+      role: 'user',
+      content: [
+        {
+          type: 'document',
+          source: {
+            type: 'base64',
+            media_type: 'application/pdf',
+            data: pdfBase64
           }
-        ]
-      }
-    ];
+        },
+        {
+          type: 'text',
+          text: promptText
+        }
+      ]
+    }
+  ];
+
+  return {
+    model: 'claude-3-7-sonnet-20250219',
+    system: '',
+    messages: messages,
+    max_tokens: 4000 // Increased for longer responses with multiple pages
+  };
+}
 
-    const response = await axios.post(
-      'https://api.anthropic.com/v1/messages',
-      {
-        model: 'claude-3-7-sonnet-20250219',
-        system: '',
-        messages: messages,
-        max_tokens: 4000 // Increased for longer responses with multiple pages
-      },
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'anthropic-version': '2023-06-01',
-          'x-api-key': ANTHROPIC_API_KEY
+// Parse the model's response into one classification per page
+function parsePageClassifications(fullResponseText, pageCount) {
+  const pageClassifications = [];
+  
+  for (const match of fullResponseText.matchAll(PAGE_CLASSIFICATION_REGEX)) {
+    const pageNumber = parseInt(match[1]);
+    const reasoning = match[2] ? match[2].trim() : '';
+    const classification = match[3].toUpperCase();
+    
+    pageClassifications.push({
+      pageNumber,
+      classification,
+      reasoning
+    });
+  }
+  
+  // Sort results by page number
+  pageClassifications.sort((a, b) => a.pageNumber - b.pageNumber);
+  
+  // Check if we have all pages classified
+  if (pageClassifications.length < pageCount) {
+    console.warn(`Warning: Only found classifications for ${pageClassifications.length} pages out of ${pageCount}`);
+    
+    // Fill in missing pages by scanning the response more broadly, indexing the
+    // first mention of each page number in a single pass
+    const classifiedPageNumbers = new Set(pageClassifications.map(p => p.pageNumber));
+    const pageMentions = new Map();
+    for (const mention of fullResponseText.matchAll(PAGE_MENTION_REGEX)) {
+      const mentionedPage = parseInt(mention[1]);
+      if (!pageMentions.has(mentionedPage)) {
+        pageMentions.set(mentionedPage, mention);
+      }
+    }
+    
+    for (let i = 1; i <= pageCount; i++) {
+      if (!classifiedPageNumbers.has(i)) {
+        // Try to find mentions of this page elsewhere in the response
+        const altMatch = pageMentions.get(i);
+        
+        if (altMatch) {
+          pageClassifications.push({
+            pageNumber: i,
+            classification: altMatch[3].toUpperCase(),
+            reasoning: altMatch[2] ? altMatch[2].trim() : 'Extracted from general text'
+          });
+        } else {
+          // Last resort: add a placeholder
+          pageClassifications.push({
+            pageNumber: i,
+            classification: 'UNKNOWN',
+            reasoning: 'Classification not found in response'
+          });
         }
       }
+    }
+    
+    // Resort after adding missing pages
+    pageClassifications.sort((a, b) => a.pageNumber - b.pageNumber);
+  }
+  
+  return pageClassifications;
+}
+
+// Helper function to classify all pages in a single API call
+async function classifyAllPagesWithPDF(pdfPath, pagesContent) {
+  try {
+    const request = buildClassificationRequest(pdfPath, pagesContent);
+    const cacheKey = classificationCacheKey(request);
+    
+    const cachedResponseText = readCachedResponse(cacheKey);
+    if (cachedResponseText !== null) {
+      console.log(`Using cached classification for all ${pagesContent.length} pages`);
+      return parsePageClassifications(cachedResponseText, pagesContent.length);
+    }
+    
+    console.log(`Making a single API call to classify all ${pagesContent.length} pages...`);
+    
+    const response = await httpClient.post(
+      'https://api.anthropic.com/v1/messages',
+      request,
+      { headers: ANTHROPIC_HEADERS }
     );
     
     // Extract the full response text
     const fullResponseText = response.data.content[0].text.trim();
+    const pageClassifications = parsePageClassifications(fullResponseText, pagesContent.length);
+    if (isCacheableClassification(response.data, pageClassifications)) {
+      writeCachedResponse(cacheKey, fullResponseText);
+    }
     
-    // Parse the response to extract classifications for each page
-    const pageClassifications = [];
-    
-    // Updated regex to capture reasoning first, then classification after the last dash
-    // This matches "PAGE X: [any reasoning text] - [CLASSIFICATION]" format
-    const pageRegex = /PAGE\s+(\d+)\s*:\s*(.*?)\s*-\s*(AGENT_SOF|MASTER_SOF|OTHER)\s*$/gmi;
+    return pageClassifications;
+  } catch (error) {
+    console.error('Error classifying pages with Anthropic:', error.message);
+    if (error.response) {
+      console.error('API response:', error.response.data);
+    }
+    return null;
+  }
+}
+
+// Classify several documents through the Anthropic Message Batches API: one
+// submission for the whole run, billed at the discounted batch rate and not
+// subject to the per-minute limits of individual calls. Resolves to a Map from
+// each document's customId to its page classifications (or null on failure).
+async function classifyDocumentsWithMessageBatch(documents) {
+  const classificationsById = new Map(documents.map(doc => [doc.customId, null]));
+  const pageCountById = new Map(documents.map(doc => [doc.customId, doc.pagesContent.length]));
+  const cacheKeyById = new Map();
+  const requests = [];
+  
+  // Answer what we can from the response cache and batch only the rest
+  for (const doc of documents) {
+    const params = buildClassificationRequest(doc.documentPath, doc.pagesContent);
+    const cacheKey = classificationCacheKey(params);
+    const cachedResponseText = readCachedResponse(cacheKey);
+    
+    if (cachedResponseText !== null) {
+      classificationsById.set(doc.customId, parsePageClassifications(cachedResponseText, doc.pagesContent.length));
+    } else {
+      cacheKeyById.set(doc.customId, cacheKey);
+      requests.push({ custom_id: doc.customId, params });
+    }
+  }
+  
+  if (requests.length < documents.length) {
+    console.log(`\n♻️ Using cached classifications for ${documents.length - requests.length} documents`);
+  }
+  if (requests.length === 0) {
+    return classificationsById;
+  }
+  
+  try {
+    console.log(`\n📦 Submitting ${requests.length} documents as one message batch...`);
+    const createResponse = await httpClient.post(
+      'https://api.anthropic.com/v1/messages/batches',
+      { requests },
+      { headers: ANTHROPIC_HEADERS }
+    );
     
-    let match;
-    while ((match = pageRegex.exec(fullResponseText)) !== null) {
-      const pageNumber = parseInt(match[1]);
-      const reasoning = match[2] ? match[2].trim() : '';
-      const classification = match[3].toUpperCase();
+    // Poll until every request in the batch has finished
+    let batch = createResponse.data;
+    let pollDelayMs = BATCH_POLL_INITIAL_MS;
+    while (batch.processing_status !== 'ended') {
+      console.log(`⏳ Batch ${batch.id} is ${batch.processing_status}, checking again in ${pollDelayMs / 1000}s...`);
+      await new Promise(resolve => setTimeout(resolve, pollDelayMs));
+      pollDelayMs = Math.min(pollDelayMs * 2, BATCH_POLL_MAX_MS);
       
-      pageClassifications.push({
-        pageNumber,
-        classification,
-        reasoning
-      });
+      const statusResponse = await httpClient.get(
+        `https://api.anthropic.com/v1/messages/batches/${batch.id}`,
+        { headers: ANTHROPIC_HEADERS }
+      );
+      batch = statusResponse.data;
     }
     
-    // Sort results by page number
-    pageClassifications.sort((a, b) => a.pageNumber - b.pageNumber);
+    // Results come back as JSON Lines, one line per request, in any order
+    const resultsResponse = await httpClient.get(batch.results_url, {
+      headers: ANTHROPIC_HEADERS,
+      responseType: 'text'
+    });
     
-    // Check if we have all pages classified
-    if (pageClassifications.length < pagesContent.length) {
-      console.warn(`Warning: Only found classifications for ${pageClassifications.length} pages out of ${pagesContent.length}`);
+    for (const line of resultsResponse.data.split('\n')) {
+      if (!line.trim()) {
+        continue;
+      }
       
-      // Fill in missing pages by scanning the response more broadly
-      for (let i = 1; i <= pagesContent.length; i++) {
-        if (!pageClassifications.some(p => p.pageNumber === i)) {
-          // Try to find mentions of this page elsewhere in the response
-          const altPageRegex = new RegExp(`page\\s*${i}\\s*[:\\-]?\\s*(.*?)\\s*-\\s*(agent_sof|master_sof|other)`, 'i');
-          const altMatch = fullResponseText.match(altPageRegex);
-          
-          if (altMatch) {
-            pageClassifications.push({
-              pageNumber: i,
-              classification: altMatch[2].toUpperCase(),
-              reasoning: altMatch[1] ? altMatch[1].trim() : 'Extracted from general text'
-            });
-          } else {
-            // Last resort: add a placeholder
-            pageClassifications.push({
-              pageNumber: i,
-              classification: 'UNKNOWN',
-              reasoning: 'Classification not found in response'
-            });
-          }
-        }
+      const { custom_id: customId, result } = JSON.parse(line);
+      if (result.type !== 'succeeded') {
+        console.error(`❌ Batch request ${customId} ${result.type}:`, result.error || '');
+        continue;
       }
       
-      // Resort after adding missing pages
-      pageClassifications.sort((a, b) => a.pageNumber - b.pageNumber);
+      const fullResponseText = result.message.content[0].text.trim();
+      const pageClassifications = parsePageClassifications(fullResponseText, pageCountById.get(customId));
+      if (isCacheableClassification(result.message, pageClassifications)) {
+        writeCachedResponse(cacheKeyById.get(customId), fullResponseText);
+      }
+      classificationsById.set(customId, pageClassifications);
     }
-    
-    return pageClassifications;
   } catch (error) {
-    console.error('Error classifying pages with Anthropic:', error.message);
+    console.error('Error classifying documents with the message batch API:', error.message);
     if (error.response) {
       console.error('API response:', error.response.data);
     }
-    return null;
   }
+  
+  return classificationsById;
 }
 
 // Find a document in the Agent&MasterSOFs directory that best matches the filename
 function findBestMatchingDocument(filename, documentDir) {
-  const allFiles = fs.readdirSync(documentDir);
+  const { files: allFiles, fileSet, byLowerName } = getDirectoryListing(documentDir);
   
   // Try exact match first
-  if (allFiles.includes(filename)) {
+  if (fileSet.has(filename)) {
     return path.join(documentDir, filename);
   }
   
   // Try case-insensitive match
-  const lowerFilename = filename.toLowerCase();
-  const caseInsensitiveMatch = allFiles.find(f => f.toLowerCase() === lowerFilename);
+  const caseInsensitiveMatch = byLowerName.get(filename.toLowerCase());
   if (caseInsensitiveMatch) {
     return path.join(documentDir, caseInsensitiveMatch);
   }
@@ -359,174 +541,196 @@ function findBestMatchingDocument(filename, documentDir) {
   return null;
 }
 
-// Main function to evaluate a document
-async function evaluateDocument(documentFilename, documentDir, validationDataset) {
-  try {
-    console.log(`\n📄 Processing document: ${documentFilename}`);
+// Locate a document and run it through Mistral OCR
+async function prepareDocument(documentFilename, documentDir) {
+  console.log(`\n📄 Processing document: ${documentFilename}`);
+  
+  // Find the actual file that best matches this filename
+  const documentPath = findBestMatchingDocument(documentFilename, documentDir);
+  
+  if (!documentPath) {
+    console.error(`❌ Error: Could not find a matching file for ${documentFilename}`);
+    return null;
+  }
+  
+  console.log(`Found matching document: ${path.basename(documentPath)}`);
+  
+  // Process document with Mistral OCR - SINGLE API CALL
+  console.log('🤖 Processing document with Mistral OCR...');
+  const ocrResult = await processDocument(documentPath);
+  
+  if (!ocrResult.success) {
+    console.error('❌ Error processing document with Mistral OCR:', ocrResult.error);
+    return null;
+  }
+  
+  // Parse OCR results to get pages
+  const ocrResponsePath = path.join(ocrResult.outputFolder, 'full_response.json');
+  const ocrResponse = JSON.parse(fs.readFileSync(ocrResponsePath, 'utf8'));
+  
+  // Prepare array of page contents
+  const pagesContent = ocrResponse.pages.map(page => page.markdown || '');
+  
+  return { documentPath, pagesContent };
+}
+
+// Compare a document's page classifications with the validation dataset and save its report
+async function scoreDocument(documentFilename, documentPath, pagesContent, allPageClassifications, validationDataset) {
+  const expectedPages = validationDataset[documentFilename];
+  
+  // Process results
+  const results = [];
+  let totalPages = 0;
+  let correctPages = 0;
+  let totalSOFPages = 0;
+  let correctSOFPages = 0;
+  
+  // Index expected pages and batch results by page number once per document
+  const expectedByPage = new Map(expectedPages.map(p => [p.pageNumber, p]));
+  const classificationByPage = new Map(allPageClassifications.map(p => [p.pageNumber, p]));
+  
+  for (let i = 0; i < pagesContent.length; i++) {
+    const pageNumber = i + 1; // Convert to 1-indexed
     
-    // Find the actual file that best matches this filename
-    const documentPath = findBestMatchingDocument(documentFilename, documentDir);
+    // Find expected classification
+    const expectedPageData = expectedByPage.get(pageNumber);
     
-    if (!documentPath) {
-      console.error(`❌ Error: Could not find a matching file for ${documentFilename}`);
-      return null;
+    if (!expectedPageData) {
+      console.warn(`⚠️ Page ${pageNumber} not found in validation dataset. Skipping.`);
+      continue;
     }
     
-    console.log(`Found matching document: ${path.basename(documentPath)}`);
-    const expectedPages = validationDataset[documentFilename];
+    totalPages++;
     
-    // Process document with Mistral OCR - SINGLE API CALL
-    console.log('🤖 Processing document with Mistral OCR...');
-    const ocrResult = await processDocument(documentPath);
+    // Expected classification
+    const { expectedClassification } = expectedPageData;
+    if (expectedClassification !== 'OTHER') {
+      totalSOFPages++;
+    }
     
-    if (!ocrResult.success) {
-      console.error('❌ Error processing document with Mistral OCR:', ocrResult.error);
-      return null;
+    // Find this page's classification from the batch results
+    const pageClassification = classificationByPage.get(pageNumber);
+    let actualClassification = 'UNKNOWN';
+    let reasoning = 'Not processed';
+    
+    if (pageClassification) {
+      actualClassification = pageClassification.classification;
+      reasoning = pageClassification.reasoning || '';
     }
     
-    // Parse OCR results to get pages
-    const ocrResponsePath = path.join(ocrResult.outputFolder, 'full_response.json');
-    const ocrResponse = JSON.parse(fs.readFileSync(ocrResponsePath, 'utf8'));
+    // Check if classification is correct - normalize strings for comparison
+    const normalizedActual = actualClassification.trim().toUpperCase();
+    const isCorrect = normalizedActual === expectedClassification;
+    
+    if (isCorrect) {
+      correctPages++;
+      if (expectedClassification !== 'OTHER') {
+        correctSOFPages++;
+      }
+    }
     
-    // Prepare array of page contents
-    const pagesContent = ocrResponse.pages.map(page => page.markdown || '');
+    results.push({
+      pageNumber,
+      expectedClassification,
+      actualClassification,
+      reasoning,
+      isCorrect,
+      category: expectedPageData.category,
+      subcategory: expectedPageData.subcategory
+    });
     
+    // Log individual result
+    console.log(`    ${isCorrect ? '✅' : '❌'} Page ${pageNumber} - Expected: ${expectedClassification}, Got: ${actualClassification}`);
+    
+    // Add the reasoning
+    if (reasoning) {
+      console.log(`    📝 Reasoning: ${reasoning}`);
+    }
+  }
+  
+  // Calculate accuracy metrics
+  const overallAccuracy = totalPages > 0 ? (correctPages / totalPages) * 100 : 0;
+  const sofAccuracy = totalSOFPages > 0 ? (correctSOFPages / totalSOFPages) * 100 : 0;
+  
+  // Generate results summary
+  const summary = {
+    document: documentFilename,
+    documentPath: documentPath,
+    totalPages,
+    correctPages,
+    totalSOFPages,
+    correctSOFPages,
+    overallAccuracy: overallAccuracy.toFixed(2),
+    sofAccuracy: sofAccuracy.toFixed(2),
+    results
+  };
+  
+  // Save results to output folder
+  const resultsOutputFolder = path.join(__dirname, 'results');
+  fs.mkdirSync(resultsOutputFolder, { recursive: true });
+  
+  const resultTimestamp = new Date().toISOString().replace(/[:.]/g, '-');
+  const resultFilename = `${resultTimestamp}_batch_evaluation_pdf_${path.basename(documentPath).replace(/[^a-zA-Z0-9]/g, '_')}.json`;
+  const resultPath = path.join(resultsOutputFolder, resultFilename);
+  
+  // The report files are written in the background while the results are printed
+  const resultWrite = fs.promises.writeFile(resultPath, JSON.stringify(summary, null, 2));
+  
+  // Generate markdown report
+  const markdownReport = generateMarkdownReport(summary);
+  const markdownPath = path.join(resultsOutputFolder, resultFilename.replace('.json', '.md'));
+  const markdownWrite = fs.promises.writeFile(markdownPath, markdownReport);
+  
+  // Output summary to console, followed by the detailed results table, in a single write
+  const summaryLines = [
+    '\n📊 Document Evaluation Results (Batch PDF + OCR):',
+    `  - Document: ${documentFilename}`,
+    `  - File: ${path.basename(documentPath)}`,
+    `  - Pages Processed: ${totalPages}`,
+    `  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`,
+    `  - SOF Pages Detected: ${totalSOFPages}`,
+    `  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+    `  - Report saved to: ${markdownPath}`,
+  ];
+  
+  // Detailed results table with reasoning
+  summaryLines.push('\n📑 Detailed Results:', '| Page | Expected | Actual | Correct | Reasoning |', '|------|----------|--------|---------|-----------|');
+  for (const r of results) {
+    summaryLines.push(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
+  }
+  process.stdout.write(summaryLines.join('\n') + '\n');
+  
+  await Promise.all([resultWrite, markdownWrite]);
+  return summary;
+}
+
+// Classify and score a document that has already been through OCR
+async function evaluatePreparedDocument(documentFilename, prepared, validationDataset) {
+  try {
     // Classify all pages in a SINGLE API CALL
     console.log('🧠 Classifying all pages with Anthropic API (using PDF+Text) in a single call...');
-    const allPageClassifications = await classifyAllPagesWithPDF(documentPath, pagesContent);
+    const allPageClassifications = await classifyAllPagesWithPDF(prepared.documentPath, prepared.pagesContent);
     
     if (!allPageClassifications) {
       console.error('❌ Error classifying pages');
       return null;
     }
     
-    // Process results
-    const results = [];
-    let totalPages = 0;
-    let correctPages = 0;
-    let totalSOFPages = 0;
-    let correctSOFPages = 0;
-    
-    for (let i = 0; i < pagesContent.length; i++) {
-      const pageNumber = i + 1; // Convert to 1-indexed
-      
-      // Find expected classification
-      const expectedPageData = expectedPages.find(p => p.pageNumber === pageNumber);
-      
-      if (!expectedPageData) {
-        console.warn(`⚠️ Page ${pageNumber} not found in validation dataset. Skipping.`);
-        continue;
-      }
-      
-      totalPages++;
-      
-      // Expected classification
-      let expectedClassification = 'OTHER';
-      if (expectedPageData.category.toLowerCase().includes('agent') && 
-          (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-           expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'AGENT_SOF';
-        totalSOFPages++;
-      } else if ((expectedPageData.category.toLowerCase().includes('master') || 
-                 expectedPageData.category.toLowerCase().includes('ship')) && 
-                (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-                 expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'MASTER_SOF';
-        totalSOFPages++;
-      }
-      
-      // Find this page's classification from the batch results
-      const pageClassification = allPageClassifications.find(p => p.pageNumber === pageNumber);
-      let actualClassification = 'UNKNOWN';
-      let reasoning = 'Not processed';
-      
-      if (pageClassification) {
-        actualClassification = pageClassification.classification;
-        reasoning = pageClassification.reasoning || '';
-      }
-      
-      // Check if classification is correct - normalize strings for comparison
-      const normalizedActual = actualClassification.trim().toUpperCase();
-      const normalizedExpected = expectedClassification.trim().toUpperCase();
-      const isCorrect = normalizedActual === normalizedExpected;
-      
-      if (isCorrect) {
-        correctPages++;
-        if (expectedClassification !== 'OTHER') {
-          correctSOFPages++;
-        }
-      }
-      
-      results.push({
-        pageNumber,
-        expectedClassification,
-        actualClassification,
-        reasoning,
-        isCorrect,
-        category: expectedPageData.category,
-        subcategory: expectedPageData.subcategory
-      });
-      
-      // Log individual result
-      console.log(`    ${isCorrect ? '✅' : '❌'} Page ${pageNumber} - Expected: ${expectedClassification}, Got: ${actualClassification}`);
-      
-      // Add the reasoning
-      if (reasoning) {
-        console.log(`    📝 Reasoning: ${reasoning}`);
-      }
+    return await scoreDocument(documentFilename, prepared.documentPath, prepared.pagesContent, allPageClassifications, validationDataset);
+  } catch (error) {
+    console.error('Error during evaluation:', error);
+    return null;
+  }
+}
+
+// Main function to evaluate a document
+async function evaluateDocument(documentFilename, documentDir, validationDataset) {
+  try {
+    const prepared = await prepareDocument(documentFilename, documentDir);
+    if (!prepared) {
+      return null;
     }
-    
-    // Calculate accuracy metrics
-    const overallAccuracy = totalPages > 0 ? (correctPages / totalPages) * 100 : 0;
-    const sofAccuracy = totalSOFPages > 0 ? (correctSOFPages / totalSOFPages) * 100 : 0;
-    
-    // Generate results summary
-    const summary = {
-      document: documentFilename,
-      documentPath: documentPath,
-      totalPages,
-      correctPages,
-      totalSOFPages,
-      correctSOFPages,
-      overallAccuracy: overallAccuracy.toFixed(2),
-      sofAccuracy: sofAccuracy.toFixed(2),
-      results
-    };
-    
-    // Save results to output folder
-    const resultsOutputFolder = path.join(__dirname, 'results');
-    fs.mkdirSync(resultsOutputFolder, { recursive: true });
-    
-    const resultTimestamp = new Date().toISOString().replace(/[:.]/g, '-');
-    const resultFilename = `${resultTimestamp}_batch_evaluation_pdf_${path.basename(documentPath).replace(/[^a-zA-Z0-9]/g, '_')}.json`;
-    const resultPath = path.join(resultsOutputFolder, resultFilename);
-    
-    fs.writeFileSync(resultPath, JSON.stringify(summary, null, 2));
-    
-    // Generate markdown report
-    const markdownReport = generateMarkdownReport(summary);
-    const markdownPath = path.join(resultsOutputFolder, resultFilename.replace('.json', '.md'));
-    fs.writeFileSync(markdownPath, markdownReport);
-    
-    // Output summary to console
-    console.log('\n📊 Document Evaluation Results (Batch PDF + OCR):');
-    console.log(`  - Document: ${documentFilename}`);
-    console.log(`  - File: ${path.basename(documentPath)}`);
-    console.log(`  - Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`  - Report saved to: ${markdownPath}`);
-    
-    // Generate detailed results table with reasoning
-    console.log('\n📑 Detailed Results:');
-    console.log('| Page | Expected | Actual | Correct | Reasoning |');
-    console.log('|------|----------|--------|---------|-----------|');
-    results.forEach(r => {
-      console.log(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
-    });
-    
-    return summary;
+    return evaluatePreparedDocument(documentFilename, prepared, validationDataset);
   } catch (error) {
     console.error('Error during evaluation:', error);
     return null;
@@ -563,21 +767,8 @@ For Statement of Facts (SOF) pages specifically, it correctly identified ${summa
 }
 
 // Generate markdown report for batch evaluation
-function generateBatchReport(results, timestamp) {
-  let totalPages = 0;
-  let totalCorrectPages = 0;
-  let totalSOFPages = 0;
-  let totalCorrectSOFPages = 0;
-  
-  // Aggregate results
-  results.forEach(doc => {
-    if (doc) {
-      totalPages += doc.totalPages;
-      totalCorrectPages += doc.correctPages;
-      totalSOFPages += doc.totalSOFPages;
-      totalCorrectSOFPages += doc.correctSOFPages;
-    }
-  });
+function generateBatchReport(results, timestamp, totals) {
+  const { successfulDocs, failedDocs, totalPages, totalCorrectPages, totalSOFPages, totalCorrectSOFPages } = totals;
   
   // Calculate overall metrics
   const overallAccuracy = totalPages > 0 ? (totalCorrectPages / totalPages) * 100 : 0;
@@ -586,8 +777,8 @@ function generateBatchReport(results, timestamp) {
   const report = `# Batch Document Classification Evaluation Report (PDF + OCR Text)
 
 ## Overview
-- **Total Documents Processed:** ${results.filter(r => r !== null).length}
-- **Total Documents Failed:** ${results.filter(r => r === null).length}
+- **Total Documents Processed:** ${successfulDocs}
+- **Total Documents Failed:** ${failedDocs}
 - **Total Pages Processed:** ${totalPages}
 - **Evaluation Date:** ${new Date().toISOString().split('T')[0]}
 - **Method:** Batch PDF Direct + OCR Text (Single API Call per Document)
@@ -657,55 +848,96 @@ async function runBatchEvaluation() {
     
     // Process each document
     const batchResults = [];
-    const batchStartTime = Date.now();
+    const batchStartTime = process.hrtime.bigint();
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
     
-    for (let i = 0; i < selectedDocuments.length; i++) {
-      console.log(`\n📄 Processing document ${i + 1}/${numDocs}: ${selectedDocuments[i]}`);
-      const docResult = await evaluateDocument(selectedDocuments[i], documentDir, validationDataset);
-      batchResults.push(docResult);
+    if (process.env.USE_BATCH === '1') {
+      // OCR every document first, then classify them all in one message batch
+      const preparedDocuments = [];
+      for (let i = 0; i < selectedDocuments.length; i++) {
+        console.log(`\n📄 Preparing document ${i + 1}/${numDocs}: ${selectedDocuments[i]}`);
+        try {
+          const prepared = await prepareDocument(selectedDocuments[i], documentDir);
+          if (prepared) {
+            preparedDocuments.push({ customId: `doc-${i}`, documentFilename: selectedDocuments[i], ...prepared });
+          }
+        } catch (error) {
+          console.error('Error during evaluation:', error);
+        }
+      }
+      
+      const classificationsById = preparedDocuments.length > 0
+        ? await classifyDocumentsWithMessageBatch(preparedDocuments)
+        : new Map();
+      
+      const preparedByFilename = new Map(preparedDocuments.map(doc => [doc.documentFilename, doc]));
+      for (const documentFilename of selectedDocuments) {
+        const prepared = preparedByFilename.get(documentFilename);
+        const allPageClassifications = prepared && classificationsById.get(prepared.customId);
+        let docResult = null;
+        
+        if (allPageClassifications) {
+          try {
+            docResult = await scoreDocument(documentFilename, prepared.documentPath, prepared.pagesContent, allPageClassifications, validationDataset);
+          } catch (error) {
+            console.error('Error during evaluation:', error);
+          }
+        } else if (prepared) {
+          console.error(`❌ Error classifying pages for ${documentFilename}`);
+        }
+        batchResults.push(summarizeForBatch(docResult));
+      }
+    } else {
+      // Pipeline the two stages: while one document is being classified, the next
+      // one is already going through OCR (at most one document ahead)
+      const startPreparing = i => prepareDocument(selectedDocuments[i], documentDir).catch(error => {
+        console.error('Error during evaluation:', error);
+        return null;
+      });
+      
+      let nextPrepared = startPreparing(0);
+      for (let i = 0; i < selectedDocuments.length; i++) {
+        const prepared = await nextPrepared;
+        nextPrepared = i + 1 < selectedDocuments.length ? startPreparing(i + 1) : null;
+        
+        console.log(`\n📄 Processing document ${i + 1}/${numDocs}: ${selectedDocuments[i]}`);
+        const docResult = prepared
+          ? await evaluatePreparedDocument(selectedDocuments[i], prepared, validationDataset)
+          : null;
+        batchResults.push(summarizeForBatch(docResult));
+      }
     }
     
     // Calculate batch processing time
-    const batchEndTime = Date.now();
-    const processingTimeInMinutes = ((batchEndTime - batchStartTime) / 1000 / 60).toFixed(2);
+    const batchElapsedNs = process.hrtime.bigint() - batchStartTime;
+    const processingTimeInMinutes = (Number(batchElapsedNs) / 1e9 / 60).toFixed(2);
     
     // Generate and save batch report
     console.log('\n📊 Generating batch evaluation report...');
-    const batchReport = generateBatchReport(batchResults, timestamp);
+    const batchTotals = tallyBatchResults(batchResults);
+    const batchReport = generateBatchReport(batchResults, timestamp, batchTotals);
     const resultsOutputFolder = path.join(__dirname, 'results');
     const batchReportPath = path.join(resultsOutputFolder, `${timestamp}_batch_evaluation_report.md`);
     fs.writeFileSync(batchReportPath, batchReport);
     
     // Calculate aggregate metrics
-    let totalPages = 0;
-    let totalCorrectPages = 0;
-    let totalSOFPages = 0;
-    let totalCorrectSOFPages = 0;
-    let successfulDocs = 0;
-    
-    batchResults.forEach(doc => {
-      if (doc) {
-        successfulDocs++;
-        totalPages += doc.totalPages;
-        totalCorrectPages += doc.correctPages;
-        totalSOFPages += doc.totalSOFPages;
-        totalCorrectSOFPages += doc.correctSOFPages;
-      }
-    });
+    const { successfulDocs, totalPages, totalCorrectPages, totalSOFPages, totalCorrectSOFPages } = batchTotals;
     
     const overallAccuracy = totalPages > 0 ? (totalCorrectPages / totalPages) * 100 : 0;
     const sofAccuracy = totalSOFPages > 0 ? (totalCorrectSOFPages / totalSOFPages) * 100 : 0;
     
-    // Print summary to console
-    console.log('\n📈 Batch Evaluation Results (Batch PDF + OCR):');
-    console.log(`  - Documents Processed: ${successfulDocs}/${numDocs}`);
-    console.log(`  - Total Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${totalCorrectPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${totalCorrectSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`  - Processing Time: ${processingTimeInMinutes} minutes`);
-    console.log(`\n📝 Batch report saved to: ${batchReportPath}`);
+    // Print summary to console in a single write
+    const lines = [
+      '\n📈 Batch Evaluation Results (Batch PDF + OCR):',
+      `  - Documents Processed: ${successfulDocs}/${numDocs}`,
+      `  - Total Pages Processed: ${totalPages}`,
+      `  - Correctly Classified Pages: ${totalCorrectPages} (${overallAccuracy.toFixed(2)}%)`,
+      `  - SOF Pages Detected: ${totalSOFPages}`,
+      `  - Correctly Classified SOF Pages: ${totalCorrectSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+      `  - Processing Time: ${processingTimeInMinutes} minutes`,
+      `\n📝 Batch report saved to: ${batchReportPath}`,
+    ];
+    process.stdout.write(lines.join('\n') + '\n');
     
     return {
       totalDocuments: numDocs,
@@ -4,7 +4,8 @@
 require('dotenv').config();
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
+const { httpClient } = require('./httpClient');
+const { getExpectedClassification, getDirectoryListing, summarizeForBatch, tallyBatchResults } = require('./evaluationUtils');
 const Papa = require('papaparse');
 const readline = require('readline');
 const { processDocument } = require('./newMistral');
@@ -86,7 +87,9 @@ function loadValidationDataset() {
     groupedByDocument[filename].push({
       pageNumber: parseInt(row.page_number),
       category: row.category,
-      subcategory: row.subcategory
+      subcategory: row.subcategory,
+      // Labelled once here rather than for every page evaluated
+      expectedClassification: getExpectedClassification(row.category, row.subcategory)
     });
   });
   
@@ -104,14 +107,20 @@ function findDocumentDirectory() {
   process.exit(1);
 }
 
-// Helper function to classify all pages in a single API call
-async function classifyAllPagesWithPDF(pdfPath, pagesContent) {
-  // Read the PDF file and convert to base64
-  const pdfData = fs.readFileSync(pdfPath);
-  const pdfBase64 = pdfData.toString('base64');
-  
-  // Construct the prompt with all pages
-  let promptText = `You are an expert maritime document analyst specialized in classifying pages from Cargo Documents for Port Operations. Your task is to analyze multiple pages from a maritime document and categorize each page accurately into one of three categories: "AGENT_SOF", "MASTER_SOF", or "OTHER".
+// Base64 of the most recently read PDF, so every request for the same document reuses one encoding
+let cachedPdfBase64 = { pdfPath: null, mtimeMs: 0, data: null };
+
+// Helper function to read a PDF as base64, encoding each unchanged file only once in a row
+function readPdfAsBase64(pdfPath) {
+  const { mtimeMs } = fs.statSync(pdfPath);
+  if (cachedPdfBase64.pdfPath !== pdfPath || cachedPdfBase64.mtimeMs !== mtimeMs) {
+    cachedPdfBase64 = { pdfPath, mtimeMs, data: fs.readFileSync(pdfPath).toString('base64') };
+  }
+  return cachedPdfBase64.data;
+}
+
+// Fixed parts of the whole-document classification prompt; only the page sections vary per call
+const CLASSIFICATION_PROMPT_HEADER = `You are an expert maritime document analyst specialized in classifying pages from Cargo Documents for Port Operations. Your task is to analyze multiple pages from a maritime document and categorize each page accurately into one of three categories: "AGENT_SOF", "MASTER_SOF", or "OTHER".
 
 I am providing you with:
 1. The OCR-extracted text for each page (which may be incomplete)
@@ -170,13 +179,7 @@ Below are the OCR-extracted texts for each page. For each page, provide your cla
 
 `;
 
-  // Add each page's content to the prompt
-  pagesContent.forEach((content, index) => {
-    promptText += `\n----- PAGE ${index + 1} -----\n`;
-    promptText += `<ocr_text>\n${content}\n</ocr_text>\n`;
-  });
-
-  promptText += `\nFor each page, provide a classification of AGENT_SOF, MASTER_SOF, or OTHER.
+const CLASSIFICATION_PROMPT_FOOTER = `\nFor each page, provide a classification of AGENT_SOF, MASTER_SOF, or OTHER.
 Use the following format for your response:
 PAGE 1: [Scratchpad Reasoning] - [CLASSIFICATION]
 PAGE 2: [Scratchpad Reasoning] - [CLASSIFICATION]
@@ -184,6 +187,29 @@ PAGE 2: [Scratchpad Reasoning] - [CLASSIFICATION]
 
 Examine each page individually and make your decision based on the characteristics described above. Take your time to analyze each page thoroughly before providing your classification.  The [Reasoning] component should include a short explanation of your reasoning for the classification extracted from scratchpad thinking you applied to the document.`;
 
+// One "PAGE X: [any reasoning text] - [CLASSIFICATION]" line of the response: reasoning
+// first, then the classification after the last dash. Compiled once at load.
+const PAGE_CLASSIFICATION_REGEX = /PAGE\s+(\d+)\s*:\s*(.*?)\s*-\s*(AGENT_SOF|MASTER_SOF|OTHER)\s*$/gmi;
+
+// Loose "page N ... - CATEGORY" mention, used when a page is missing from the
+// strict per-line format. The lookahead keeps a match from swallowing a later
+// page's mention on the same line.
+const PAGE_MENTION_REGEX = /page\s*(\d+)(?=\s*[:\-]?\s*(.*?)\s*-\s*(agent_sof|master_sof|other))/gi;
+
+// Helper function to classify all pages in a single API call
+async function classifyAllPagesWithPDF(pdfPath, pagesContent) {
+  // Read the PDF as base64 (reused across calls for the same document)
+  const pdfBase64 = readPdfAsBase64(pdfPath);
+  
+  // Construct the prompt from the fixed instructions and one section per page
+  const promptText = [
+    CLASSIFICATION_PROMPT_HEADER,
+    ...pagesContent.map((content, index) =>
+      `\n----- PAGE ${index + 1} -----\n<ocr_text>\n${content}\n</ocr_text>\n`
+    ),
+    CLASSIFICATION_PROMPT_FOOTER
+  ].join('');
+
   try {
     console.log(`Making a single API call to classify all ${pagesContent.length} pages...`);
     
@@ -208,7 +234,7 @@ Examine each page individually and make your decision based on the characteristi
       }
     ];
 
-    const response = await axios.post(
+    const response = await httpClient.post(
       'https://api.anthropic.com/v1/messages',
       {
         model: 'claude-3-7-sonnet-20250219',
@@ -231,12 +257,7 @@ Examine each page individually and make your decision based on the characteristi
     // Parse the response to extract classifications for each page
     const pageClassifications = [];
     
-    // Updated regex to capture reasoning first, then classification after the last dash
-    // This matches "PAGE X: [any reasoning text] - [CLASSIFICATION]" format
-    const pageRegex = /PAGE\s+(\d+)\s*:\s*(.*?)\s*-\s*(AGENT_SOF|MASTER_SOF|OTHER)\s*$/gmi;
-    
-    let match;
-    while ((match = pageRegex.exec(fullResponseText)) !== null) {
+    for (const match of fullResponseText.matchAll(PAGE_CLASSIFICATION_REGEX)) {
       const pageNumber = parseInt(match[1]);
       const reasoning = match[2] ? match[2].trim() : '';
       const classification = match[3].toUpperCase();
@@ -255,18 +276,27 @@ Examine each page individually and make your decision based on the characteristi
     if (pageClassifications.length < pagesContent.length) {
       console.warn(`Warning: Only found classifications for ${pageClassifications.length} pages out of ${pagesContent.length}`);
       
-      // Fill in missing pages by scanning the response more broadly
+      // Fill in missing pages by scanning the response more broadly, indexing the
+      // first mention of each page number in a single pass
+      const classifiedPageNumbers = new Set(pageClassifications.map(p => p.pageNumber));
+      const pageMentions = new Map();
+      for (const mention of fullResponseText.matchAll(PAGE_MENTION_REGEX)) {
+        const mentionedPage = parseInt(mention[1]);
+        if (!pageMentions.has(mentionedPage)) {
+          pageMentions.set(mentionedPage, mention);
+        }
+      }
+      
       for (let i = 1; i <= pagesContent.length; i++) {
-        if (!pageClassifications.some(p => p.pageNumber === i)) {
+        if (!classifiedPageNumbers.has(i)) {
           // Try to find mentions of this page elsewhere in the response
-          const altPageRegex = new RegExp(`page\\s*${i}\\s*[:\\-]?\\s*(.*?)\\s*-\\s*(agent_sof|master_sof|other)`, 'i');
-          const altMatch = fullResponseText.match(altPageRegex);
+          const altMatch = pageMentions.get(i);
           
           if (altMatch) {
             pageClassifications.push({
               pageNumber: i,
-              classification: altMatch[2].toUpperCase(),
-              reasoning: altMatch[1] ? altMatch[1].trim() : 'Extracted from general text'
+              classification: altMatch[3].toUpperCase(),
+              reasoning: altMatch[2] ? altMatch[2].trim() : 'Extracted from general text'
             });
           } else {
             // Last resort: add a placeholder
@@ -309,9 +339,8 @@ async function extractSofDataFromClassifiedPages(pdfPath, classifiedPages, pages
     
     console.log(`Found ${sofPages.length} SOF pages for data extraction`);
     
-    // Read the PDF file and convert to base64
-    const pdfData = fs.readFileSync(pdfPath);
-    const pdfBase64 = pdfData.toString('base64');
+    // Read the PDF as base64 (reused across calls for the same document)
+    const pdfBase64 = readPdfAsBase64(pdfPath);
     
     // Constants for batch processing (matching sofextractor.service.ts)
     const SOF_BATCH_SIZE = 2;
@@ -373,6 +402,21 @@ async function extractSofDataFromClassifiedPages(pdfPath, classifiedPages, pages
   }
 }
 
+const JSON_FENCE = '```json';
+
+// Return the text between the first ```json fence and the next ``` (or the end of the
+// text), or undefined if there is no fence. Slices by index instead of splitting the
+// whole response into arrays twice.
+function extractJsonCodeBlock(text) {
+  const fenceStart = text.indexOf(JSON_FENCE);
+  if (fenceStart < 0) {
+    return undefined;
+  }
+  const blockStart = fenceStart + JSON_FENCE.length;
+  const blockEnd = text.indexOf('```', blockStart);
+  return blockEnd < 0 ? text.slice(blockStart) : text.slice(blockStart, blockEnd);
+}
+
 // Process a single batch of SOF pages
 async function processSofBatch(batch, pdfBase64, pagesContent) {
   // The system prompt from models.ts
@@ -498,7 +542,7 @@ Please extract all events from these pages using the format specified in your in
   
   // Make API call to Claude
   console.log(`Calling Anthropic API for ${batch.length} pages...`);
-  const response = await axios.post(
+  const response = await httpClient.post(
     'https://api.anthropic.com/v1/messages',
     {
       model: 'claude-3-7-sonnet-20250219',
@@ -547,7 +591,7 @@ Please extract all events from these pages using the format specified in your in
       // Extract JSON if wrapped in markdown
       let cleanedText = responseText;
       if (cleanedText.includes('```json') && cleanedText.includes('```')) {
-        cleanedText = cleanedText.split('```json')[1]?.split('```')[0] || cleanedText;
+        cleanedText = extractJsonCodeBlock(cleanedText) || cleanedText;
       }
       
       // Find JSON object if embedded in text
@@ -682,16 +726,15 @@ function advanceDateByOneDay(dateStr) {
 
 // Find a document in the Agent&MasterSOFs directory that best matches the filename
 function findBestMatchingDocument(filename, documentDir) {
-  const allFiles = fs.readdirSync(documentDir);
+  const { files: allFiles, fileSet, byLowerName } = getDirectoryListing(documentDir);
   
   // Try exact match first
-  if (allFiles.includes(filename)) {
+  if (fileSet.has(filename)) {
     return path.join(documentDir, filename);
   }
   
   // Try case-insensitive match
-  const lowerFilename = filename.toLowerCase();
-  const caseInsensitiveMatch = allFiles.find(f => f.toLowerCase() === lowerFilename);
+  const caseInsensitiveMatch = byLowerName.get(filename.toLowerCase());
   if (caseInsensitiveMatch) {
     return path.join(documentDir, caseInsensitiveMatch);
   }
@@ -803,11 +846,15 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
     let incorrectSOFPages = 0; // Track incorrectly classified SOF pages
     let isSOFDocument = false; // Track if this document contains any SOF pages
     
+    // Index expected pages and batch results by page number once per document
+    const expectedByPage = new Map(expectedPages.map(p => [p.pageNumber, p]));
+    const classificationByPage = new Map(allPageClassifications.map(p => [p.pageNumber, p]));
+    
     for (let i = 0; i < pagesContent.length; i++) {
       const pageNumber = i + 1; // Convert to 1-indexed
       
       // Find expected classification
-      const expectedPageData = expectedPages.find(p => p.pageNumber === pageNumber);
+      const expectedPageData = expectedByPage.get(pageNumber);
       
       if (!expectedPageData) {
         console.warn(`⚠️ Page ${pageNumber} not found in validation dataset. Skipping.`);
@@ -817,24 +864,14 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
       totalPages++;
       
       // Expected classification
-      let expectedClassification = 'OTHER';
-      if (expectedPageData.category.toLowerCase().includes('agent') && 
-          (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-           expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'AGENT_SOF';
-        totalSOFPages++;
-        isSOFDocument = true; // Mark as an SOF document
-      } else if ((expectedPageData.category.toLowerCase().includes('master') || 
-                 expectedPageData.category.toLowerCase().includes('ship')) && 
-                (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-                 expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'MASTER_SOF';
+      const { expectedClassification } = expectedPageData;
+      if (expectedClassification !== 'OTHER') {
         totalSOFPages++;
         isSOFDocument = true; // Mark as an SOF document
       }
       
       // Find this page's classification from the batch results
-      const pageClassification = allPageClassifications.find(p => p.pageNumber === pageNumber);
+      const pageClassification = classificationByPage.get(pageNumber);
       let actualClassification = 'UNKNOWN';
       let reasoning = 'Not processed';
       
@@ -845,8 +882,7 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
       
       // Check if classification is correct - normalize strings for comparison
       const normalizedActual = actualClassification.trim().toUpperCase();
-      const normalizedExpected = expectedClassification.trim().toUpperCase();
-      const isCorrect = normalizedActual === normalizedExpected;
+      const isCorrect = normalizedActual === expectedClassification;
       
       if (isCorrect) {
         correctPages++;
@@ -904,32 +940,38 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
     const resultFilename = `${resultTimestamp}_batch_evaluation_pdf_${path.basename(documentPath).replace(/[^a-zA-Z0-9]/g, '_')}.json`;
     const resultPath = path.join(resultsOutputFolder, resultFilename);
     
-    fs.writeFileSync(resultPath, JSON.stringify(summary, null, 2));
+    // The report files are written in the background while the results are printed
+    const resultWrite = fs.promises.writeFile(resultPath, JSON.stringify(summary, null, 2));
     
     // Generate markdown report
     const markdownReport = generateMarkdownReport(summary);
     const markdownPath = path.join(resultsOutputFolder, resultFilename.replace('.json', '.md'));
-    fs.writeFileSync(markdownPath, markdownReport);
-    
-    // Output summary to console
-    console.log('\n📊 Document Evaluation Results (Batch PDF + OCR):');
-    console.log(`  - Document: ${documentFilename}`);
-    console.log(`  - File: ${path.basename(documentPath)}`);
-    console.log(`  - Document Type: ${isSOFDocument ? 'SOF Document' : 'Non-SOF Document'}`);
-    console.log(`  - Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`  - Incorrectly Classified SOF Pages: ${incorrectSOFPages}`);
-    console.log(`  - Report saved to: ${markdownPath}`);
-    
-    // Generate detailed results table with reasoning
-    console.log('\n📑 Detailed Results:');
-    console.log('| Page | Expected | Actual | Correct | Reasoning |');
-    console.log('|------|----------|--------|---------|-----------|');
-    results.forEach(r => {
-      console.log(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
-    });
+    const markdownWrite = fs.promises.writeFile(markdownPath, markdownReport);
+    
+    // Output summary to console, followed by the detailed results table, in a single write
+    const summaryLines = [
+      '\n📊 Document Evaluation Results (Batch PDF + OCR):',
+      `  - Document: ${documentFilename}`,
+      `  - File: ${path.basename(documentPath)}`,
+      `  - Document Type: ${isSOFDocument ? 'SOF Document' : 'Non-SOF Document'}`,
+      `  - Pages Processed: ${totalPages}`,
+      `  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`,
+      `  - SOF Pages Detected: ${totalSOFPages}`,
+      `  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+      `  - Incorrectly Classified SOF Pages: ${incorrectSOFPages}`,
+      `  - Report saved to: ${markdownPath}`,
+    ];
+    
+    // Detailed results table with reasoning
+    summaryLines.push('\n📑 Detailed Results:', '| Page | Expected | Actual | Correct | Reasoning |', '|------|----------|--------|---------|-----------|');
+    for (const r of results) {
+      summaryLines.push(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
+    }
+    process.stdout.write(summaryLines.join('\n') + '\n');
+    
+    // Finish the report files before extraction starts, so a failed write is
+    // reported through the catch below
+    await Promise.all([resultWrite, markdownWrite]);
     
     // Extract SOF data if there are any SOF pages
     if (isSOFDocument) {
@@ -1027,33 +1069,41 @@ ${hasExtractedEvents ? `\nThe system successfully extracted ${summary.extractedE
   return report;
 }
 
-// Generate markdown report for batch evaluation
-function generateBatchReport(results, timestamp) {
-  let totalPages = 0;
-  let totalCorrectPages = 0;
-  let totalSOFPages = 0;
-  let totalCorrectSOFPages = 0;
-  let totalIncorrectSOFPages = 0; // Track total incorrectly classified SOF pages
-  let totalSOFDocuments = 0; 
-  let totalExtractedEvents = 0;
-  
-  // Aggregate results
-  results.forEach(doc => {
-    if (doc) {
-      totalPages += doc.totalPages;
-      totalCorrectPages += doc.correctPages;
-      totalSOFPages += doc.totalSOFPages;
-      totalCorrectSOFPages += doc.correctSOFPages;
-      totalIncorrectSOFPages += doc.incorrectSOFPages || 0; // Add incorrectly classified SOF pages
-      if (doc.isSOFDocument) {
-        totalSOFDocuments++; 
-      }
-      // Count extracted events
-      if (doc.extractedEvents) {
-        totalExtractedEvents += doc.extractedEvents.length;
-      }
+// Batch counts for a document, with its extracted events reduced to a count. The
+// events are already saved to disk per document, so they can be released here.
+function summarizeSOFForBatch(docResult) {
+  const counts = summarizeForBatch(docResult);
+  if (!counts) {
+    return null;
+  }
+  const { extractedEvents, ...rest } = counts;
+  return { ...rest, extractedEventCount: extractedEvents ? extractedEvents.length : 0 };
+}
+
+// Shared batch totals plus the SOF document and extracted event counts
+function tallySOFBatchResults(results) {
+  const totals = {
+    ...tallyBatchResults(results),
+    totalIncorrectSOFPages: 0,
+    totalSOFDocuments: 0,
+    totalExtractedEvents: 0
+  };
+  for (const doc of results) {
+    if (!doc) {
+      continue;
     }
-  });
+    totals.totalIncorrectSOFPages += doc.incorrectSOFPages || 0;
+    if (doc.isSOFDocument) {
+      totals.totalSOFDocuments++;
+    }
+    totals.totalExtractedEvents += doc.extractedEventCount;
+  }
+  return totals;
+}
+
+// Generate markdown report for batch evaluation
+function generateBatchReport(results, timestamp, totals) {
+  const { successfulDocs, failedDocs, totalPages, totalCorrectPages, totalSOFPages, totalCorrectSOFPages, totalIncorrectSOFPages, totalSOFDocuments, totalExtractedEvents } = totals;
   
   // Calculate overall metrics
   const overallAccuracy = totalPages > 0 ? (totalCorrectPages / totalPages) * 100 : 0;
@@ -1062,9 +1112,9 @@ function generateBatchReport(results, timestamp) {
   const report = `# Batch Document Classification and SOF Extraction Report
 
 ## Overview
-- **Total Documents Processed:** ${results.filter(r => r !== null).length}
+- **Total Documents Processed:** ${successfulDocs}
 - **Total SOF Documents:** ${totalSOFDocuments}
-- **Total Documents Failed:** ${results.filter(r => r === null).length}
+- **Total Documents Failed:** ${failedDocs}
 - **Total Pages Processed:** ${totalPages}
 - **Total SOF Events Extracted:** ${totalExtractedEvents}
 - **Evaluation Date:** ${new Date().toISOString().split('T')[0]}
@@ -1080,7 +1130,7 @@ function generateBatchReport(results, timestamp) {
 | Document | Type | Pages | Correct Pages | SOF Pages | Correct SOF Pages | SOF Events | Overall Accuracy | SOF Accuracy |
 |----------|------|-------|---------------|-----------|-------------------|------------|-----------------|-------------|
 ${results.filter(r => r !== null).map(r => 
-  `| ${r.document} | ${r.isSOFDocument ? 'SOF' : 'Non-SOF'} | ${r.totalPages} | ${r.correctPages} | ${r.totalSOFPages} | ${r.correctSOFPages} | ${r.extractedEvents ? r.extractedEvents.length : 0} | ${r.overallAccuracy}% | ${r.sofAccuracy}% |`
+  `| ${r.document} | ${r.isSOFDocument ? 'SOF' : 'Non-SOF'} | ${r.totalPages} | ${r.correctPages} | ${r.totalSOFPages} | ${r.correctSOFPages} | ${r.extractedEventCount} | ${r.overallAccuracy}% | ${r.sofAccuracy}% |`
 ).join('\n')}
 
 ## Conclusion
@@ -1137,70 +1187,49 @@ async function runBatchEvaluation() {
     
     // Process each document
     const batchResults = [];
-    const batchStartTime = Date.now();
+    const batchStartTime = process.hrtime.bigint();
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
     
     for (let i = 0; i < selectedDocuments.length; i++) {
       console.log(`\n📄 Processing document ${i + 1}/${numDocs}: ${selectedDocuments[i]}`);
       const docResult = await evaluateDocument(selectedDocuments[i], documentDir, validationDataset);
-      batchResults.push(docResult);
+      batchResults.push(summarizeSOFForBatch(docResult));
     }
     
     // Calculate batch processing time
-    const batchEndTime = Date.now();
-    const processingTimeInMinutes = ((batchEndTime - batchStartTime) / 1000 / 60).toFixed(2);
+    const batchElapsedNs = process.hrtime.bigint() - batchStartTime;
+    const processingTimeInMinutes = (Number(batchElapsedNs) / 1e9 / 60).toFixed(2);
     
     // Generate and save batch report
     console.log('\n📊 Generating batch evaluation report...');
-    const batchReport = generateBatchReport(batchResults, timestamp);
+    const batchTotals = tallySOFBatchResults(batchResults);
+    const batchReport = generateBatchReport(batchResults, timestamp, batchTotals);
     const resultsOutputFolder = path.join(__dirname, 'results');
     const batchReportPath = path.join(resultsOutputFolder, `${timestamp}_batch_evaluation_report.md`);
     fs.writeFileSync(batchReportPath, batchReport);
     
     // Calculate aggregate metrics
-    let totalPages = 0;
-    let totalCorrectPages = 0;
-    let totalSOFPages = 0;
-    let totalCorrectSOFPages = 0;
-    let totalIncorrectSOFPages = 0; // Track total incorrectly classified SOF pages
-    let successfulDocs = 0;
-    let totalSOFDocuments = 0; // Track SOF documents
-    let totalExtractedEvents = 0; // Track extracted events
-    
-    batchResults.forEach(doc => {
-      if (doc) {
-        successfulDocs++;
-        totalPages += doc.totalPages;
-        totalCorrectPages += doc.correctPages;
-        totalSOFPages += doc.totalSOFPages;
-        totalCorrectSOFPages += doc.correctSOFPages;
-        totalIncorrectSOFPages += doc.incorrectSOFPages || 0; // Add incorrectly classified SOF pages
-        if (doc.isSOFDocument) {
-          totalSOFDocuments++; // Count SOF documents
-        }
-        // Count extracted events
-        if (doc.extractedEvents) {
-          totalExtractedEvents += doc.extractedEvents.length;
-        }
-      }
-    });
+    const { successfulDocs, totalPages, totalCorrectPages, totalSOFPages, totalCorrectSOFPages, totalIncorrectSOFPages, totalSOFDocuments, totalExtractedEvents } = batchTotals;
     
     const overallAccuracy = totalPages > 0 ? (totalCorrectPages / totalPages) * 100 : 0;
     const sofAccuracy = totalSOFPages > 0 ? (totalCorrectSOFPages / totalSOFPages) * 100 : 0;
     
-    // Print summary to console
-    console.log('\n📈 Batch Evaluation Results (Batch PDF + OCR):');
-    console.log(`  - Documents Processed: ${successfulDocs}/${numDocs}`);
-    console.log(`  - SOF Documents: ${totalSOFDocuments}/${successfulDocs}`);
-    console.log(`  - Total Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${totalCorrectPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${totalCorrectSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`  - Incorrectly Classified SOF Pages: ${totalIncorrectSOFPages}`);
-    console.log(`  - SOF Events Extracted: ${totalExtractedEvents}`);
-    console.log(`  - Average Events per SOF Document: ${totalSOFDocuments > 0 ? (totalExtractedEvents / totalSOFDocuments).toFixed(1) : 'N/A'}`);
-    console.log(`  - Processing Time: ${processingTimeInMinutes} minutes`);
-    console.log(`\n📝 Batch report saved to: ${batchReportPath}`);
+    // Print summary to console in a single write
+    const lines = [
+      '\n📈 Batch Evaluation Results (Batch PDF + OCR):',
+      `  - Documents Processed: ${successfulDocs}/${numDocs}`,
+      `  - SOF Documents: ${totalSOFDocuments}/${successfulDocs}`,
+      `  - Total Pages Processed: ${totalPages}`,
+      `  - Correctly Classified Pages: ${totalCorrectPages} (${overallAccuracy.toFixed(2)}%)`,
+      `  - SOF Pages Detected: ${totalSOFPages}`,
+      `  - Correctly Classified SOF Pages: ${totalCorrectSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+      `  - Incorrectly Classified SOF Pages: ${totalIncorrectSOFPages}`,
+      `  - SOF Events Extracted: ${totalExtractedEvents}`,
+      `  - Average Events per SOF Document: ${totalSOFDocuments > 0 ? (totalExtractedEvents / totalSOFDocuments).toFixed(1) : 'N/A'}`,
+      `  - Processing Time: ${processingTimeInMinutes} minutes`,
+      `\n📝 Batch report saved to: ${batchReportPath}`,
+    ];
+    process.stdout.write(lines.join('\n') + '\n');
     
     return {
       totalDocuments: numDocs,
@@ -1211,8 +1240,7 @@ async function runBatchEvaluation() {
       totalSOFPages,
       totalCorrectSOFPages,
       totalIncorrectSOFPages,
-      totalExtractedEvents: batchResults.reduce((sum, doc) => 
-        sum + (doc && doc.extractedEvents ? doc.extractedEvents.length : 0), 0),
+      totalExtractedEvents,
       overallAccuracy: overallAccuracy.toFixed(2),
       sofAccuracy: sofAccuracy.toFixed(2),
       processingTimeInMinutes,
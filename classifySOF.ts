@@ -14,6 +14,7 @@ import fs from 'fs';
 import axios from 'axios';
 import dotenv from 'dotenv';
 import crypto from 'crypto';
+import { detectMimeType } from './mimeTypes';
 import { exec } from 'child_process';
 import { promisify } from 'util';
 
@@ -36,6 +37,7 @@ import {
   TimeFrame,
   sofAiExtractsToExtractTable
 } from './newMistral/simpleSofExtraction';
+import { mistralOCR } from './mistralProject/src/core/MistralOCR';
 
 // Load environment variables
 dotenv.config();
@@ -163,27 +165,38 @@ async function processDocumentWithOCR(filePath: string, resultsFolder: string):
   try {
     console.log(`📄 Processing document with OCR: ${path.basename(filePath)}`);
     
-    // Read file and convert to base64
     const fileData = fs.readFileSync(filePath);
-    const base64Data = fileData.toString('base64');
     
-    // Determine file type from extension
-    const fileExt = path.extname(filePath).toLowerCase();
-    const fileType = fileExt === '.pdf' ? 'application/pdf' : 
-                   (fileExt === '.png' ? 'image/png' : 
-                   (fileExt === '.jpg' || fileExt === '.jpeg' ? 'image/jpeg' : 'application/octet-stream'));
+    // Determine file type from its contents, falling back to the extension
+    const fileType = detectMimeType(fileData, filePath);
     
     console.log('🔍 Sending document to Mistral OCR API...');
     
+    // Upload PDFs and pass their signed URL; other files, and PDFs whose upload
+    // fails, are inlined as a base64 data URL
+    const startTime = process.hrtime.bigint();
+    let documentUrl: string | null = null;
+    if (fileType === 'application/pdf') {
+      try {
+        // Shares MistralOCR's upload cache, so identical contents are uploaded once
+        const upload = await mistralOCR.uploadFileOnce(fileData, path.basename(filePath));
+        documentUrl = (await mistralOCR.getSignedUrl(upload.id)).url;
+      } catch (uploadError: any) {
+        console.warn(`⚠️ File upload failed (${uploadError.message}), sending the document inline instead`);
+      }
+    }
+    if (!documentUrl) {
+      documentUrl = `data:${fileType};base64,${fileData.toString('base64')}`;
+    }
+    
     // Call Mistral OCR API
-    const startTime = Date.now();
     const response = await axios.post(
       'https://api.mistral.ai/v1/ocr',
       {
         model: 'mistral-ocr-latest',
         document: {
           type: 'document_url',
-          document_url: `data:${fileType};base64,${base64Data}`
+          document_url: documentUrl
         }
       },
       {
@@ -194,8 +207,8 @@ async function processDocumentWithOCR(filePath: string, resultsFolder: string):
       }
     );
     
-    const endTime = Date.now();
-    const processingTimeSeconds = ((endTime - startTime) / 1000).toFixed(2);
+    const elapsedNs = process.hrtime.bigint() - startTime;
+    const processingTimeSeconds = (Number(elapsedNs) / 1e9).toFixed(2);
     
     // Save OCR API response to the dedicated OCR results folder
     const ocrResultsFolder = path.join(resultsFolder, 'ocr_results');
@@ -4,7 +4,8 @@
 require('dotenv').config();
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
+const { httpClient } = require('./httpClient');
+const { getExpectedClassification, getDirectoryListing } = require('./evaluationUtils');
 const Papa = require('papaparse');
 const { processDocument } = require('./newMistral');
 
@@ -70,7 +71,9 @@ function loadValidationDataset() {
     groupedByDocument[filename].push({
       pageNumber: parseInt(row.page_number),
       category: row.category,
-      subcategory: row.subcategory
+      subcategory: row.subcategory,
+      // Labelled once here rather than for every page evaluated
+      expectedClassification: getExpectedClassification(row.category, row.subcategory)
     });
   });
   
@@ -88,6 +91,69 @@ function findDocumentDirectory() {
   process.exit(1);
 }
 
+// Response parsing patterns, compiled once at load time
+const SCRATCHPAD_PATTERN = /<scratchpad>([\s\S]*?)<\/scratchpad>/i;
+const SCRATCHPAD_CLOSE_PATTERN = /<\/scratchpad>/i;
+const FINAL_CLASSIFICATION_PATTERN = /Final classification:\s*(\S+)/i;
+const CLASSIFICATION_LABEL_PATTERN = /AGENT_SOF|MASTER_SOF|OTHER/i;
+const CONCLUSION_PATTERN = /should be classified as|would be classified as|classification would be|classify as|category is/i;
+// Phrasings that rule out an SOF, combined so the response is scanned once instead of five times
+const NOT_SOF_PATTERN = /not an? (?:AGENT_SOF|agent sof|agent's sof)|not a statement of facts|falls (?:into|under) the "OTHER" category|classified as "OTHER"/i;
+
+// Helper function to pull the reasoning and final classification out of a Claude response
+function parseClassificationResponse(fullResponseText) {
+  // Extract the reasoning (scratchpad content)
+  let reasoning = '';
+  const scratchpadMatch = SCRATCHPAD_PATTERN.exec(fullResponseText);
+  if (scratchpadMatch && scratchpadMatch[1]) {
+    reasoning = scratchpadMatch[1].trim();
+  }
+  
+  // Extract the final classification (after "Final classification:")
+  const classificationMatch = FINAL_CLASSIFICATION_PATTERN.exec(fullResponseText);
+  if (classificationMatch && classificationMatch[1]) {
+    return { classification: classificationMatch[1].trim().toUpperCase(), reasoning };
+  }
+  
+  // Check if there's text after "scratchpad" closing tag
+  const closeMatch = SCRATCHPAD_CLOSE_PATTERN.exec(fullResponseText);
+  if (closeMatch) {
+    // Try to find classification in text after scratchpad
+    const typeMatchAfterScratchpad = CLASSIFICATION_LABEL_PATTERN.exec(
+      fullResponseText.slice(closeMatch.index + closeMatch[0].length)
+    );
+    if (typeMatchAfterScratchpad) {
+      return { classification: typeMatchAfterScratchpad[0].toUpperCase(), reasoning };
+    }
+  }
+  
+  // If still not found, check the last sentence of the scratchpad for a conclusion
+  const scratchpadContent = scratchpadMatch && scratchpadMatch[1] ? scratchpadMatch[1] : '';
+  const sentences = scratchpadContent.split(/\.\s+/);
+  const lastSentence = sentences[sentences.length - 1];
+  if (lastSentence && CONCLUSION_PATTERN.test(lastSentence)) {
+    const typeMatchInConclusion = CLASSIFICATION_LABEL_PATTERN.exec(lastSentence);
+    if (typeMatchInConclusion) {
+      return { classification: typeMatchInConclusion[0].toUpperCase(), reasoning };
+    }
+  }
+  
+  // Last resort: if the text contains any of these terms, prefer OTHER over AGENT_SOF
+  if (NOT_SOF_PATTERN.test(fullResponseText)) {
+    return { classification: 'OTHER', reasoning };
+  }
+  
+  // Original fallback
+  const typeMatch = CLASSIFICATION_LABEL_PATTERN.exec(fullResponseText);
+  if (typeMatch) {
+    return { classification: typeMatch[0].toUpperCase(), reasoning };
+  }
+  
+  // Last resort: get the last word of the response
+  const words = fullResponseText.split(/\s+/);
+  return { classification: words[words.length - 1].toUpperCase(), reasoning };
+}
+
 // Helper function to classify a page using Anthropic API
 async function classifyPageWithAnthropic(pageContent) {
   const systemPrompt = `You are an expert maritime document analyst specialized in classifying pages from Cargo Documents for Port Operations. Your task is to analyze a maritime document page and categorize it accurately into one of three categories: "AGENT_SOF", "MASTER_SOF", or "OTHER".
@@ -139,7 +205,7 @@ After your analysis, provide your final classification as a single word response
 Final classification:`;
 
   try {
-    const response = await axios.post(
+    const response = await httpClient.post(
       'https://api.anthropic.com/v1/messages',
       {
         model: 'claude-3-7-sonnet-20250219',
@@ -164,70 +230,7 @@ Final classification:`;
     // Extract the full response text
     const fullResponseText = response.data.content[0].text.trim();
     
-    // Extract the reasoning (scratchpad content)
-    let reasoning = '';
-    const scratchpadMatch = fullResponseText.match(/<scratchpad>([\s\S]*?)<\/scratchpad>/i);
-    if (scratchpadMatch && scratchpadMatch[1]) {
-      reasoning = scratchpadMatch[1].trim();
-    }
-    
-    // Extract the final classification (after "Final classification:")
-    let classification = '';
-    const classificationMatch = fullResponseText.match(/Final classification:\s*(\S+)/i);
-    if (classificationMatch && classificationMatch[1]) {
-      classification = classificationMatch[1].trim();
-    } else {
-      // Check if there's text after "scratchpad" closing tag
-      const afterScratchpad = fullResponseText.split(/<\/scratchpad>/i)[1];
-      if (afterScratchpad) {
-        // Try to find classification in text after scratchpad
-        const typeMatchAfterScratchpad = afterScratchpad.match(/(AGENT_SOF|MASTER_SOF|OTHER)/i);
-        if (typeMatchAfterScratchpad) {
-          classification = typeMatchAfterScratchpad[0];
-        }
-      }
-      
-      // If still not found, check the last sentence of the scratchpad for a conclusion
-      if (!classification) {
-        const scratchpadContent = scratchpadMatch && scratchpadMatch[1] ? scratchpadMatch[1] : '';
-        const sentences = scratchpadContent.split(/\.\s+/);
-        const lastSentence = sentences[sentences.length - 1];
-        
-        // Check if last sentence contains a clear conclusion
-        if (lastSentence && lastSentence.match(/should be classified as|would be classified as|classification would be|classify as|category is/i)) {
-          const typeMatchInConclusion = lastSentence.match(/(AGENT_SOF|MASTER_SOF|OTHER)/i);
-          if (typeMatchInConclusion) {
-            classification = typeMatchInConclusion[0];
-          }
-        }
-      }
-      
-      // Last resort: if the text contains any of these terms, prefer OTHER over AGENT_SOF
-      if (!classification) {
-        if (fullResponseText.match(/not an? (AGENT_SOF|agent sof|agent's sof)/i) || 
-            fullResponseText.match(/not a statement of facts/i) ||
-            fullResponseText.match(/falls into the "OTHER" category/i) ||
-            fullResponseText.match(/falls under the "OTHER" category/i) ||
-            fullResponseText.match(/classified as "OTHER"/i)) {
-          classification = 'OTHER';
-        } else {
-          // Original fallback
-          const typeMatch = fullResponseText.match(/(AGENT_SOF|MASTER_SOF|OTHER)/i);
-          if (typeMatch) {
-            classification = typeMatch[0];
-          } else {
-            // Last resort: get the last word of the response
-            const words = fullResponseText.split(/\s+/);
-            classification = words[words.length - 1];
-          }
-        }
-      }
-    }
-    
-    return {
-      classification: classification.toUpperCase(),
-      reasoning
-    };
+    return parseClassificationResponse(fullResponseText);
   } catch (error) {
     console.error('Error classifying page with Anthropic:', error.message);
     if (error.response) {
@@ -242,16 +245,15 @@ Final classification:`;
 
 // Find a document in the Agent&MasterSOFs directory that best matches the filename
 function findBestMatchingDocument(filename, documentDir) {
-  const allFiles = fs.readdirSync(documentDir);
+  const { files: allFiles, fileSet, byLowerName } = getDirectoryListing(documentDir);
   
   // Try exact match first
-  if (allFiles.includes(filename)) {
+  if (fileSet.has(filename)) {
     return path.join(documentDir, filename);
   }
   
   // Try case-insensitive match
-  const lowerFilename = filename.toLowerCase();
-  const caseInsensitiveMatch = allFiles.find(f => f.toLowerCase() === lowerFilename);
+  const caseInsensitiveMatch = byLowerName.get(filename.toLowerCase());
   if (caseInsensitiveMatch) {
     return path.join(documentDir, caseInsensitiveMatch);
   }
@@ -381,12 +383,15 @@ async function evaluateDocument(documentIndex) {
     let totalSOFPages = 0;
     let correctSOFPages = 0;
     
+    // Index expected pages by page number once per document
+    const expectedByPage = new Map(expectedPages.map(p => [p.pageNumber, p]));
+    
     for (let i = 0; i < ocrResponse.pages.length; i++) {
       const pageNumber = i + 1; // Convert to 1-indexed
       const pageContent = ocrResponse.pages[i].markdown || '';
       
       // Find expected classification
-      const expectedPageData = expectedPages.find(p => p.pageNumber === pageNumber);
+      const expectedPageData = expectedByPage.get(pageNumber);
       
       if (!expectedPageData) {
         console.warn(`⚠️ Page ${pageNumber} not found in validation dataset. Skipping.`);
@@ -396,17 +401,8 @@ async function evaluateDocument(documentIndex) {
       totalPages++;
       
       // Expected classification
-      let expectedClassification = 'OTHER';
-      if (expectedPageData.category.toLowerCase().includes('agent') && 
-          (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-           expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'AGENT_SOF';
-        totalSOFPages++;
-      } else if ((expectedPageData.category.toLowerCase().includes('master') || 
-                 expectedPageData.category.toLowerCase().includes('ship')) && 
-                (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-                 expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'MASTER_SOF';
+      const { expectedClassification } = expectedPageData;
+      if (expectedClassification !== 'OTHER') {
         totalSOFPages++;
       }
       
@@ -417,8 +413,7 @@ async function evaluateDocument(documentIndex) {
       
       // Check if classification is correct - normalize strings for comparison
       const normalizedActual = actualClassification.trim().toUpperCase();
-      const normalizedExpected = expectedClassification.trim().toUpperCase();
-      const isCorrect = normalizedActual === normalizedExpected;
+      const isCorrect = normalizedActual === expectedClassification;
       if (isCorrect) {
         correctPages++;
         if (expectedClassification !== 'OTHER') {
@@ -470,40 +465,41 @@ async function evaluateDocument(documentIndex) {
     const resultFilename = `${resultTimestamp}_evaluation_${path.basename(documentPath).replace(/[^a-zA-Z0-9]/g, '_')}.json`;
     const resultPath = path.join(resultsOutputFolder, resultFilename);
     
-    fs.writeFileSync(resultPath, JSON.stringify(summary, null, 2));
+    // The report files are written in the background while the results are printed
+    const resultWrite = fs.promises.writeFile(resultPath, JSON.stringify(summary, null, 2));
     
     // Generate markdown report
     const markdownReport = generateMarkdownReport(summary);
     const markdownPath = path.join(resultsOutputFolder, resultFilename.replace('.json', '.md'));
-    fs.writeFileSync(markdownPath, markdownReport);
+    const markdownWrite = fs.promises.writeFile(markdownPath, markdownReport);
     
-    // Generate results table
-    console.log('\n📊 Results Table:');
-    console.log('| Page | Expected | Actual | Correct |');
-    console.log('|------|----------|--------|---------|');
-    results.forEach(r => {
-      console.log(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} |`);
-    });
+    // Results tables and summary are built up and printed in a single write
+    const outputLines = ['\n📊 Results Table:', '| Page | Expected | Actual | Correct |', '|------|----------|--------|---------|'];
+    for (const r of results) {
+      outputLines.push(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} |`);
+    }
     
-    // Generate detailed results table with reasoning
-    console.log('\n📑 Detailed Results:');
-    console.log('| Page | Expected | Actual | Correct | Reasoning |');
-    console.log('|------|----------|--------|---------|-----------|');
-    results.forEach(r => {
-      console.log(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
-    });
+    // Detailed results table with reasoning
+    outputLines.push('\n📑 Detailed Results:', '| Page | Expected | Actual | Correct | Reasoning |', '|------|----------|--------|---------|-----------|');
+    for (const r of results) {
+      outputLines.push(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
+    }
     
-    // Output summary to console
-    console.log('\n📊 Evaluation Results:');
-    console.log(`  - Document: ${selectedDocumentFilename}`);
-    console.log(`  - File: ${path.basename(documentPath)}`);
-    console.log(`  - Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`\n📝 Full results saved to: ${resultPath}`);
-    console.log(`📋 Markdown report saved to: ${markdownPath}`);
+    // Summary
+    outputLines.push(
+      '\n📊 Evaluation Results:',
+      `  - Document: ${selectedDocumentFilename}`,
+      `  - File: ${path.basename(documentPath)}`,
+      `  - Pages Processed: ${totalPages}`,
+      `  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`,
+      `  - SOF Pages Detected: ${totalSOFPages}`,
+      `  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+      `\n📝 Full results saved to: ${resultPath}`,
+      `📋 Markdown report saved to: ${markdownPath}`
+    );
+    process.stdout.write(outputLines.join('\n') + '\n');
     
+    await Promise.all([resultWrite, markdownWrite]);
     return summary;
   } catch (error) {
     console.error('Error during evaluation:', error);
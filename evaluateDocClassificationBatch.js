@@ -4,7 +4,8 @@
 require('dotenv').config();
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
+const { httpClient } = require('./httpClient');
+const { getExpectedClassification, getDirectoryListing, summarizeForBatch, tallyBatchResults } = require('./evaluationUtils');
 const Papa = require('papaparse');
 const readline = require('readline');
 const { processDocument } = require('./newMistral');
@@ -86,7 +87,9 @@ function loadValidationDataset() {
     groupedByDocument[filename].push({
       pageNumber: parseInt(row.page_number),
       category: row.category,
-      subcategory: row.subcategory
+      subcategory: row.subcategory,
+      // Labelled once here rather than for every page evaluated
+      expectedClassification: getExpectedClassification(row.category, row.subcategory)
     });
   });
   
@@ -104,6 +107,11 @@ function findDocumentDirectory() {
   process.exit(1);
 }
 
+// Response parsing patterns, compiled once at load time
+const SCRATCHPAD_PATTERN = /<scratchpad>([\s\S]*?)<\/scratchpad>/i;
+const FINAL_CLASSIFICATION_PATTERN = /Final classification:\s*(\S+)/i;
+const CLASSIFICATION_LABEL_PATTERN = /AGENT_SOF|MASTER_SOF|OTHER/i;
+
 // Helper function to classify a page using Anthropic API
 async function classifyPageWithAnthropic(pageContent) {
   const systemPrompt = `You are an expert maritime document analyst specialized in classifying pages from Cargo Documents for Port Operations. Your task is to analyze a maritime document page and categorize it accurately into one of three categories: "AGENT_SOF", "MASTER_SOF", or "OTHER".
@@ -171,7 +179,7 @@ Final classification:`;
 // Only respond with one of: "AGENT_SOF", "MASTER_SOF", or "OTHER"`;
 
   try {
-    const response = await axios.post(
+    const response = await httpClient.post(
       'https://api.anthropic.com/v1/messages',
       {
         model: 'claude-3-7-sonnet-20250219',
@@ -198,19 +206,19 @@ Final classification:`;
     
     // Extract the reasoning (scratchpad content)
     let reasoning = '';
-    const scratchpadMatch = fullResponseText.match(/<scratchpad>([\s\S]*?)<\/scratchpad>/i);
+    const scratchpadMatch = SCRATCHPAD_PATTERN.exec(fullResponseText);
     if (scratchpadMatch && scratchpadMatch[1]) {
       reasoning = scratchpadMatch[1].trim();
     }
     
     // Extract the final classification (after "Final classification:")
     let classification = '';
-    const classificationMatch = fullResponseText.match(/Final classification:\s*(\S+)/i);
+    const classificationMatch = FINAL_CLASSIFICATION_PATTERN.exec(fullResponseText);
     if (classificationMatch && classificationMatch[1]) {
       classification = classificationMatch[1].trim();
     } else {
       // Fallback: look for just the classification terms
-      const typeMatch = fullResponseText.match(/(AGENT_SOF|MASTER_SOF|OTHER)/i);
+      const typeMatch = CLASSIFICATION_LABEL_PATTERN.exec(fullResponseText);
       if (typeMatch) {
         classification = typeMatch[0];
       } else {
@@ -238,16 +246,15 @@ Final classification:`;
 
 // Find a document in the Agent&MasterSOFs directory that best matches the filename
 function findBestMatchingDocument(filename, documentDir) {
-  const allFiles = fs.readdirSync(documentDir);
+  const { files: allFiles, fileSet, byLowerName } = getDirectoryListing(documentDir);
   
   // Try exact match first
-  if (allFiles.includes(filename)) {
+  if (fileSet.has(filename)) {
     return path.join(documentDir, filename);
   }
   
   // Try case-insensitive match
-  const lowerFilename = filename.toLowerCase();
-  const caseInsensitiveMatch = allFiles.find(f => f.toLowerCase() === lowerFilename);
+  const caseInsensitiveMatch = byLowerName.get(filename.toLowerCase());
   if (caseInsensitiveMatch) {
     return path.join(documentDir, caseInsensitiveMatch);
   }
@@ -347,12 +354,15 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
     let totalSOFPages = 0;
     let correctSOFPages = 0;
     
+    // Index expected pages by page number once per document
+    const expectedByPage = new Map(expectedPages.map(p => [p.pageNumber, p]));
+    
     for (let i = 0; i < ocrResponse.pages.length; i++) {
       const pageNumber = i + 1; // Convert to 1-indexed
       const pageContent = ocrResponse.pages[i].markdown || '';
       
       // Find expected classification
-      const expectedPageData = expectedPages.find(p => p.pageNumber === pageNumber);
+      const expectedPageData = expectedByPage.get(pageNumber);
       
       if (!expectedPageData) {
         console.warn(`⚠️ Page ${pageNumber} not found in validation dataset. Skipping.`);
@@ -362,17 +372,8 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
       totalPages++;
       
       // Expected classification
-      let expectedClassification = 'OTHER';
-      if (expectedPageData.category.toLowerCase().includes('agent') && 
-          (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-           expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'AGENT_SOF';
-        totalSOFPages++;
-      } else if ((expectedPageData.category.toLowerCase().includes('master') || 
-                 expectedPageData.category.toLowerCase().includes('ship')) && 
-                (expectedPageData.subcategory.toLowerCase().includes('statement of facts') || 
-                 expectedPageData.subcategory.toLowerCase().includes('sof'))) {
-        expectedClassification = 'MASTER_SOF';
+      const { expectedClassification } = expectedPageData;
+      if (expectedClassification !== 'OTHER') {
         totalSOFPages++;
       }
       
@@ -383,8 +384,7 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
       
       // Check if classification is correct - normalize strings for comparison
       const normalizedActual = actualClassification.trim().toUpperCase();
-      const normalizedExpected = expectedClassification.trim().toUpperCase();
-      const isCorrect = normalizedActual === normalizedExpected;
+      const isCorrect = normalizedActual === expectedClassification;
       if (isCorrect) {
         correctPages++;
         if (expectedClassification !== 'OTHER') {
@@ -436,31 +436,34 @@ async function evaluateDocument(documentFilename, documentDir, validationDataset
     const resultFilename = `${resultTimestamp}_evaluation_${path.basename(documentPath).replace(/[^a-zA-Z0-9]/g, '_')}.json`;
     const resultPath = path.join(resultsOutputFolder, resultFilename);
     
-    fs.writeFileSync(resultPath, JSON.stringify(summary, null, 2));
+    // The report files are written in the background while the results are printed
+    const resultWrite = fs.promises.writeFile(resultPath, JSON.stringify(summary, null, 2));
     
     // Generate markdown report
     const markdownReport = generateMarkdownReport(summary);
     const markdownPath = path.join(resultsOutputFolder, resultFilename.replace('.json', '.md'));
-    fs.writeFileSync(markdownPath, markdownReport);
-    
-    // Output summary to console
-    console.log('\n📊 Document Evaluation Results:');
-    console.log(`  - Document: ${documentFilename}`);
-    console.log(`  - File: ${path.basename(documentPath)}`);
-    console.log(`  - Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`  - Report saved to: ${markdownPath}`);
-    
-    // Generate detailed results table with reasoning
-    console.log('\n📑 Detailed Results:');
-    console.log('| Page | Expected | Actual | Correct | Reasoning |');
-    console.log('|------|----------|--------|---------|-----------|');
-    results.forEach(r => {
-      console.log(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
-    });
+    const markdownWrite = fs.promises.writeFile(markdownPath, markdownReport);
+    
+    // Output summary to console, followed by the detailed results table, in a single write
+    const summaryLines = [
+      '\n📊 Document Evaluation Results:',
+      `  - Document: ${documentFilename}`,
+      `  - File: ${path.basename(documentPath)}`,
+      `  - Pages Processed: ${totalPages}`,
+      `  - Correctly Classified Pages: ${correctPages} (${overallAccuracy.toFixed(2)}%)`,
+      `  - SOF Pages Detected: ${totalSOFPages}`,
+      `  - Correctly Classified SOF Pages: ${correctSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+      `  - Report saved to: ${markdownPath}`,
+    ];
+    
+    // Detailed results table with reasoning
+    summaryLines.push('\n📑 Detailed Results:', '| Page | Expected | Actual | Correct | Reasoning |', '|------|----------|--------|---------|-----------|');
+    for (const r of results) {
+      summaryLines.push(`| ${r.pageNumber.toString().padEnd(4)} | ${r.expectedClassification.padEnd(8)} | ${r.actualClassification.padEnd(6)} | ${r.isCorrect ? '✅' : '❌'} | ${r.reasoning || 'N/A'} |`);
+    }
+    process.stdout.write(summaryLines.join('\n') + '\n');
     
+    await Promise.all([resultWrite, markdownWrite]);
     return summary;
   } catch (error) {
     console.error('Error during evaluation:', error);
@@ -497,21 +500,8 @@ For Statement of Facts (SOF) pages specifically, it correctly identified ${summa
 }
 
 // Generate markdown report for batch evaluation
-function generateBatchReport(results, timestamp) {
-  let totalPages = 0;
-  let totalCorrectPages = 0;
-  let totalSOFPages = 0;
-  let totalCorrectSOFPages = 0;
-  
-  // Aggregate results
-  results.forEach(doc => {
-    if (doc) {
-      totalPages += doc.totalPages;
-      totalCorrectPages += doc.correctPages;
-      totalSOFPages += doc.totalSOFPages;
-      totalCorrectSOFPages += doc.correctSOFPages;
-    }
-  });
+function generateBatchReport(results, timestamp, totals) {
+  const { successfulDocs, failedDocs, totalPages, totalCorrectPages, totalSOFPages, totalCorrectSOFPages } = totals;
   
   // Calculate overall metrics
   const overallAccuracy = totalPages > 0 ? (totalCorrectPages / totalPages) * 100 : 0;
@@ -520,8 +510,8 @@ function generateBatchReport(results, timestamp) {
   const report = `# Batch Document Classification Evaluation Report
 
 ## Overview
-- **Total Documents Processed:** ${results.filter(r => r !== null).length}
-- **Total Documents Failed:** ${results.filter(r => r === null).length}
+- **Total Documents Processed:** ${successfulDocs}
+- **Total Documents Failed:** ${failedDocs}
 - **Total Pages Processed:** ${totalPages}
 - **Evaluation Date:** ${new Date().toISOString().split('T')[0]}
 
@@ -590,55 +580,45 @@ async function runBatchEvaluation() {
     
     // Process each document
     const batchResults = [];
-    const batchStartTime = Date.now();
+    const batchStartTime = process.hrtime.bigint();
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
     
     for (let i = 0; i < selectedDocuments.length; i++) {
       console.log(`\n📄 Processing document ${i + 1}/${numDocs}: ${selectedDocuments[i]}`);
       const docResult = await evaluateDocument(selectedDocuments[i], documentDir, validationDataset);
-      batchResults.push(docResult);
+      batchResults.push(summarizeForBatch(docResult));
     }
     
     // Calculate batch processing time
-    const batchEndTime = Date.now();
-    const processingTimeInMinutes = ((batchEndTime - batchStartTime) / 1000 / 60).toFixed(2);
+    const batchElapsedNs = process.hrtime.bigint() - batchStartTime;
+    const processingTimeInMinutes = (Number(batchElapsedNs) / 1e9 / 60).toFixed(2);
     
     // Generate and save batch report
     console.log('\n📊 Generating batch evaluation report...');
-    const batchReport = generateBatchReport(batchResults, timestamp);
+    const batchTotals = tallyBatchResults(batchResults);
+    const batchReport = generateBatchReport(batchResults, timestamp, batchTotals);
     const resultsOutputFolder = path.join(__dirname, 'results');
     const batchReportPath = path.join(resultsOutputFolder, `${timestamp}_batch_evaluation_report.md`);
     fs.writeFileSync(batchReportPath, batchReport);
     
     // Calculate aggregate metrics
-    let totalPages = 0;
-    let totalCorrectPages = 0;
-    let totalSOFPages = 0;
-    let totalCorrectSOFPages = 0;
-    let successfulDocs = 0;
-    
-    batchResults.forEach(doc => {
-      if (doc) {
-        successfulDocs++;
-        totalPages += doc.totalPages;
-        totalCorrectPages += doc.correctPages;
-        totalSOFPages += doc.totalSOFPages;
-        totalCorrectSOFPages += doc.correctSOFPages;
-      }
-    });
+    const { successfulDocs, totalPages, totalCorrectPages, totalSOFPages, totalCorrectSOFPages } = batchTotals;
     
     const overallAccuracy = totalPages > 0 ? (totalCorrectPages / totalPages) * 100 : 0;
     const sofAccuracy = totalSOFPages > 0 ? (totalCorrectSOFPages / totalSOFPages) * 100 : 0;
     
-    // Print summary to console
-    console.log('\n📈 Batch Evaluation Results:');
-    console.log(`  - Documents Processed: ${successfulDocs}/${numDocs}`);
-    console.log(`  - Total Pages Processed: ${totalPages}`);
-    console.log(`  - Correctly Classified Pages: ${totalCorrectPages} (${overallAccuracy.toFixed(2)}%)`);
-    console.log(`  - SOF Pages Detected: ${totalSOFPages}`);
-    console.log(`  - Correctly Classified SOF Pages: ${totalCorrectSOFPages} (${sofAccuracy.toFixed(2)}%)`);
-    console.log(`  - Processing Time: ${processingTimeInMinutes} minutes`);
-    console.log(`\n📝 Batch report saved to: ${batchReportPath}`);
+    // Print summary to console in a single write
+    const lines = [
+      '\n📈 Batch Evaluation Results:',
+      `  - Documents Processed: ${successfulDocs}/${numDocs}`,
+      `  - Total Pages Processed: ${totalPages}`,
+      `  - Correctly Classified Pages: ${totalCorrectPages} (${overallAccuracy.toFixed(2)}%)`,
+      `  - SOF Pages Detected: ${totalSOFPages}`,
+      `  - Correctly Classified SOF Pages: ${totalCorrectSOFPages} (${sofAccuracy.toFixed(2)}%)`,
+      `  - Processing Time: ${processingTimeInMinutes} minutes`,
+      `\n📝 Batch report saved to: ${batchReportPath}`,
+    ];
+    process.stdout.write(lines.join('\n') + '\n');
     
     return {
       totalDocuments: numDocs,
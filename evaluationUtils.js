@@ -0,0 +1,85 @@
+// evaluationUtils.js
+// Purpose: Helpers shared by the classification evaluation scripts
+
+const fs = require('fs');
+
+// Work out the page label a validation row expects from its category and subcategory
+function getExpectedClassification(category, subcategory) {
+  const expectedCategory = category.toLowerCase();
+  const expectedSubcategory = subcategory.toLowerCase();
+  const isSOFSubcategory = expectedSubcategory.includes('statement of facts') ||
+    expectedSubcategory.includes('sof');
+  
+  if (isSOFSubcategory && expectedCategory.includes('agent')) {
+    return 'AGENT_SOF';
+  }
+  if (isSOFSubcategory && (expectedCategory.includes('master') || expectedCategory.includes('ship'))) {
+    return 'MASTER_SOF';
+  }
+  return 'OTHER';
+}
+
+// Directory listings read once per run, keyed by directory
+const directoryListings = new Map();
+
+// List a directory's files once, indexed for exact and case-insensitive
+// lookups, instead of re-reading it for every document
+function getDirectoryListing(documentDir) {
+  let listing = directoryListings.get(documentDir);
+  if (!listing) {
+    const files = fs.readdirSync(documentDir, { withFileTypes: true })
+      .filter(entry => entry.isFile())
+      .map(entry => entry.name);
+    const byLowerName = new Map();
+    for (const file of files) {
+      const lowerName = file.toLowerCase();
+      if (!byLowerName.has(lowerName)) {
+        byLowerName.set(lowerName, file);
+      }
+    }
+    listing = { files, fileSet: new Set(files), byLowerName };
+    directoryListings.set(documentDir, listing);
+  }
+  return listing;
+}
+
+// Keep only the per-document counts the batch report needs. The page results are
+// already saved to disk per document, so they can be released here.
+function summarizeForBatch(docResult) {
+  if (!docResult) {
+    return null;
+  }
+  const { results, ...counts } = docResult;
+  return counts;
+}
+
+// Add up the per-document counts in one pass over the batch results
+function tallyBatchResults(results) {
+  const totals = {
+    successfulDocs: 0,
+    failedDocs: 0,
+    totalPages: 0,
+    totalCorrectPages: 0,
+    totalSOFPages: 0,
+    totalCorrectSOFPages: 0
+  };
+  for (const doc of results) {
+    if (!doc) {
+      totals.failedDocs++;
+      continue;
+    }
+    totals.successfulDocs++;
+    totals.totalPages += doc.totalPages;
+    totals.totalCorrectPages += doc.correctPages;
+    totals.totalSOFPages += doc.totalSOFPages;
+    totals.totalCorrectSOFPages += doc.correctSOFPages;
+  }
+  return totals;
+}
+
+module.exports = {
+  getExpectedClassification,
+  getDirectoryListing,
+  summarizeForBatch,
+  tallyBatchResults
+};
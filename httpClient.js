@@ -0,0 +1,30 @@
+// httpClient.js
+// Purpose: Shared HTTP client for the Mistral and Anthropic calls made by the evaluation scripts
+
+const http = require('http');
+const https = require('https');
+const axios = require('axios');
+
+// Pooled connections per host; keep in line with HTTP_MAX_SOCKETS in mistralProject
+const MAX_SOCKETS = parseInt(process.env.HTTP_MAX_SOCKETS || '64', 10);
+
+// Pooled sockets left idle this long are closed. Requests in flight are not cut off:
+// the agent only destroys free sockets when the timeout fires.
+const IDLE_SOCKET_TIMEOUT_MS = 60000;
+
+// Keep-alive agents shared by every request in the process, so consecutive OCR and
+// classification calls reuse open TLS connections instead of handshaking each time
+const agentOptions = {
+  keepAlive: true,
+  timeout: IDLE_SOCKET_TIMEOUT_MS,
+  maxSockets: MAX_SOCKETS,
+  maxFreeSockets: Math.max(1, Math.floor(MAX_SOCKETS / 2))
+};
+
+const httpAgent = new http.Agent(agentOptions);
+const httpsAgent = new https.Agent(agentOptions);
+
+// Axios instance bound to the shared agents
+const httpClient = axios.create({ httpAgent, httpsAgent });
+
+module.exports = { httpClient, httpAgent, httpsAgent };
@@ -0,0 +1,6 @@
+/**
+ * Type declarations for mimeTypes.js, so the root TypeScript scripts share its table
+ */
+export declare const MIME_SIGNATURES: { mimeType: string; bytes: number[]; offset: number }[];
+export declare const EXTENSION_MIME_TYPES: Record<string, string>;
+export declare function detectMimeType(fileData: Buffer, filePath: string): string;
@@ -0,0 +1,41 @@
+// mimeTypes.js
+// Purpose: Mime type detection shared by the root OCR scripts
+
+const path = require('path');
+
+// File signatures for the formats the OCR API accepts
+// (kept in sync with MIME_SIGNATURES in mistralProject/src/utils/documentUtils.ts)
+const MIME_SIGNATURES = [
+  { mimeType: 'application/pdf', bytes: [0x25, 0x50, 0x44, 0x46], offset: 0 }, // %PDF
+  { mimeType: 'image/png', bytes: [0x89, 0x50, 0x4e, 0x47], offset: 0 },
+  { mimeType: 'image/jpeg', bytes: [0xff, 0xd8, 0xff], offset: 0 },
+  { mimeType: 'image/tiff', bytes: [0x49, 0x49, 0x2a, 0x00], offset: 0 },
+  { mimeType: 'image/tiff', bytes: [0x4d, 0x4d, 0x00, 0x2a], offset: 0 },
+  { mimeType: 'image/webp', bytes: [0x57, 0x45, 0x42, 0x50], offset: 8 } // RIFF....WEBP
+];
+
+// Mime types by file extension, for files whose signature is not recognised
+const EXTENSION_MIME_TYPES = {
+  '.pdf': 'application/pdf',
+  '.png': 'image/png',
+  '.jpg': 'image/jpeg',
+  '.jpeg': 'image/jpeg',
+  '.tif': 'image/tiff',
+  '.tiff': 'image/tiff',
+  '.webp': 'image/webp'
+};
+
+// Detect the mime type from the file's leading bytes, falling back to the
+// file extension when the signature is unknown
+function detectMimeType(fileData, filePath) {
+  const match = MIME_SIGNATURES.find(({ bytes, offset }) =>
+    fileData.length >= offset + bytes.length &&
+    bytes.every((byte, i) => fileData[offset + i] === byte)
+  );
+  if (match) {
+    return match.mimeType;
+  }
+  return EXTENSION_MIME_TYPES[path.extname(filePath).toLowerCase()] || 'application/octet-stream';
+}
+
+module.exports = { MIME_SIGNATURES, EXTENSION_MIME_TYPES, detectMimeType };
@@ -1,6 +1,16 @@
 /**
  * Application configuration values
  */
+import os from 'os';
+
+// libuv's thread pool runs fs calls, crypto hashing, zlib compression and DNS lookups
+// (4 threads by default). Socket I/O for the API calls does not use it. THREAD_POOL_SIZE
+// sizes the pool when set; it only takes effect if no pooled work has started yet, so
+// setting UV_THREADPOOL_SIZE in the environment before launch is the reliable way.
+if (process.env.THREAD_POOL_SIZE && !process.env.UV_THREADPOOL_SIZE) {
+  process.env.UV_THREADPOOL_SIZE = process.env.THREAD_POOL_SIZE;
+}
+
 export const config = {
   // Anthropic API configuration
   anthropic: {
@@ -8,6 +18,8 @@ export const config = {
     model: process.env.ANTHROPIC_MODEL || 'claude-3-7-sonnet-20250219',
     maxRetries: parseInt(process.env.ANTHROPIC_MAX_RETRIES || '3', 10),
     timeout: parseInt(process.env.ANTHROPIC_TIMEOUT || '60000', 10),
+    retryDeadlineMs: parseInt(process.env.ANTHROPIC_RETRY_DEADLINE_MS || '120000', 10),
+    maxRequestsPerSecond: parseFloat(process.env.ANTHROPIC_MAX_RPS || '5'),
     baseUrl: process.env.ANTHROPIC_BASE_URL || 'https://api.anthropic.com',
     extractionMaxTokens: parseInt(process.env.EXTRACTION_MAX_TOKENS || '4000', 10)
   },
@@ -18,7 +30,16 @@ export const config = {
     model: process.env.MISTRAL_MODEL || 'mistral-large-2402',
     maxRetries: parseInt(process.env.MISTRAL_MAX_RETRIES || '3', 10),
     timeout: parseInt(process.env.MISTRAL_TIMEOUT || '60000', 10),
-    baseUrl: process.env.MISTRAL_BASE_URL || 'https://api.mistral.ai'
+    baseUrl: process.env.MISTRAL_BASE_URL || 'https://api.mistral.ai',
+    requestsPerMinute: parseInt(process.env.MISTRAL_RPM || '60', 10),
+    uploadConcurrency: parseInt(process.env.MISTRAL_UPLOAD_CONCURRENCY || '4', 10),
+    ocrConcurrency: parseInt(process.env.MISTRAL_OCR_CONCURRENCY || '2', 10)
+  },
+  
+  // Shared HTTP connection pool
+  http: {
+    maxSockets: parseInt(process.env.HTTP_MAX_SOCKETS || '64', 10),
+    maxFreeSockets: parseInt(process.env.HTTP_MAX_FREE_SOCKETS || '32', 10)
   },
   
   // Processing configuration
@@ -32,9 +53,20 @@ export const config = {
     retryDelayMs: parseInt(process.env.RETRY_DELAY_MS || '1000', 10)
   },
   
+  // PDF page rendering configuration
+  rendering: {
+    imageFormat: (process.env.IMAGE_FORMAT === 'png' ? 'png' : 'jpeg') as 'png' | 'jpeg',
+    jpegQuality: parseInt(process.env.JPEG_QUALITY || '85', 10),
+    dpi: parseInt(process.env.PDF_RENDER_DPI || '300', 10),
+    // Longest side of a rendered page in pixels; 0 renders at the full DPI
+    maxDimension: parseInt(process.env.IMAGE_MAX_DIM || '0', 10),
+    workers: parseInt(process.env.RENDER_WORKERS || String(os.cpus().length), 10)
+  },
+  
   // Classification configuration
   classification: {
     confidenceThreshold: parseFloat(process.env.CONFIDENCE_THRESHOLD || '0.7'),
+    pagesPerRequest: parseInt(process.env.CLASSIFICATION_PAGES_PER_REQUEST || '4', 10),
     minSOFTableSize: parseInt(process.env.MIN_SOF_TABLE_SIZE || '5', 10)
   },
   
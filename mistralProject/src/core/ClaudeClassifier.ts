@@ -1,6 +1,6 @@
 // Claude classification module for document type classification
 
-import axios from 'axios';
+import { httpClient } from '../utils/httpClient';
 import { MainDocumentCategory, DocumentType, PageClassification } from '../../../newMistral/pageTypes';
 import dotenv from 'dotenv';
 
@@ -63,7 +63,7 @@ ${ocrText}
     try {
       const prompt = this.createPrompt(ocrText, documentName, pageNumber);
       
-      const response = await axios.post(
+      const response = await httpClient.post(
         this.apiUrl,
         {
           model: this.model,
@@ -6,6 +6,7 @@ import { mistralOCR } from './MistralOCR';
 import { claudeClassifier } from './ClaudeClassifier';
 import { DocumentClassification, PageClassification } from '../../../newMistral/pageTypes';
 import { extractPDFPagesAsImages } from '../utils/pdfUtils';
+import { writeJsonFileSync } from '../utils/jsonWriter';
 import dotenv from 'dotenv';
 
 // Load environment variables
@@ -105,7 +106,7 @@ export class DocumentProcessor {
       
       // 4. Save result to file
       const outputPath = path.join(this.outputDir, `${documentName.replace(/\.[^/.]+$/, '')}_result.json`);
-      fs.writeFileSync(outputPath, JSON.stringify(result, null, 2));
+      writeJsonFileSync(outputPath, result);
       
       console.log(`Document processing completed for ${documentName}`);
       return result;
@@ -5,15 +5,47 @@
  * It provides functionality to process PDF documents and images using Mistral's OCR capabilities.
  */
 
+import crypto from 'crypto';
 import fs from 'fs/promises';
 import path from 'path';
-import axios from 'axios';
 import dotenv from 'dotenv';
 import { logger } from '../utils/logger';
+import { AdaptiveRateLimiter, Semaphore, runPipeline } from '../utils/concurrency';
+import { detectMimeType, MIME_EXTENSIONS } from '../utils/documentUtils';
+import { withRetry } from '../utils/errors';
+import { httpClient } from '../utils/httpClient';
+import { elapsedMs, monotonicNow } from '../utils/timing';
+import { config } from '../config';
 
 // Load environment variables
 dotenv.config();
 
+// Shared by every Mistral call in the process so the request rate adapts to 429s globally
+const mistralRateLimiter = new AdaptiveRateLimiter(config.mistral.requestsPerMinute);
+
+// Separate process-wide limits for the quick upload/sign calls and the slow OCR call,
+// so files waiting on OCR don't hold up uploads that could already be running
+const uploadSlots = new Semaphore(config.mistral.uploadConcurrency);
+const ocrSlots = new Semaphore(config.mistral.ocrConcurrency);
+
+/**
+ * Retry a Mistral API call on 429/5xx with jittered backoff, honouring Retry-After.
+ * Each attempt first waits for a token from the shared rate limiter.
+ */
+function withMistralRetry<T>(fn: () => Promise<T>): Promise<T> {
+  return withRetry(async () => {
+    await mistralRateLimiter.acquire();
+    try {
+      const result = await fn();
+      mistralRateLimiter.recordResult(false);
+      return result;
+    } catch (error: any) {
+      mistralRateLimiter.recordResult(error?.response?.status === 429);
+      throw error;
+    }
+  }, config.mistral.maxRetries, config.processing.retryDelayMs);
+}
+
 // Interface for OCR processing options
 export interface OCRProcessingOptions {
   preserveStructure?: boolean;
@@ -44,6 +76,13 @@ export interface OCRProcessingResult {
   };
 }
 
+// A file uploaded by MistralOCRProcessor, waiting for its OCR request
+interface UploadedDocument {
+  fileId: string;
+  fileName: string;
+  startTime: number;
+}
+
 // Interface for OCR result
 export interface OCRResult {
   text: string;
@@ -66,6 +105,11 @@ interface SignedUrlResponse {
   expires_at: number;
 }
 
+// Uploads keyed by SHA-256 of the file contents, so a file that has already been
+// sent to Mistral in this process (e.g. the same page in several documents) is not uploaded again
+const UPLOAD_CACHE_SIZE = 256;
+const uploadCache = new Map<string, Promise<FileUploadResponse>>();
+
 interface ExtractedPage {
   pageNumber: number;
   content: string;
@@ -79,6 +123,8 @@ interface ExtractedPage {
 export class MistralOCR {
   private apiKey: string;
   public apiBaseUrl: string;
+  // Headers for JSON requests, built once instead of on every call
+  public readonly jsonHeaders: Readonly<Record<string, string>>;
   
   constructor() {
     // Use MISTRAL_API_KEY from environment
@@ -89,6 +135,11 @@ export class MistralOCR {
       throw new Error('MISTRAL_API_KEY not set. Cannot use OCR without an API key.');
     }
     
+    this.jsonHeaders = Object.freeze({
+      'Authorization': `Bearer ${this.apiKey}`,
+      'Content-Type': 'application/json'
+    });
+    
     logger.info('Initialized Mistral OCR client');
   }
   
@@ -104,27 +155,66 @@ export class MistralOCR {
         throw new Error(`Image file not found: ${imagePath}`);
       }
       
-      const filename = path.basename(imagePath);
-      
-      // 1. Upload the file
-      const fileBuffer = await fs.readFile(imagePath);
-      const fileUploadResponse = await this.uploadFile(fileBuffer, filename);
-      
-      // 2. Get signed URL for the file
-      const signedUrlResponse = await this.getSignedUrl(fileUploadResponse.id);
-      
-      // 3. Process the file with OCR
-      const ocrResponse = await this.processDocumentUrl(signedUrlResponse.url, filename);
-      
-      return {
-        text: ocrResponse.text || '',
-        confidence: ocrResponse.confidence || 0
-      };
+      return await this.processBuffer(() => fs.readFile(imagePath), path.basename(imagePath));
     } catch (error) {
       console.error('Mistral OCR error:', error);
       throw error;
     }
   }
+  
+  /**
+   * Upload image bytes and run OCR on them. The bytes are only loaded once an
+   * upload slot is free, so queued files are not all held in memory at once.
+   */
+  private async processBuffer(loadBuffer: () => Promise<Buffer>, filename: string): Promise<OCRResult> {
+    // 1. Upload the file (skipped if the same contents were uploaded before)
+    // 2. Get signed URL for the file
+    const signedUrlResponse = await uploadSlots.run(async () => {
+      const fileBuffer = await loadBuffer();
+      const fileUploadResponse = await this.uploadFileOnce(fileBuffer, filename);
+      return this.getSignedUrl(fileUploadResponse.id);
+    });
+    
+    // 3. Process the file with OCR
+    const ocrResponse = await ocrSlots.run(() => this.processDocumentUrl(signedUrlResponse.url, filename));
+    
+    return {
+      text: ocrResponse.text || '',
+      confidence: ocrResponse.confidence || 0
+    };
+  }
+
+  /**
+   * Upload a file to Mistral API unless identical contents were already uploaded.
+   * Concurrent calls for the same contents share one upload.
+   */
+  public async uploadFileOnce(
+    fileBuffer: Buffer,
+    filename: string,
+    purpose: string = 'ocr'
+  ): Promise<FileUploadResponse> {
+    const key = `${purpose}:${crypto.createHash('sha256').update(fileBuffer).digest('hex')}`;
+    const cached = uploadCache.get(key);
+    if (cached) {
+      logger.info(`Reusing earlier upload for ${filename}`);
+      return cached;
+    }
+
+    const upload = this.uploadFile(fileBuffer, filename, purpose);
+    uploadCache.set(key, upload);
+    if (uploadCache.size > UPLOAD_CACHE_SIZE) {
+      uploadCache.delete(uploadCache.keys().next().value as string);
+    }
+
+    // Don't keep failed uploads around
+    upload.catch(() => {
+      if (uploadCache.get(key) === upload) {
+        uploadCache.delete(key);
+      }
+    });
+
+    return upload;
+  }
 
   /**
    * Upload a file to Mistral API
@@ -143,12 +233,12 @@ export class MistralOCR {
       formData.append('file', blob, filename);
       formData.append('purpose', purpose);
 
-      const response = await axios.post(`${this.apiBaseUrl}/files`, formData, {
+      const response = await withMistralRetry(() => httpClient.post(`${this.apiBaseUrl}/files`, formData, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`,
           'Content-Type': 'multipart/form-data'
         }
-      });
+      }));
 
       logger.info(`File uploaded successfully. File ID: ${response.data.id}`);
       return response.data;
@@ -176,11 +266,11 @@ export class MistralOCR {
   public async getSignedUrl(fileId: string): Promise<{ url: string }> {
     try {
       logger.info(`Getting signed URL for file ${fileId}`);
-      const response = await axios.get(`${this.apiBaseUrl}/files/${fileId}/content`, {
+      const response = await withMistralRetry(() => httpClient.get(`${this.apiBaseUrl}/files/${fileId}/content`, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`
         }
-      });
+      }));
 
       // Log detailed response information for debugging
       logger.info(`Received response with status ${response.status} and content type: ${response.headers['content-type']}`);
@@ -196,8 +286,7 @@ export class MistralOCR {
               return { url: response.data };
             }
           } else if (typeof response.data === 'object') {
-            logger.info(`Response data keys: ${JSON.stringify(Object.keys(response.data))}`);
-            logger.info(`Response data preview: ${JSON.stringify(response.data).substring(0, 150)}...`);
+            logger.debug('Response data keys', Object.keys(response.data));
           }
         }
       } catch (logError) {
@@ -294,17 +383,14 @@ export class MistralOCR {
       logger.info(`Processing OCR request for document: ${documentName}`);
       logger.info(`Request options: model=${requestBody.model}, preserve_structure=${requestBody.preserve_structure}, output_format=${requestBody.output_format}`);
 
-      const response = await axios.post(
+      const response = await withMistralRetry(() => httpClient.post(
         `${this.apiBaseUrl}/ocr`,
         requestBody,
         {
-          headers: {
-            'Authorization': `Bearer ${this.apiKey}`,
-            'Content-Type': 'application/json'
-          },
+          headers: this.jsonHeaders,
           timeout: 180000 // 3 minutes timeout for large documents
         }
-      );
+      ));
 
       logger.info(`OCR response received with status: ${response.status}`);
       
@@ -344,20 +430,26 @@ export class MistralOCR {
     console.log(`Processing base64 image with Mistral OCR: ${filename}`);
     
     try {
-      // Convert base64 to buffer
-      const imageBuffer = Buffer.from(imageBase64.replace(/^data:image\/\w+;base64,/, ''), 'base64');
-      
-      // Create temporary file
-      const tempPath = `/tmp/mistral_ocr_${Date.now()}.png`;
-      await fs.writeFile(tempPath, imageBuffer);
-      
-      // Process the file
-      const result = await this.processFile(tempPath);
+      // Split off the data URL header, if any, keeping the declared mime type
+      let declaredMimeType: string | null = null;
+      let payload = imageBase64;
+      if (imageBase64.startsWith('data:')) {
+        const commaIndex = imageBase64.indexOf(',');
+        const header = imageBase64.slice(5, commaIndex);
+        declaredMimeType = header.split(';', 1)[0] || null;
+        payload = imageBase64.slice(commaIndex + 1);
+      }
+      const imageBuffer = Buffer.from(payload, 'base64');
       
-      // Clean up
-      await fs.unlink(tempPath);
+      // Trust the bytes over the header: a JPEG labelled as PNG would otherwise be mislabelled
+      const mimeType = detectMimeType(imageBuffer) || declaredMimeType || 'image/png';
+      if (declaredMimeType && declaredMimeType !== mimeType) {
+        logger.warn(`Data URL declares ${declaredMimeType} but content is ${mimeType}: ${filename}`);
+      }
       
-      return result;
+      // Upload the decoded bytes directly rather than round-tripping them through a temp file
+      const uploadName = `mistral_ocr_${Date.now()}${MIME_EXTENSIONS[mimeType] || '.png'}`;
+      return await this.processBuffer(async () => imageBuffer, uploadName);
     } catch (error) {
       console.error('Mistral OCR error with base64 image:', error);
       throw error;
@@ -380,9 +472,10 @@ export class MistralOCRProcessor {
 
   /**
    * Create a new MistralOCRProcessor instance
+   * @param ocr OCR client to use; defaults to the shared mistralOCR instance
    */
-  constructor() {
-    this.ocr = new MistralOCR();
+  constructor(ocr: MistralOCR = mistralOCR) {
+    this.ocr = ocr;
     logger.info('MistralOCRProcessor initialized');
   }
 
@@ -393,8 +486,73 @@ export class MistralOCRProcessor {
     filePath: string,
     options: OCRProcessingOptions = {}
   ): Promise<OCRProcessingResult> {
-    const startTime = Date.now();
-    const mergedOptions = { ...this.defaultOptions, ...options };
+    try {
+      const upload = await this.uploadDocument(filePath);
+      return await this.ocrUploadedDocument(upload, options);
+    } catch (error) {
+      this.logProcessingError(error);
+      throw error;
+    }
+  }
+
+  /**
+   * Process several document files, overlapping the uploads of later files with
+   * the OCR of earlier ones. Each stage is limited to its configured concurrency,
+   * so a file is uploaded as soon as an upload slot frees up rather than waiting
+   * for whole files to finish.
+   * @param filePaths Files to process
+   * @param onDocumentDone Called once per file, as soon as it succeeds or fails
+   * @param options OCR options applied to every file
+   */
+  public async processDocuments(
+    filePaths: string[],
+    onDocumentDone: (filePath: string, result: OCRProcessingResult | null, error?: unknown) => void,
+    options: OCRProcessingOptions = {}
+  ): Promise<void> {
+    // Failures are reported through onDocumentDone, so the stages never reject
+    // and one bad file does not stop the rest of the batch
+    const report = (filePath: string, error: unknown) => {
+      this.logProcessingError(error);
+      onDocumentDone(filePath, null, error);
+      return null;
+    };
+
+    await runPipeline([...filePaths], [
+      {
+        concurrency: config.mistral.uploadConcurrency,
+        run: async (filePath: string) => {
+          try {
+            return { filePath, upload: await this.uploadDocument(filePath) };
+          } catch (error) {
+            return report(filePath, error);
+          }
+        }
+      },
+      {
+        concurrency: config.mistral.ocrConcurrency,
+        run: async (uploaded: { filePath: string; upload: UploadedDocument } | null) => {
+          if (!uploaded) {
+            return;
+          }
+          let result: OCRProcessingResult;
+          try {
+            result = await this.ocrUploadedDocument(uploaded.upload, options);
+          } catch (error) {
+            report(uploaded.filePath, error);
+            return;
+          }
+          onDocumentDone(uploaded.filePath, result);
+        }
+      }
+    ]);
+  }
+
+  /**
+   * Step 1: upload the file (skipped if the same contents were uploaded before).
+   * The file is only read once an upload slot is free.
+   */
+  private async uploadDocument(filePath: string): Promise<UploadedDocument> {
+    const startTime = monotonicNow();
     
     // Check if file exists
     try {
@@ -403,108 +561,115 @@ export class MistralOCRProcessor {
       throw new Error(`File not found: ${filePath}`);
     }
 
-    try {
-      const fileName = path.basename(filePath);
-      logger.info(`Processing document with Mistral OCR API: ${fileName}`);
-      
-      // Read the file into a buffer
+    const fileName = path.basename(filePath);
+    logger.info(`Processing document with Mistral OCR API: ${fileName}`);
+    
+    const uploadResponse = await uploadSlots.run(async () => {
       const fileBuffer = await fs.readFile(filePath);
       
-      // Get file information for logging
-      const fileSize = (await fs.stat(filePath)).size;
-      const fileSizeMB = (fileSize / (1024 * 1024)).toFixed(2);
+      // Get file information for logging (the buffer already tells us the size)
+      const fileSizeMB = (fileBuffer.length / (1024 * 1024)).toFixed(2);
       const fileExt = path.extname(filePath);
       logger.info(`File details: ${fileName}, ${fileSizeMB} MB, type: ${fileExt}`);
       
-      // Step 1: Upload the file
       logger.info(`Uploading file to Mistral API (${fileSizeMB} MB)`);
-      const uploadResponse = await this.ocr.uploadFile(fileBuffer, fileName);
-      
-      const fileId = uploadResponse.id;
-      logger.info(`File uploaded successfully with ID: ${fileId}`);
-      
-      // Step 2: Process the OCR using the file_id directly in the document object
-      logger.info(`Processing OCR with file ID: ${fileId}`);
-      const requestBody = {
-        model: "mistral-ocr-latest",
-        document: {
-          type: "file_id",
-          file_id: fileId
-        },
-        preserve_structure: mergedOptions.preserveStructure,
-        output_format: mergedOptions.outputFormat,
-        enhance_tables: mergedOptions.enhanceTablesMarkdown,
-        include_image_base64: mergedOptions.includeImageBase64
-      };
-      
-      // Log request metadata
-      logger.info(`Sending OCR request for document: ${fileName}`);
-      logger.info(`OCR request options: model=${requestBody.model}, preserve_structure=${!!options.preserveStructure}, output_format=${options.outputFormat || 'markdown'}`);
-      
-      const response = await axios.post(`${this.ocr.apiBaseUrl}/ocr`, requestBody, {
-        headers: {
-          'Authorization': `Bearer ${process.env.MISTRAL_API_KEY}`,
-          'Content-Type': 'application/json'
-        },
-        timeout: 180000 // 3 minutes timeout for large documents
-      });
-      
-      logger.info(`Received response from Mistral OCR API: status=${response.status}`);
-      const apiResponse = response.data;
-      
-      // Log response metadata but not the full content
-      if (apiResponse.pages) {
-        logger.info(`Response contains ${apiResponse.pages.length} pages`);
+      return this.ocr.uploadFileOnce(fileBuffer, fileName);
+    });
+    
+    logger.info(`File uploaded successfully with ID: ${uploadResponse.id}`);
+    return { fileId: uploadResponse.id, fileName, startTime };
+  }
+
+  /**
+   * Step 2: process the OCR using the file_id directly in the document object
+   */
+  private async ocrUploadedDocument(
+    upload: UploadedDocument,
+    options: OCRProcessingOptions
+  ): Promise<OCRProcessingResult> {
+    const { fileId, fileName, startTime } = upload;
+    const mergedOptions = { ...this.defaultOptions, ...options };
+    
+    logger.info(`Processing OCR with file ID: ${fileId}`);
+    const requestBody = {
+      model: "mistral-ocr-latest",
+      document: {
+        type: "file_id",
+        file_id: fileId
+      },
+      preserve_structure: mergedOptions.preserveStructure,
+      output_format: mergedOptions.outputFormat,
+      enhance_tables: mergedOptions.enhanceTablesMarkdown,
+      include_image_base64: mergedOptions.includeImageBase64
+    };
+    
+    // Log request metadata
+    logger.info(`Sending OCR request for document: ${fileName}`);
+    logger.info(`OCR request options: model=${requestBody.model}, preserve_structure=${!!options.preserveStructure}, output_format=${options.outputFormat || 'markdown'}`);
+    
+    const response = await ocrSlots.run(() => withMistralRetry(() => httpClient.post(`${this.ocr.apiBaseUrl}/ocr`, requestBody, {
+      headers: this.ocr.jsonHeaders,
+      timeout: 180000 // 3 minutes timeout for large documents
+    })));
+    
+    logger.info(`Received response from Mistral OCR API: status=${response.status}`);
+    const apiResponse = response.data;
+    
+    // Log response metadata but not the full content
+    if (apiResponse.pages) {
+      logger.info(`Response contains ${apiResponse.pages.length} pages`);
+    }
+    
+    // Extract pages from the response
+    const pages = this.parseOcrResponseIntoPages(apiResponse);
+    logger.info(`Extracted ${pages.length} pages from OCR response`);
+    
+    // Extract text from the response (but don't log the full text)
+    const text = pages.map(p => p.content).join('\n\n');
+    logger.info(`Total extracted text length: ${text.length} characters`);
+    
+    const processingTime = elapsedMs(startTime);
+    logger.info(`OCR processing completed in ${processingTime}ms`);
+    
+    return {
+      success: true,
+      text: text,
+      pages: pages,
+      metadata: {
+        documentName: fileName,
+        processedAt: new Date().toISOString(),
+        pageCount: pages.length,
+        processingTimeMs: processingTime,
+        apiCallCount: 2, // Upload and OCR process (no need for signed URL)
+        preprocessingMethod: 'file-id'
       }
-      
-      // Extract pages from the response
-      const pages = this.parseOcrResponseIntoPages(apiResponse);
-      logger.info(`Extracted ${pages.length} pages from OCR response`);
-      
-      // Extract text from the response (but don't log the full text)
-      const text = pages.map(p => p.content).join('\n\n');
-      logger.info(`Total extracted text length: ${text.length} characters`);
-      
-      const processingTime = Date.now() - startTime;
-      logger.info(`OCR processing completed in ${processingTime}ms`);
-      
-      return {
-        success: true,
-        text: text,
-        pages: pages,
-        metadata: {
-          documentName: fileName,
-          processedAt: new Date().toISOString(),
-          pageCount: pages.length,
-          processingTimeMs: processingTime,
-          apiCallCount: 2, // Upload and OCR process (no need for signed URL)
-          preprocessingMethod: 'file-id'
-        }
-      };
-    } catch (error: any) {
-      // Detailed error logging without including binary content
-      if (error.response) {
-        logger.error(`API Error Response - Status: ${error.response.status}`);
-        if (error.response.data) {
-          // Safely log error data
-          try {
-            const errorData = typeof error.response.data === 'string' 
-              ? error.response.data.substring(0, 500) // Limit string length
-              : JSON.stringify(error.response.data).substring(0, 500);
-            logger.error(`Error Data: ${errorData}...`);
-          } catch (e) {
-            logger.error(`Error Data: [Unable to stringify error data]`);
-          }
+    };
+  }
+
+  /**
+   * Detailed error logging without including binary content
+   */
+  private logProcessingError(error: any): void {
+    if (error.response) {
+      logger.error(`API Error Response - Status: ${error.response.status}`);
+      if (error.response.data) {
+        // Safely log error data
+        try {
+          const errorData = typeof error.response.data === 'string' 
+            ? error.response.data.substring(0, 500) // Limit string length
+            : JSON.stringify(error.response.data).substring(0, 500);
+          logger.error(`Error Data: ${errorData}...`);
+        } catch (e) {
+          logger.error(`Error Data: [Unable to stringify error data]`);
         }
-      } else if (error.request) {
-        logger.error(`No response received from API`);
-      } else {
-        logger.error(`Error setting up request: ${error.message}`);
       }
-      
-      logger.error(`Error processing document with Mistral OCR: ${error.message}`);
-      throw error;
+    } else if (error.request) {
+      logger.error(`No response received from API`);
+    } else {
+      logger.error(`Error setting up request: ${error.message}`);
     }
+    
+    logger.error(`Error processing document with Mistral OCR: ${error.message}`);
   }
 
   /**
@@ -514,7 +679,7 @@ export class MistralOCRProcessor {
     imageUrl: string,
     options: OCRProcessingOptions = {}
   ): Promise<OCRProcessingResult> {
-    const startTime = Date.now();
+    const startTime = monotonicNow();
     const mergedOptions = { ...this.defaultOptions, ...options };
     
     try {
@@ -540,16 +705,13 @@ export class MistralOCRProcessor {
       };
       
       // Log the request structure
-      logger.info(`OCR request being sent: ${JSON.stringify(requestBody)}`);
+      logger.debug('OCR request being sent', requestBody);
       
       logger.info(`Sending request to Mistral OCR API...`);
-      const response = await axios.post(`${this.ocr.apiBaseUrl}/ocr`, requestBody, {
-        headers: {
-          'Authorization': `Bearer ${process.env.MISTRAL_API_KEY}`,
-          'Content-Type': 'application/json'
-        },
+      const response = await ocrSlots.run(() => withMistralRetry(() => httpClient.post(`${this.ocr.apiBaseUrl}/ocr`, requestBody, {
+        headers: this.ocr.jsonHeaders,
         timeout: 60000 // 1 minute timeout for image processing
-      });
+      })));
       
       logger.info(`Received response from Mistral OCR API`);
       const apiResponse = response.data;
@@ -576,7 +738,7 @@ export class MistralOCRProcessor {
           documentName: new URL(imageUrl).pathname.split('/').pop() || 'image',
           processedAt: new Date().toISOString(),
           pageCount: pages.length,
-          processingTimeMs: Date.now() - startTime,
+          processingTimeMs: elapsedMs(startTime),
           apiCallCount: 1
         }
       };
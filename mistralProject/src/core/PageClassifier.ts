@@ -5,6 +5,7 @@ import { AnthropicClient } from '../utils/AnthropicClient';
 import { logger } from '../utils/logger';
 import emojiLogger from '../utils/emojiLogger';
 import { config } from '../config';
+import { elapsedMs, monotonicNow } from '../utils/timing';
 import path from 'path';
 import { 
   PageClassificationResult, 
@@ -68,44 +69,80 @@ export class PageClassifier {
   ): Promise<ClassifiedDocument> {
     emojiLogger.classify(`Classifying ${pages.length} pages for document ${documentId}`);
     
-    const results: PageClassificationResult[] = [];
+    const results: PageClassificationResult[] = new Array(pages.length);
     const sofPages: number[] = [];
     const nonSofPages: number[] = [];
     
-    // Process pages in sequence (could be parallel in production)
-    for (let i = 0; i < pages.length; i++) {
-      try {
-        emojiLogger.progress(i+1, pages.length, `Classifying page of document ${path.basename(documentId)}`);
-        
-        // Get classification with confidence score
-        const { isSOFPage, confidence } = await this.classifySinglePage(pages[i], i);
-        
-        // Record result
-        results.push({
-          pageIndex: i,
-          isSOFPage,
-          pageContent: pages[i],
-          confidence
-        });
-        
-        // Track page type
-        if (isSOFPage) {
-          sofPages.push(i);
-          emojiLogger.success(`Page ${i+1} classified as SOF with confidence ${(confidence || 0).toFixed(3)}`);
-        } else {
-          nonSofPages.push(i);
-          emojiLogger.info(`Page ${i+1} classified as non-SOF with confidence ${(confidence || 0).toFixed(3)}`);
+    // Repeated pages (blank backs, identical cover sheets) are classified once
+    const { uniquePages, duplicateOf } = this.findDuplicatePages(pages);
+    if (duplicateOf.size > 0) {
+      emojiLogger.info(`Skipping ${duplicateOf.size} duplicate pages in document ${path.basename(documentId)}`);
+    }
+    
+    // Small pages are sent several to a request; oversized ones always go alone
+    const batches = this.groupPagesIntoBatches(pages, uniquePages);
+    let classifiedCount = 0;
+    
+    for (const batch of batches) {
+      emojiLogger.progress(classifiedCount + batch.length, uniquePages.length, `Classifying page of document ${path.basename(documentId)}`);
+      
+      let batchResults: Array<{ classification: string; confidence: number } | null> = [];
+      if (batch.length > 1) {
+        try {
+          batchResults = await this.client.classifyContentBatch(batch.map(i => pages[i]));
+        } catch (error) {
+          emojiLogger.warn(`Batch classification failed, classifying pages individually:`, error);
+        }
+      }
+      
+      for (let b = 0; b < batch.length; b++) {
+        const i = batch[b];
+        try {
+          // Use the batched answer when there is one, otherwise classify the page on its own
+          const batchResult = batchResults[b];
+          const { isSOFPage, confidence } = batchResult
+            ? this.applyConfidenceThreshold(batchResult.classification === 'SOF_PAGE', batchResult.confidence, i)
+            : await this.classifySinglePage(pages[i], i);
+          
+          // Record result
+          results[i] = {
+            pageIndex: i,
+            isSOFPage,
+            pageContent: pages[i],
+            confidence
+          };
+          
+          if (isSOFPage) {
+            emojiLogger.success(`Page ${i+1} classified as SOF with confidence ${(confidence || 0).toFixed(3)}`);
+          } else {
+            emojiLogger.info(`Page ${i+1} classified as non-SOF with confidence ${(confidence || 0).toFixed(3)}`);
+          }
+        } catch (error) {
+          emojiLogger.error(`Error classifying page ${i}:`, error);
+          // On error, mark as not an SOF page to be safe
+          results[i] = {
+            pageIndex: i,
+            isSOFPage: false,
+            pageContent: pages[i],
+            error: String(error)
+          };
         }
-      } catch (error) {
-        emojiLogger.error(`Error classifying page ${i}:`, error);
-        // On error, mark as not an SOF page to be safe
-        results.push({
-          pageIndex: i,
-          isSOFPage: false,
-          pageContent: pages[i],
-          error: String(error)
-        });
-        nonSofPages.push(i);
+      }
+      
+      classifiedCount += batch.length;
+    }
+    
+    // Duplicate pages take the result of the first page with the same text
+    for (const [i, original] of duplicateOf) {
+      results[i] = { ...results[original], pageIndex: i, pageContent: pages[i] };
+    }
+    
+    // Track page types in page order
+    for (const result of results) {
+      if (result.isSOFPage) {
+        sofPages.push(result.pageIndex);
+      } else {
+        nonSofPages.push(result.pageIndex);
       }
     }
     
@@ -129,7 +166,7 @@ export class PageClassifier {
     pageIndex: number
   ): Promise<{ isSOFPage: boolean; confidence?: number }> {
     try {
-      const startTime = Date.now();
+      const startTime = monotonicNow();
       emojiLogger.apiCall(`Classifying page ${pageIndex + 1}`);
       
       // Request classification with confidence
@@ -137,30 +174,14 @@ export class PageClassifier {
         confidenceRequired: true 
       });
       
-      const responseTime = Date.now() - startTime;
+      const responseTime = elapsedMs(startTime);
       emojiLogger.apiResponse(`Received classification for page ${pageIndex + 1}`, responseTime);
       
-      const isSOFPage = result.classification === 'SOF_PAGE';
-      const confidence = result.confidence || 0.5;
-      
-      // Determine if we should accept the classification based on confidence
-      let finalClassification = isSOFPage;
-      if (confidence < this.confidenceThreshold) {
-        // If confidence is low, be conservative about SOF pages
-        // (better to include a non-SOF page than miss an SOF page)
-        finalClassification = isSOFPage && confidence > 0.3;
-        
-        emojiLogger.warn(`Low confidence (${confidence.toFixed(3)}) classification for page ${pageIndex}: ` +
-                    `${isSOFPage ? 'SOF' : 'non-SOF'} → ${finalClassification ? 'SOF' : 'non-SOF'}`);
-      } else {
-        emojiLogger.debug(`Page ${pageIndex} classified as ${isSOFPage ? 'SOF' : 'non-SOF'} ` +
-                    `with confidence ${confidence.toFixed(3)}`);
-      }
-      
-      return { 
-        isSOFPage: finalClassification, 
-        confidence 
-      };
+      return this.applyConfidenceThreshold(
+        result.classification === 'SOF_PAGE',
+        result.confidence || 0.5,
+        pageIndex
+      );
     } catch (error) {
       emojiLogger.error(`Classification error for page ${pageIndex}:`, error);
       // Default to not an SOF page on error
@@ -168,6 +189,87 @@ export class PageClassifier {
     }
   }
   
+  /**
+   * Finds pages whose text matches an earlier page once whitespace is normalized.
+   * Returns the indices of the first occurrences and, for every repeat, the index
+   * of the page it duplicates.
+   */
+  private findDuplicatePages(pages: string[]): { uniquePages: number[]; duplicateOf: Map<number, number> } {
+    const firstPageByText = new Map<string, number>();
+    const uniquePages: number[] = [];
+    const duplicateOf = new Map<number, number>();
+    
+    for (let i = 0; i < pages.length; i++) {
+      const key = pages[i].replace(/\s+/g, ' ').trim();
+      const original = firstPageByText.get(key);
+      if (original === undefined) {
+        firstPageByText.set(key, i);
+        uniquePages.push(i);
+      } else {
+        duplicateOf.set(i, original);
+      }
+    }
+    
+    return { uniquePages, duplicateOf };
+  }
+  
+  /**
+   * Groups page indices into batches of up to `pagesPerRequest` pages.
+   * Pages larger than `maxPageChunkSize` characters are placed in a batch of their own.
+   */
+  private groupPagesIntoBatches(pages: string[], pageIndices: number[]): number[][] {
+    const pagesPerRequest = Math.max(1, config.classification.pagesPerRequest);
+    const maxBatchChars = config.processing.maxPageChunkSize;
+    const batches: number[][] = [];
+    let current: number[] = [];
+    let currentChars = 0;
+    
+    for (const i of pageIndices) {
+      const pageChars = pages[i].length;
+      if (current.length > 0 &&
+          (current.length >= pagesPerRequest || currentChars + pageChars > maxBatchChars)) {
+        batches.push(current);
+        current = [];
+        currentChars = 0;
+      }
+      current.push(i);
+      currentChars += pageChars;
+    }
+    if (current.length > 0) {
+      batches.push(current);
+    }
+    
+    return batches;
+  }
+  
+  /**
+   * Applies the confidence threshold to a raw classification
+   */
+  private applyConfidenceThreshold(
+    isSOFPage: boolean,
+    confidence: number,
+    pageIndex: number
+  ): { isSOFPage: boolean; confidence: number } {
+    // Determine if we should accept the classification based on confidence
+    let finalClassification = isSOFPage;
+    if (confidence < this.confidenceThreshold) {
+      // If confidence is low, be conservative about SOF pages
+      // (better to include a non-SOF page than miss an SOF page)
+      finalClassification = isSOFPage && confidence > 0.3;
+      
+      emojiLogger.warn(`Low confidence (${confidence.toFixed(3)}) classification for page ${pageIndex}: ` +
+                  `${isSOFPage ? 'SOF' : 'non-SOF'} → ${finalClassification ? 'SOF' : 'non-SOF'}`);
+    } else {
+      emojiLogger.debug(`Page ${pageIndex} classified as ${isSOFPage ? 'SOF' : 'non-SOF'} ` +
+                  `with confidence ${confidence.toFixed(3)}`);
+    }
+    
+    return { 
+      isSOFPage: finalClassification, 
+      confidence 
+    };
+  }
+  
   /**
    * Analyzes the classification results to find contiguous blocks of SOF pages
    * This is useful for maintaining context when processing multi-page SOF tables
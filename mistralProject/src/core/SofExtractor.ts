@@ -32,8 +32,8 @@ export class SofExtractor {
   private anthropicClient: AnthropicClient;
   private batchProcessor: BatchProcessor<ClassifiedPage[], SofAiExtractResult>;
   
-  constructor() {
-    this.anthropicClient = new AnthropicClient();
+  constructor(client?: AnthropicClient) {
+    this.anthropicClient = client || new AnthropicClient();
     
     // Create batch processor for handling extraction tasks
     this.batchProcessor = new BatchProcessor<ClassifiedPage[], SofAiExtractResult>(
@@ -11,9 +11,12 @@ import { ClassificationMetrics, ClassificationResult } from './metrics/Classific
 import { PromptManager, PromptTemplate } from '../../../../newMistral/SOFClassification';
 import { ApiCostTracker, ApiProvider, ModelType } from './utils/ApiCostTracker';
 import { ReportGenerator, EvaluationReport } from './reports/ReportGenerator';
-import { MistralOCRProcessor } from '../../core/MistralOCR';
+import { MistralOCRProcessor, OCRProcessingResult } from '../../core/MistralOCR';
 import { PageClassifier } from '../../core/PageClassifier';
 import { AnthropicClient } from '../../utils/AnthropicClient';
+import { BoundedQueue, Semaphore } from '../../utils/concurrency';
+import { elapsedMs, monotonicNow } from '../../utils/timing';
+import { writeJsonFileSync } from '../../utils/jsonWriter';
 import { config } from '../../config';
 import readline from 'readline';
 
@@ -34,6 +37,28 @@ export interface EvaluationOptions {
   promptName?: string;
 }
 
+/**
+ * A page that has been through OCR and is waiting to be classified
+ */
+interface PreparedPage {
+  /** Position of the page in the evaluated dataset */
+  index: number;
+  entry: PageDataEntry;
+  pageContent: string;
+  ocrTime: number;
+  startTime: number;
+  error?: unknown;
+}
+
+/**
+ * Per-type counts of the pages classified so far, kept current as results arrive
+ */
+interface ResultTallies {
+  totalByType: Record<PageType, number>;
+  correctByType: Record<PageType, number>;
+  correctPredictions: number;
+}
+
 export interface EvaluationResult {
   report: EvaluationReport;
   reportPath: string;
@@ -70,6 +95,7 @@ export class ClassificationEvaluator {
    */
   async runEvaluation(options: EvaluationOptions): Promise<EvaluationResult> {
     const startTime = Date.now();
+    const runStartTime = monotonicNow();
     emojiLogger.startPhase(`Evaluation with model: ${options.ocrModel}`);
     
     // Load prompt template - Fix to handle undefined promptName
@@ -144,8 +170,15 @@ export class ClassificationEvaluator {
       logger.info(`Created ${sampleFiles.length} sample files for testing`);
     }
     
-    // Check if file paths exist and create mock data if needed
-    const nonExistingPaths = validationData.filter(entry => !fs.existsSync(entry.filePath));
+    // Check if file paths exist and create mock data if needed. Every page of a
+    // document shares its path, so each distinct path is checked only once.
+    const missingPaths = new Set<string>();
+    for (const filePath of new Set(validationData.map(entry => entry.filePath))) {
+      if (!fs.existsSync(filePath)) {
+        missingPaths.add(filePath);
+      }
+    }
+    const nonExistingPaths = validationData.filter(entry => missingPaths.has(entry.filePath));
     if (nonExistingPaths.length > 0) {
       logger.warn(`Warning: ${nonExistingPaths.length} file paths in the validation dataset don't exist.`);
       logger.warn('Creating mock data for evaluation purposes...');
@@ -184,10 +217,10 @@ export class ClassificationEvaluator {
     if (options.maxDocuments && options.maxDocuments > 0) {
       // Get unique document paths
       const uniqueDocumentPaths = Array.from(new Set(filteredData.map(entry => entry.filePath)));
-      const limitedDocumentPaths = uniqueDocumentPaths.slice(0, options.maxDocuments);
+      const limitedDocumentPaths = new Set(uniqueDocumentPaths.slice(0, options.maxDocuments));
       
       // Filter entries to only include those from the limited documents
-      filteredData = filteredData.filter(entry => limitedDocumentPaths.includes(entry.filePath));
+      filteredData = filteredData.filter(entry => limitedDocumentPaths.has(entry.filePath));
     }
     
     // Initialize clients
@@ -206,45 +239,117 @@ export class ClassificationEvaluator {
     emojiLogger.info(`Processing ${filteredData.length} pages for evaluation`);
     
     const concurrency = options.concurrencyLevel || 1;
-    const results: ClassificationResult[] = [];
+    // Results are stored by dataset position, so reports and metrics keep the page
+    // order whatever order the pages finish in
+    const pageResults: Array<ClassificationResult | null> = new Array(filteredData.length).fill(null);
+    let completedCount = 0;
+    // The partial CSV is appended in completion order; it only becomes the final
+    // CSV if that happened to be dataset order
+    let lastCompletedIndex = -1;
+    let completedInOrder = true;
+    const totalBatches = Math.ceil(filteredData.length / concurrency);
+    const intermediateResultsFile = `intermediate_results_${startTime}.jsonl`;
+    // Detailed CSV rows are written as pages complete, then the file is renamed
+    // after the report once its id is known
+    const partialResultsCsvFile = `results_${startTime}.partial.csv`;
+    const tallies: ResultTallies = {
+      totalByType: { [PageType.AGENT_SOF]: 0, [PageType.MASTER_SOF]: 0, [PageType.OTHER]: 0 },
+      correctByType: { [PageType.AGENT_SOF]: 0, [PageType.MASTER_SOF]: 0, [PageType.OTHER]: 0 },
+      correctPredictions: 0,
+    };
     
-    // Process in batches based on concurrency
-    for (let i = 0; i < filteredData.length; i += concurrency) {
-      const batch = filteredData.slice(i, i + concurrency);
-      
-      // Log progress with batch number and emoji indicators
-      const batchNumber = Math.floor(i / concurrency) + 1;
-      const totalBatches = Math.ceil(filteredData.length / concurrency);
-      emojiLogger.progress(
-        batchNumber, 
-        totalBatches, 
-        `Processing batch with ${batch.length} pages`
-      );
-      
-      // Process batch in parallel
-      const batchResults = await Promise.all(
-        batch.map(entry => this.classifySinglePage(entry, pageClassifier, mistralOcr, promptTemplate))
-      );
-      
-      // Add results
-      results.push(...batchResults.filter(r => r !== null) as ClassificationResult[]);
-      
-      // Add to metrics
-      this.metrics.addResults(batchResults.filter(r => r !== null) as ClassificationResult[]);
-      
-      // Display real-time stats after each batch
-      if (batchNumber % 1 === 0 || batchNumber === totalBatches) {
-        this.displayRealTimeStats(batchNumber, totalBatches, filteredData.length, results);
+    // OCR pages ahead of classification, but hold at most 2 x concurrency
+    // OCR'd pages in memory while the classifiers catch up
+    const preparedPages = new BoundedQueue<PreparedPage>(2 * concurrency);
+    const ocrSlots = new Semaphore(concurrency);
+    
+    // Pages of the same document share one OCR request, including one still in
+    // flight. A document's result is dropped once its last page is prepared.
+    const documentOcr = new Map<string, Promise<OCRProcessingResult>>();
+    const pagesLeftByDocument = new Map<string, number>();
+    for (const entry of filteredData) {
+      pagesLeftByDocument.set(entry.filePath, (pagesLeftByDocument.get(entry.filePath) || 0) + 1);
+    }
+    const releaseDocumentOcr = (filePath: string) => {
+      const pagesLeft = (pagesLeftByDocument.get(filePath) || 1) - 1;
+      pagesLeftByDocument.set(filePath, pagesLeft);
+      if (pagesLeft === 0) {
+        documentOcr.delete(filePath);
       }
-      
-      // Save intermediate results if requested
-      if (options.saveIntermediateResults) {
-        this.reportGenerator.saveDetailedResultsCsv(
-          results,
-          `intermediate_results_${Date.now()}.csv`
-        );
+    };
+    
+    const producer = (async () => {
+      const pending: Promise<void>[] = [];
+      // Failures are caught as each page is queued and rethrown once all are settled,
+      // so none is left as an unhandled rejection while the loop is still running
+      let failure: unknown;
+      let failed = false;
+      try {
+        for (const [index, entry] of filteredData.entries()) {
+          await ocrSlots.acquire();
+          pending.push(
+            this.preparePage(index, entry, mistralOcr, documentOcr)
+              .then(prepared => {
+                releaseDocumentOcr(entry.filePath);
+                return preparedPages.put(prepared);
+              })
+              .catch(error => {
+                if (!failed) {
+                  failed = true;
+                  failure = error;
+                }
+              })
+              .finally(() => ocrSlots.release())
+          );
+        }
+        await Promise.all(pending);
+        if (failed) {
+          throw failure;
+        }
+      } finally {
+        preparedPages.close();
       }
-    }
+    })();
+    
+    const consumers = Array.from({ length: concurrency }, async () => {
+      let prepared: PreparedPage | undefined;
+      while ((prepared = await preparedPages.get()) !== undefined) {
+        const result = await this.classifySinglePage(prepared, pageClassifier, promptTemplate);
+        if (!result) {
+          continue;
+        }
+        
+        pageResults[prepared.index] = result;
+        completedCount++;
+        if (prepared.index < lastCompletedIndex) {
+          completedInOrder = false;
+        }
+        lastCompletedIndex = prepared.index;
+        tallies.totalByType[result.actualType]++;
+        if (result.isCorrect) {
+          tallies.correctByType[result.actualType]++;
+          tallies.correctPredictions++;
+        }
+        
+        // Persist each result as it completes rather than rewriting the full set
+        this.reportGenerator.appendDetailedResultCsv(result, partialResultsCsvFile);
+        if (options.saveIntermediateResults) {
+          this.reportGenerator.appendResultJsonl(result, intermediateResultsFile);
+        }
+        
+        // Report progress once per `concurrency` completed pages
+        if (completedCount % concurrency === 0 || completedCount === filteredData.length) {
+          const batchNumber = Math.ceil(completedCount / concurrency);
+          emojiLogger.progress(batchNumber, totalBatches, `Classified ${completedCount} pages`);
+          this.displayRealTimeStats(batchNumber, totalBatches, filteredData.length, completedCount, tallies);
+        }
+      }
+    });
+    
+    await Promise.all([producer, ...consumers]);
+    
+    const results = pageResults.filter((result): result is ClassificationResult => result !== null);
+    this.metrics.addResults(results);
     
     // Generate metrics summary
     const metricsSummary = this.metrics.generateSummary();
@@ -254,15 +359,16 @@ export class ClassificationEvaluator {
     const successRate = this.costTracker.calculateSuccessRate();
     
     // Calculate overall performance metrics
-    const totalProcessingTime = Date.now() - startTime;
+    const totalProcessingTime = elapsedMs(runStartTime);
     
     // Create dataset info
+    const pageTypeCounts = this.countPageTypes(filteredData);
     const datasetInfo = {
       name: options.validationFile || 'default',
       totalSamples: filteredData.length,
-      agentSofSamples: filteredData.filter(e => e.pageType === PageType.AGENT_SOF).length,
-      masterSofSamples: filteredData.filter(e => e.pageType === PageType.MASTER_SOF).length,
-      otherSamples: filteredData.filter(e => e.pageType === PageType.OTHER).length,
+      agentSofSamples: pageTypeCounts[PageType.AGENT_SOF],
+      masterSofSamples: pageTypeCounts[PageType.MASTER_SOF],
+      otherSamples: pageTypeCounts[PageType.OTHER],
     };
     
     // Get cost information
@@ -287,7 +393,7 @@ export class ClassificationEvaluator {
       {
         averageResponseTimeMs: averageResponseTime,
         successRate: successRate,
-        totalProcessingTimeMs: Date.now() - startTime,
+        totalProcessingTimeMs: elapsedMs(runStartTime),
       },
       {
         includeDetailedResults: options.includeDetailedResults,
@@ -301,9 +407,11 @@ export class ClassificationEvaluator {
     const reportPath = this.reportGenerator.saveReportJson(report);
     
     // Save detailed results CSV
-    const detailedResultsPath = this.reportGenerator.saveDetailedResultsCsv(
+    const detailedResultsPath = this.reportGenerator.completeDetailedResultsCsv(
       results,
-      `results_${report.id}.csv`
+      partialResultsCsvFile,
+      `results_${report.id}.csv`,
+      completedInOrder
     );
     
     // Save confusion matrix
@@ -324,10 +432,7 @@ export class ClassificationEvaluator {
           `api_costs_${report.id}.json`
         );
         
-        fs.writeFileSync(
-          apiCostsPath,
-          JSON.stringify(this.costTracker.getApiCallRecords(), null, 2)
-        );
+        writeJsonFileSync(apiCostsPath, this.costTracker.getApiCallRecords());
         
         logger.info(`Saved API cost tracking to: ${apiCostsPath}`);
       } catch (error) {
@@ -366,14 +471,12 @@ export class ClassificationEvaluator {
     console.log(`🔄 Max concurrency: ${options.concurrencyLevel || 1}`);
     
     // Distribution of page types
-    const agentSofCount = data.filter(e => e.pageType === PageType.AGENT_SOF).length;
-    const masterSofCount = data.filter(e => e.pageType === PageType.MASTER_SOF).length;
-    const otherCount = data.filter(e => e.pageType === PageType.OTHER).length;
+    const pageTypeCounts = this.countPageTypes(data);
     
     console.log(`📊 Page type distribution:`);
-    console.log(`   - AGENT_SOF: ${agentSofCount}`);
-    console.log(`   - MASTER_SOF: ${masterSofCount}`);
-    console.log(`   - OTHER: ${otherCount}`);
+    console.log(`   - AGENT_SOF: ${pageTypeCounts[PageType.AGENT_SOF]}`);
+    console.log(`   - MASTER_SOF: ${pageTypeCounts[PageType.MASTER_SOF]}`);
+    console.log(`   - OTHER: ${pageTypeCounts[PageType.OTHER]}`);
     
     console.log('================================\n');
   }
@@ -493,9 +596,12 @@ export class ClassificationEvaluator {
   private displayDetailedResultsTable(results: ClassificationResult[]): void {
     if (results.length === 0) return;
     
-    console.log('\n📋 DETAILED RESULTS:');
-    console.log(`${'FILENAME'.padEnd(40)} | ${'PREDICTED'.padEnd(20)} | ${'EXPECTED'.padEnd(20)} | ${'CORRECT'.padEnd(10)} | ${'TIME (ms)'.padEnd(10)} | ${'COST ($)'.padEnd(10)}`);
-    console.log('-'.repeat(120));
+    // The table is built up and printed in a single write
+    const tableLines = [
+      '\n📋 DETAILED RESULTS:',
+      `${'FILENAME'.padEnd(40)} | ${'PREDICTED'.padEnd(20)} | ${'EXPECTED'.padEnd(20)} | ${'CORRECT'.padEnd(10)} | ${'TIME (ms)'.padEnd(10)} | ${'COST ($)'.padEnd(10)}`,
+      '-'.repeat(120),
+    ];
     
     // Display the first 10 results for readability
     const displayResults = results.slice(0, 10);
@@ -508,13 +614,14 @@ export class ClassificationEvaluator {
       const time = (result.processingTimeMs?.toFixed(2) || 'N/A').padEnd(10);
       const cost = ('$' + (result.apiCost?.toFixed(6) || '0.000000')).padEnd(10);
       
-      console.log(`${filename} | ${predicted} | ${expected} | ${correct} | ${time} | ${cost}`);
+      tableLines.push(`${filename} | ${predicted} | ${expected} | ${correct} | ${time} | ${cost}`);
     }
     
     // If there are more results, show a message
     if (results.length > 10) {
-      console.log(`... and ${results.length - 10} more results (see CSV report for full details)`);
+      tableLines.push(`... and ${results.length - 10} more results (see CSV report for full details)`);
     }
+    process.stdout.write(tableLines.join('\n') + '\n');
   }
   
   /**
@@ -605,86 +712,108 @@ export class ClassificationEvaluator {
   }
 
   /**
-   * Process and classify a single page (with enhanced logging)
+   * Run OCR for a single page ahead of classification
    */
-  private async classifySinglePage(
+  private async preparePage(
+    index: number,
     entry: PageDataEntry,
-    pageClassifier: PageClassifier,
     mistralOcr: MistralOCRProcessor,
-    prompt: PromptTemplate
-  ): Promise<ClassificationResult | null> {
-    // Prepare result object
-    const result: ClassificationResult = {
-      id: `${path.basename(entry.filePath)}_page${entry.pageIndex + 1}`,
-      filePath: entry.filePath,
-      pageIndex: entry.pageIndex,
-      actualType: entry.pageType,
-      predictedType: PageType.OTHER,
-      isCorrect: false,
-      confidence: 0,
-      processingTime: 0,
-      ocrTime: 0,
-      classificationTime: 0,
-      error: null,
-      pageContent: '',
-      tokens: {
-        input: 0,
-        output: 0
-      }
-    };
+    documentOcr: Map<string, Promise<OCRProcessingResult>>
+  ): Promise<PreparedPage> {
+    const startTime = monotonicNow();
+    const filename = path.basename(entry.filePath);
+    
+    // Check if file exists before processing
+    if (!fs.existsSync(entry.filePath)) {
+      return {
+        index,
+        entry,
+        pageContent: '',
+        ocrTime: 0,
+        startTime,
+        error: new Error(`File does not exist at path: ${entry.filePath}`),
+      };
+    }
+    
+    // 1. Get the page content through OCR
+    emojiLogger.info(`🔎 OCR Processing: ${filename} page ${entry.pageIndex + 1}`);
+    
+    let pageContent = '';
+    let ocrTime = 0;
     
     try {
-      // Check if file exists before processing
-      if (!fs.existsSync(entry.filePath)) {
-        throw new Error(`File does not exist at path: ${entry.filePath}`);
+      // Check file extension
+      const fileExt = path.extname(entry.filePath).toLowerCase();
+      if (!['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif', '.webp'].includes(fileExt)) {
+        throw new Error(`File type not supported for OCR: ${fileExt}. Only PDF and image files are supported.`);
       }
       
-      const startTime = Date.now();
-      const filename = path.basename(entry.filePath);
+      const ocrStartTime = monotonicNow();
       
-      // 1. Get the page content through OCR
-      emojiLogger.info(`🔎 OCR Processing: ${filename} page ${entry.pageIndex + 1}`);
+      // Process the document with Mistral OCR (or wait for another page's request)
+      const ocrResult = await this.ocrDocumentOnce(entry.filePath, mistralOcr, documentOcr);
       
-      let pageContent = '';
+      ocrTime = elapsedMs(ocrStartTime);
       
-      try {
-        // Check file extension
-        const fileExt = path.extname(entry.filePath).toLowerCase();
-        if (!['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif', '.webp'].includes(fileExt)) {
-          throw new Error(`File type not supported for OCR: ${fileExt}. Only PDF and image files are supported.`);
-        }
-        
-        const ocrStartTime = Date.now();
-        
-        // Process the document with Mistral OCR
-        const ocrResult = await mistralOcr.processDocument(entry.filePath, {
-          preserveStructure: true,
-          outputFormat: 'markdown'
-        });
-        
-        const ocrDuration = Date.now() - ocrStartTime;
-        result.ocrTime = ocrDuration;
+      // Get the content for the specific page
+      if (ocrResult && ocrResult.pages && ocrResult.pages[entry.pageIndex]) {
+        pageContent = ocrResult.pages[entry.pageIndex].content || '';
+        emojiLogger.info(`📄 Got text content: ${pageContent.length} characters`);
+      } else {
+        emojiLogger.warn(`⚠️ No OCR content for ${filename} page ${entry.pageIndex + 1}`);
+      }
+    } catch (error) {
+      emojiLogger.warn(`OCR failed for ${filename} page ${entry.pageIndex + 1}: ${error}`);
+      
+      // Instead of returning null, create a simple mock text content
+      // This allows the evaluation to continue even when OCR fails
+      pageContent = `Mock content for ${filename} generated due to OCR failure.
+This is a placeholder to allow the evaluation to continue.
+The file appears to be a ${entry.pageType} document.
+Generated at ${new Date().toISOString()}.`;
+      
+      emojiLogger.info(`Using mock content for failed OCR: ${pageContent.length} characters`);
+    }
+    
+    return { index, entry, pageContent, ocrTime, startTime };
+  }
+
+  /**
+   * OCR a document at most once per run. Concurrent pages of the same document
+   * await the request that is already in flight instead of sending their own.
+   */
+  private ocrDocumentOnce(
+    filePath: string,
+    mistralOcr: MistralOCRProcessor,
+    documentOcr: Map<string, Promise<OCRProcessingResult>>
+  ): Promise<OCRProcessingResult> {
+    const cached = documentOcr.get(filePath);
+    if (cached) {
+      return cached;
+    }
+    
+    const ocrStartTime = monotonicNow();
+    const pending = mistralOcr.processDocument(filePath, {
+      preserveStructure: true,
+      outputFormat: 'markdown'
+    }).then(
+      ocrResult => {
+        const ocrDuration = elapsedMs(ocrStartTime);
         
         // Record the OCR API call
         const ocrRecord = this.costTracker.recordMistralOcrCall(
-          1, // Just count one page
+          ocrResult?.pages?.length || 1,
           ocrDuration,
           true,
           {
-            documentId: entry.filePath,
+            documentId: filePath,
           }
         );
         
         emojiLogger.apiCallSuccess('Mistral OCR', 'mistral-ocr-latest', ocrDuration, ocrRecord.cost);
-        
-        // Get the content for the specific page
-        if (ocrResult && ocrResult.pages && ocrResult.pages[entry.pageIndex]) {
-          pageContent = ocrResult.pages[entry.pageIndex].content || '';
-          emojiLogger.info(`📄 Got text content: ${pageContent.length} characters`);
-        } else {
-          emojiLogger.warn(`⚠️ No OCR content for ${filename} page ${entry.pageIndex + 1}`);
-        }
-      } catch (error) {
+        return ocrResult;
+      },
+      error => {
         const errorMessage = String(error);
         emojiLogger.apiCallFailure('Mistral OCR', 'mistral-ocr-latest', errorMessage);
         
@@ -694,26 +823,40 @@ export class ClassificationEvaluator {
           0,
           false,
           {
-            documentId: entry.filePath,
+            documentId: filePath,
             errorMessage: errorMessage,
           }
         );
-        
-        // Instead of returning null, create a simple mock text content
-        // This allows the evaluation to continue even when OCR fails
-        pageContent = `Mock content for ${filename} generated due to OCR failure.
-This is a placeholder to allow the evaluation to continue.
-The file appears to be a ${entry.pageType} document.
-Generated at ${new Date().toISOString()}.`;
-        
-        emojiLogger.info(`Using mock content for failed OCR: ${pageContent.length} characters`);
+        throw error;
+      }
+    );
+    
+    documentOcr.set(filePath, pending);
+    return pending;
+  }
+
+  /**
+   * Classify a page that has already been through OCR (with enhanced logging)
+   */
+  private async classifySinglePage(
+    prepared: PreparedPage,
+    pageClassifier: PageClassifier,
+    prompt: PromptTemplate
+  ): Promise<ClassificationResult | null> {
+    const { entry, pageContent, startTime } = prepared;
+    const filename = path.basename(entry.filePath);
+    const actualType = entry.pageType;
+    
+    try {
+      if (prepared.error) {
+        throw prepared.error;
       }
       
       // 3. Classify with Claude
       emojiLogger.info(`🔄 Classifying: ${filename} page ${entry.pageIndex + 1}`);
       
       // Create a modified client to use the specific prompt
-      const classificatonStartTime = Date.now();
+      const classificatonStartTime = monotonicNow();
       let classificatonResult;
       let predictedType: PageType;
       let confidence = 0;
@@ -745,7 +888,7 @@ Generated at ${new Date().toISOString()}.`;
         confidence = classificatonResult.confidence || 0.5;
         success = true;
         
-        const classificationDuration = Date.now() - classificatonStartTime;
+        const classificationDuration = elapsedMs(classificatonStartTime);
         
         // Record the Claude API call
         const claudeRecord = this.costTracker.recordClaudeCall(
@@ -772,7 +915,7 @@ Generated at ${new Date().toISOString()}.`;
           ModelType.CLAUDE_3_7_SONNET,
           pageContent.length / 4, // Rough token estimate
           0, // No completion tokens on error
-          Date.now() - classificatonStartTime,
+          elapsedMs(classificatonStartTime),
           false,
           {
             errorMessage,
@@ -789,7 +932,7 @@ Generated at ${new Date().toISOString()}.`;
       }
       
       // Create the result
-      const totalDuration = Date.now() - startTime;
+      const totalDuration = elapsedMs(startTime);
       const result: ClassificationResult = {
         filePath: entry.filePath,
         pageIndex: entry.pageIndex,
@@ -817,7 +960,7 @@ Generated at ${new Date().toISOString()}.`;
         actualType: entry.pageType,
         predictedType: PageType.OTHER, // Default to OTHER for errors
         confidence: 0.1,
-        processingTimeMs: Date.now() - startTime,
+        processingTimeMs: elapsedMs(startTime),
         apiCost: 0,
         isCorrect: entry.pageType === PageType.OTHER, // Only correct if actual type is OTHER
       };
@@ -841,49 +984,36 @@ Generated at ${new Date().toISOString()}.`;
     batchNumber: number, 
     totalBatches: number, 
     totalSamples: number,
-    completedResults: ClassificationResult[]
+    completedCount: number,
+    tallies: ResultTallies
   ): void {
     const stats = this.costTracker.getRealtimeStatsSummary();
-    const completionPercentage = (completedResults.length / totalSamples) * 100;
-    
-    // Calculate metrics for completed results
-    const correctPredictions = completedResults.filter(r => r.isCorrect).length;
-    const accuracy = completedResults.length > 0 ? correctPredictions / completedResults.length : 0;
+    const completionPercentage = (completedCount / totalSamples) * 100;
+    const { totalByType, correctByType, correctPredictions } = tallies;
+    const accuracy = completedCount > 0 ? correctPredictions / completedCount : 0;
     
     emojiLogger.summarySection(`Real-time Stats (Batch ${batchNumber}/${totalBatches})`);
     
     // Use progress bar for completion percentage
-    emojiLogger.progressBar(completedResults.length, totalSamples, 'Overall Progress:');
+    emojiLogger.progressBar(completedCount, totalSamples, 'Overall Progress:');
     
     // Use result summary for accuracy
     emojiLogger.resultSummary(
       correctPredictions, 
-      completedResults.length, 
-      `(${completedResults.length} pages processed)`
+      completedCount, 
+      `(${completedCount} pages processed)`
     );
     
     // Display detailed class breakdown
-    if (completedResults.length > 0) {
-      const agentSofCorrect = completedResults.filter(r => 
-        r.isCorrect && r.actualType === PageType.AGENT_SOF
-      ).length;
-      const agentSofTotal = completedResults.filter(r => 
-        r.actualType === PageType.AGENT_SOF
-      ).length;
+    if (completedCount > 0) {
+      const agentSofCorrect = correctByType[PageType.AGENT_SOF];
+      const agentSofTotal = totalByType[PageType.AGENT_SOF];
       
-      const masterSofCorrect = completedResults.filter(r => 
-        r.isCorrect && r.actualType === PageType.MASTER_SOF
-      ).length;
-      const masterSofTotal = completedResults.filter(r => 
-        r.actualType === PageType.MASTER_SOF
-      ).length;
+      const masterSofCorrect = correctByType[PageType.MASTER_SOF];
+      const masterSofTotal = totalByType[PageType.MASTER_SOF];
       
-      const otherCorrect = completedResults.filter(r => 
-        r.isCorrect && r.actualType === PageType.OTHER
-      ).length;
-      const otherTotal = completedResults.filter(r => 
-        r.actualType === PageType.OTHER
-      ).length;
+      const otherCorrect = correctByType[PageType.OTHER];
+      const otherTotal = totalByType[PageType.OTHER];
       
       if (agentSofTotal > 0) {
         emojiLogger.info(`   • AGENT_SOF: ${agentSofCorrect}/${agentSofTotal} correct (${(agentSofCorrect/agentSofTotal*100).toFixed(1)}%)`);
@@ -909,6 +1039,17 @@ Generated at ${new Date().toISOString()}.`;
     console.log('--------------------------------------');
   }
 
+  /**
+   * Count entries of each page type in a single pass
+   */
+  private countPageTypes(entries: PageDataEntry[]): Record<PageType, number> {
+    const counts: Record<PageType, number> = { [PageType.AGENT_SOF]: 0, [PageType.MASTER_SOF]: 0, [PageType.OTHER]: 0 };
+    for (const entry of entries) {
+      counts[entry.pageType]++;
+    }
+    return counts;
+  }
+
   /**
    * Ensure a directory exists, creating it if needed
    */
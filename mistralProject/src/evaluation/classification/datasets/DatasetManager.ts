@@ -14,6 +14,14 @@ export enum PageType {
   OTHER = 'OTHER',
 }
 
+// Page type labels read from a dataset file are swapped for these shared values,
+// so every row holds the same string instead of its own parsed copy
+const PAGE_TYPE_VALUES = new Map<string, PageType>(Object.values(PageType).map(type => [type, type]));
+
+function toPageType(label: string): PageType {
+  return PAGE_TYPE_VALUES.get(label) ?? label as PageType;
+}
+
 export interface PageDataEntry {
   filePath: string;
   pageIndex: number;
@@ -64,18 +72,25 @@ export class DatasetManager {
       // Base path for resolving relative file paths
       const basePath = process.cwd(); 
 
+      // Every page of a document repeats its file path, so rows share one resolved path
+      const resolvedPaths = new Map<string, string>();
+
       // Convert to strongly typed array
       this.validationData = (parsed.data as any[]).map(row => {
         // Resolve relative file paths
-        let resolvedPath = row.filePath;
-        if (resolvedPath.startsWith('..') || resolvedPath.startsWith('./')) {
-          resolvedPath = path.resolve(basePath, resolvedPath);
+        let resolvedPath = resolvedPaths.get(row.filePath);
+        if (resolvedPath === undefined) {
+          resolvedPath = row.filePath as string;
+          if (resolvedPath.startsWith('..') || resolvedPath.startsWith('./')) {
+            resolvedPath = path.resolve(basePath, resolvedPath);
+          }
+          resolvedPaths.set(row.filePath, resolvedPath);
         }
 
         return {
           filePath: resolvedPath,
           pageIndex: parseInt(row.pageIndex),
-          pageType: row.pageType as PageType,
+          pageType: toPageType(row.pageType),
           notes: row.notes,
         };
       });
@@ -257,19 +272,27 @@ export class DatasetManager {
       // Base path for resolving relative file paths
       const basePath = process.cwd();
 
+      // Every page of a document repeats its file path, so rows share one resolved path
+      const resolvedPaths = new Map<string, string>();
+      const notes = `Loaded from page-level dataset: ${filePath}`;
+
       // Convert to strongly typed array
       this.validationData = (parsed.data as any[]).map(row => {
         // Resolve relative file paths
-        let resolvedPath = row.filePath;
-        if (!path.isAbsolute(resolvedPath)) {
-          resolvedPath = path.resolve(basePath, resolvedPath);
+        let resolvedPath = resolvedPaths.get(row.filePath);
+        if (resolvedPath === undefined) {
+          resolvedPath = row.filePath as string;
+          if (!path.isAbsolute(resolvedPath)) {
+            resolvedPath = path.resolve(basePath, resolvedPath);
+          }
+          resolvedPaths.set(row.filePath, resolvedPath);
         }
 
         return {
           filePath: resolvedPath,
           pageIndex: parseInt(row.pageNumber) - 1, // Convert 1-indexed to 0-indexed
-          pageType: row.classification as PageType,
-          notes: `Loaded from page-level dataset: ${filePath}`,
+          pageType: toPageType(row.classification),
+          notes,
         };
       });
 
@@ -342,32 +365,45 @@ export class DatasetManager {
                lowerSubcategory.includes('sof');
       };
 
+      // Build file path - try to find in common directories
+      const docsDirs = [
+        path.join(process.cwd(), 'Agent&MasterSOFs'),
+        path.join(process.cwd(), 'mistralProject', 'Agent&MasterSOFs')
+      ];
+      
+      // Every page of a document shares one row filename, so resolve each file once
+      const resolvedPaths = new Map<string, string>();
+      const resolveDocumentPath = (originalFilename: string): string => {
+        let filePath = resolvedPaths.get(originalFilename);
+        if (filePath !== undefined) {
+          return filePath;
+        }
+        
+        filePath = '';
+        for (const docsDir of docsDirs) {
+          const possiblePath = path.join(docsDir, originalFilename);
+          if (fs.existsSync(possiblePath)) {
+            filePath = possiblePath;
+            break;
+          }
+        }
+        
+        // If not found, use the original filename as a relative path
+        if (!filePath) {
+          filePath = path.join('Agent&MasterSOFs', originalFilename);
+        }
+        
+        resolvedPaths.set(originalFilename, filePath);
+        return filePath;
+      };
+
       // Convert to strongly typed array
       this.validationData = (parsed.data as any[])
         .filter(row => isSOFPage(row.subcategory)) // Only include SOF pages
         .map(row => {
           // Replace quotes if present in the filename
           const originalFilename = row.original_filename.replace(/"/g, '');
-          
-          // Build file path - try to find in common directories
-          const docsDirs = [
-            path.join(process.cwd(), 'Agent&MasterSOFs'),
-            path.join(process.cwd(), 'mistralProject', 'Agent&MasterSOFs')
-          ];
-          
-          let filePath = '';
-          for (const docsDir of docsDirs) {
-            const possiblePath = path.join(docsDir, originalFilename);
-            if (fs.existsSync(possiblePath)) {
-              filePath = possiblePath;
-              break;
-            }
-          }
-          
-          // If not found, use the original filename as a relative path
-          if (!filePath) {
-            filePath = path.join('Agent&MasterSOFs', originalFilename);
-          }
+          const filePath = resolveDocumentPath(originalFilename);
           
           return {
             filePath,
@@ -378,9 +414,18 @@ export class DatasetManager {
         });
 
       // Log distribution of page types
-      const agentPages = this.validationData.filter(entry => entry.pageType === PageType.AGENT_SOF).length;
-      const masterPages = this.validationData.filter(entry => entry.pageType === PageType.MASTER_SOF).length;
-      const otherPages = this.validationData.filter(entry => entry.pageType === PageType.OTHER).length;
+      let agentPages = 0;
+      let masterPages = 0;
+      let otherPages = 0;
+      for (const entry of this.validationData) {
+        if (entry.pageType === PageType.AGENT_SOF) {
+          agentPages++;
+        } else if (entry.pageType === PageType.MASTER_SOF) {
+          masterPages++;
+        } else {
+          otherPages++;
+        }
+      }
       
       logger.info(`Loaded ${this.validationData.length} validation entries from ${filePath}`);
       logger.info(`Page type distribution: AGENT_SOF: ${agentPages}, MASTER_SOF: ${masterPages}, OTHER: ${otherPages}`);
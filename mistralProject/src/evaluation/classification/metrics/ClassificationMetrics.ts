@@ -41,6 +41,16 @@ export interface MetricsSummary {
 export class ClassificationMetrics {
   private results: ClassificationResult[] = [];
   private confusionMatrix: ConfusionMatrix = {};
+  // Running totals kept up to date by addResult, so the summary never rescans the results
+  private correctCount = 0;
+  private predictedCounts: { [type: string]: number } = {};
+  private actualCounts: { [type: string]: number } = {};
+  private truePositiveCounts: { [type: string]: number } = {};
+  private confidenceSum = 0;
+  private confidenceCount = 0;
+  private processingTimeSum = 0;
+  private processingTimeCount = 0;
+  private apiCostTotal = 0;
   private allTypes: PageType[] = [
     PageType.AGENT_SOF,
     PageType.MASTER_SOF,
@@ -73,16 +83,41 @@ export class ClassificationMetrics {
     // Set isCorrect property
     const isCorrect = result.actualType === result.predictedType;
     
-    // Record the result
-    this.results.push({
-      ...result,
+    // Record the result. Rows that already carry the right flag (as the evaluator's
+    // do) are shared rather than copied; others get a copy with one fixed field layout.
+    this.results.push(result.isCorrect === isCorrect ? result : {
+      filePath: result.filePath,
+      pageIndex: result.pageIndex,
+      actualType: result.actualType,
+      predictedType: result.predictedType,
+      confidence: result.confidence,
+      processingTimeMs: result.processingTimeMs,
+      apiCost: result.apiCost,
       isCorrect,
+      retryCount: result.retryCount,
     });
     
     // Update confusion matrix
     if (this.confusionMatrix[result.actualType]) {
       this.confusionMatrix[result.actualType][result.predictedType]++;
     }
+    
+    // Update running totals
+    if (isCorrect) {
+      this.correctCount++;
+      this.truePositiveCounts[result.actualType] = (this.truePositiveCounts[result.actualType] || 0) + 1;
+    }
+    this.predictedCounts[result.predictedType] = (this.predictedCounts[result.predictedType] || 0) + 1;
+    this.actualCounts[result.actualType] = (this.actualCounts[result.actualType] || 0) + 1;
+    if (result.confidence !== undefined) {
+      this.confidenceSum += result.confidence || 0;
+      this.confidenceCount++;
+    }
+    if (result.processingTimeMs !== undefined) {
+      this.processingTimeSum += result.processingTimeMs || 0;
+      this.processingTimeCount++;
+    }
+    this.apiCostTotal += result.apiCost || 0;
   }
 
   /**
@@ -98,25 +133,15 @@ export class ClassificationMetrics {
   calculateAccuracy(): number {
     if (this.results.length === 0) return 0;
     
-    const correctCount = this.results.filter(r => r.isCorrect).length;
-    return correctCount / this.results.length;
+    return this.correctCount / this.results.length;
   }
 
   /**
    * Calculate precision for a specific class (true positives / predicted positives)
    */
   calculatePrecision(targetType: PageType): number {
-    let predictedAsTarget = 0;
-    let truePositives = 0;
-    
-    for (const result of this.results) {
-      if (result.predictedType === targetType) {
-        predictedAsTarget++;
-        if (result.actualType === targetType) {
-          truePositives++;
-        }
-      }
-    }
+    const predictedAsTarget = this.predictedCounts[targetType] || 0;
+    const truePositives = this.truePositiveCounts[targetType] || 0;
     
     return predictedAsTarget > 0 ? truePositives / predictedAsTarget : 0;
   }
@@ -125,17 +150,8 @@ export class ClassificationMetrics {
    * Calculate recall for a specific class (true positives / actual positives)
    */
   calculateRecall(targetType: PageType): number {
-    let actualAsTarget = 0;
-    let truePositives = 0;
-    
-    for (const result of this.results) {
-      if (result.actualType === targetType) {
-        actualAsTarget++;
-        if (result.predictedType === targetType) {
-          truePositives++;
-        }
-      }
-    }
+    const actualAsTarget = this.actualCounts[targetType] || 0;
+    const truePositives = this.truePositiveCounts[targetType] || 0;
     
     return actualAsTarget > 0 ? truePositives / actualAsTarget : 0;
   }
@@ -155,36 +171,32 @@ export class ClassificationMetrics {
    * Calculate average confidence across all results
    */
   calculateAverageConfidence(): number {
-    const validResults = this.results.filter(r => r.confidence !== undefined);
-    if (validResults.length === 0) return 0;
+    if (this.confidenceCount === 0) return 0;
     
-    const sum = validResults.reduce((total, r) => total + (r.confidence || 0), 0);
-    return sum / validResults.length;
+    return this.confidenceSum / this.confidenceCount;
   }
 
   /**
    * Calculate average processing time across all results
    */
   calculateAverageProcessingTime(): number {
-    const validResults = this.results.filter(r => r.processingTimeMs !== undefined);
-    if (validResults.length === 0) return 0;
+    if (this.processingTimeCount === 0) return 0;
     
-    const sum = validResults.reduce((total, r) => total + (r.processingTimeMs || 0), 0);
-    return sum / validResults.length;
+    return this.processingTimeSum / this.processingTimeCount;
   }
 
   /**
    * Calculate total API cost across all results
    */
   calculateTotalApiCost(): number {
-    return this.results.reduce((total, r) => total + (r.apiCost || 0), 0);
+    return this.apiCostTotal;
   }
 
   /**
    * Generate a complete metrics summary
    */
   generateSummary(): MetricsSummary {
-    const correctCount = this.results.filter(r => r.isCorrect).length;
+    const correctCount = this.correctCount;
     const accuracy = this.calculateAccuracy();
     
     // Calculate precision, recall, and F1 for each class
@@ -240,6 +252,15 @@ export class ClassificationMetrics {
    */
   clear(): void {
     this.results = [];
+    this.correctCount = 0;
+    this.predictedCounts = {};
+    this.actualCounts = {};
+    this.truePositiveCounts = {};
+    this.confidenceSum = 0;
+    this.confidenceCount = 0;
+    this.processingTimeSum = 0;
+    this.processingTimeCount = 0;
+    this.apiCostTotal = 0;
     this.initializeConfusionMatrix();
   }
 } 
\ No newline at end of file
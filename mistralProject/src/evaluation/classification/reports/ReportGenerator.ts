@@ -7,11 +7,25 @@ import path from 'path';
 import Papa from 'papaparse';
 import { logger } from '../../../utils/logger';
 import emojiLogger from '../../../utils/emojiLogger';
+import { readJsonFileSync, readJsonLinesFileSync, writeJsonFileSync, writeJsonLinesFileSync } from '../../../utils/jsonWriter';
 import { ClassificationResult, MetricsSummary } from '../metrics/ClassificationMetrics';
 import { ApiCallRecord } from '../utils/ApiCostTracker';
 import { PageType } from '../datasets/DatasetManager';
 import { PromptTemplate } from '../../../../../newMistral/SOFClassification';
 
+// Rows formatted per write when saving detailed results to CSV
+const CSV_WRITE_BATCH_SIZE = 500;
+
+// Suffix of the JSON Lines file that holds a report's API call records
+const API_CALLS_FILE_SUFFIX = '.api_calls.jsonl';
+
+/**
+ * Path of the API call records file that sits next to a report JSON file
+ */
+function apiCallsFilePath(reportFilePath: string): string {
+  return reportFilePath.replace(/\.json$/, '') + API_CALLS_FILE_SUFFIX;
+}
+
 export interface EvaluationReport {
   id: string;
   name: string;
@@ -48,6 +62,22 @@ export interface EvaluationReport {
   apiCallRecords?: ApiCallRecord[];
 }
 
+/**
+ * Format a classification result as a detailed results CSV row
+ */
+function toCsvRow(result: ClassificationResult): Record<string, string | number> {
+  return {
+    filePath: result.filePath,
+    pageIndex: result.pageIndex,
+    actualType: result.actualType,
+    predictedType: result.predictedType,
+    isCorrect: result.isCorrect ? 'Yes' : 'No',
+    confidence: result.confidence?.toFixed(3) || 'N/A',
+    processingTimeMs: result.processingTimeMs || 'N/A',
+    apiCost: result.apiCost?.toFixed(6) || 'N/A',
+  };
+}
+
 export class ReportGenerator {
   private reportPath: string;
   
@@ -134,7 +164,8 @@ export class ReportGenerator {
   }
   
   /**
-   * Save a report to JSON
+   * Save a report to JSON. API call records are only read by tooling, so they go to a
+   * compact JSON Lines file next to the report instead of being indented into it.
    */
   saveReportJson(report: EvaluationReport, filename?: string): string {
     try {
@@ -144,7 +175,11 @@ export class ReportGenerator {
       // Ensure report directory exists
       this.ensureDirectoryExists(path.dirname(filePath));
       
-      fs.writeFileSync(filePath, JSON.stringify(report, null, 2), 'utf8');
+      const { apiCallRecords, ...reportBody } = report;
+      writeJsonFileSync(filePath, reportBody);
+      if (apiCallRecords && apiCallRecords.length > 0) {
+        writeJsonLinesFileSync(apiCallsFilePath(filePath), apiCallRecords);
+      }
       emojiLogger.success(`Saved evaluation report to ${filePath}`);
       
       return filePath;
@@ -166,20 +201,22 @@ export class ReportGenerator {
       // Ensure report directory exists
       this.ensureDirectoryExists(path.dirname(filePath));
       
-      // Format for CSV
-      const csvData = results.map(result => ({
-        filePath: result.filePath,
-        pageIndex: result.pageIndex,
-        actualType: result.actualType,
-        predictedType: result.predictedType,
-        isCorrect: result.isCorrect ? 'Yes' : 'No',
-        confidence: result.confidence?.toFixed(3) || 'N/A',
-        processingTimeMs: result.processingTimeMs || 'N/A',
-        apiCost: result.apiCost?.toFixed(6) || 'N/A',
-      }));
-      
-      const csv = Papa.unparse(csvData);
-      fs.writeFileSync(filePath, csv, 'utf8');
+      // Format and write the CSV a batch of rows at a time, so large runs never
+      // hold every formatted row and the whole CSV text at once
+      const fd = fs.openSync(filePath, 'w');
+      try {
+        for (let start = 0; start < results.length; start += CSV_WRITE_BATCH_SIZE) {
+          const csvData = results.slice(start, start + CSV_WRITE_BATCH_SIZE).map(toCsvRow);
+          
+          // Only the first batch carries the header row
+          const csv = start === 0
+            ? Papa.unparse(csvData)
+            : '\r\n' + Papa.unparse(csvData, { header: false });
+          fs.writeSync(fd, csv);
+        }
+      } finally {
+        fs.closeSync(fd);
+      }
       
       emojiLogger.success(`Saved ${results.length} detailed results to CSV: ${filePath}`);
       return filePath;
@@ -189,6 +226,71 @@ export class ReportGenerator {
     }
   }
   
+  /**
+   * Append one result to a JSON Lines file as soon as it completes, so an
+   * interrupted run keeps every page classified so far
+   * @returns Path of the JSON Lines file
+   */
+  appendResultJsonl(result: ClassificationResult, filename: string): string {
+    const filePath = path.join(this.reportPath, filename);
+    
+    try {
+      this.ensureDirectoryExists(path.dirname(filePath));
+      fs.appendFileSync(filePath, JSON.stringify(result) + '\n', 'utf8');
+    } catch (error) {
+      emojiLogger.error(`Error appending result to ${filePath}: ${error}`);
+    }
+    
+    return filePath;
+  }
+  
+  /**
+   * Append one result to a detailed results CSV as soon as it completes. The header
+   * row is written when the file is first created, so the output matches
+   * saveDetailedResultsCsv and an interrupted run keeps every row written so far.
+   * @returns Path of the CSV file
+   */
+  appendDetailedResultCsv(result: ClassificationResult, filename: string): string {
+    const filePath = path.join(this.reportPath, filename);
+    
+    try {
+      this.ensureDirectoryExists(path.dirname(filePath));
+      const csv = fs.existsSync(filePath)
+        ? '\r\n' + Papa.unparse([toCsvRow(result)], { header: false })
+        : Papa.unparse([toCsvRow(result)]);
+      fs.appendFileSync(filePath, csv, 'utf8');
+    } catch (error) {
+      emojiLogger.error(`Error appending result to ${filePath}: ${error}`);
+    }
+    
+    return filePath;
+  }
+  
+  /**
+   * Give a CSV built with appendDetailedResultCsv its final name. If no row was
+   * appended, or the rows were appended in a different order from `results`, the
+   * results are written out in full instead and the partial file is removed.
+   * @returns Path of the detailed results CSV
+   */
+  completeDetailedResultsCsv(
+    results: ClassificationResult[],
+    partialFilename: string,
+    filename: string,
+    partialInOrder = true
+  ): string {
+    const partialPath = path.join(this.reportPath, partialFilename);
+    if (!partialInOrder || !fs.existsSync(partialPath)) {
+      const filePath = this.saveDetailedResultsCsv(results, filename);
+      fs.rmSync(partialPath, { force: true });
+      return filePath;
+    }
+    
+    const filePath = path.join(this.reportPath, filename);
+    fs.renameSync(partialPath, filePath);
+    emojiLogger.success(`Saved ${results.length} detailed results to CSV: ${filePath}`);
+    return filePath;
+  }
+  
   /**
    * Generate a confusion matrix CSV
    */
@@ -280,8 +382,7 @@ export class ReportGenerator {
         return null;
       }
       
-      const reportJson = fs.readFileSync(reportPath, 'utf8');
-      const report = JSON.parse(reportJson) as EvaluationReport;
+      const report = this.readReportFile(reportPath);
       
       emojiLogger.info(`Loaded report: ${report.name}`);
       return report;
@@ -304,8 +405,7 @@ export class ReportGenerator {
       const reports: EvaluationReport[] = [];
       for (const file of files) {
         try {
-          const reportJson = fs.readFileSync(path.join(this.reportPath, file), 'utf8');
-          const report = JSON.parse(reportJson) as EvaluationReport;
+          const report = this.readReportFile(path.join(this.reportPath, file));
           reports.push(report);
         } catch (e) {
           emojiLogger.warn(`Error loading report file ${file}: ${e}`);
@@ -323,6 +423,20 @@ export class ReportGenerator {
     }
   }
   
+  /**
+   * Read a report JSON file, reattaching the API call records saved alongside it
+   */
+  private readReportFile(reportPath: string): EvaluationReport {
+    const report = readJsonFileSync<EvaluationReport>(reportPath);
+    
+    const callsPath = apiCallsFilePath(reportPath);
+    if (fs.existsSync(callsPath)) {
+      report.apiCallRecords = readJsonLinesFileSync<ApiCallRecord>(callsPath);
+    }
+    
+    return report;
+  }
+  
   /**
    * Ensure a directory exists, creating it if needed
    */
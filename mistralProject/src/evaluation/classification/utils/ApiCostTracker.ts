@@ -6,6 +6,7 @@ import fs from 'fs';
 import path from 'path';
 import { logger } from '../../../utils/logger';
 import emojiLogger from '../../../utils/emojiLogger';
+import { writeJsonFileSync } from '../../../utils/jsonWriter';
 
 export enum ApiProvider {
   ANTHROPIC = 'anthropic',
@@ -274,19 +275,15 @@ export class ApiCostTracker {
    * Calculate total tokens (Claude only)
    */
   calculateTotalTokens(): { promptTokens: number, completionTokens: number, totalTokens: number } {
-    const claudeRecords = this.records.filter(
-      record => record.provider === ApiProvider.ANTHROPIC
-    );
-    
-    const promptTokens = claudeRecords.reduce(
-      (total, record) => total + (record.promptTokens || 0), 
-      0
-    );
+    let promptTokens = 0;
+    let completionTokens = 0;
     
-    const completionTokens = claudeRecords.reduce(
-      (total, record) => total + (record.completionTokens || 0), 
-      0
-    );
+    for (const record of this.records) {
+      if (record.provider === ApiProvider.ANTHROPIC) {
+        promptTokens += record.promptTokens || 0;
+        completionTokens += record.completionTokens || 0;
+      }
+    }
     
     return {
       promptTokens,
@@ -332,7 +329,7 @@ export class ApiCostTracker {
       const recordsFilename = filename || `api_cost_records_${timestamp}.json`;
       const filePath = path.join(this.savePath, recordsFilename);
       
-      fs.writeFileSync(filePath, JSON.stringify({
+      writeJsonFileSync(filePath, {
         records: this.records,
         summary: {
           totalCost: this.calculateTotalCost(),
@@ -345,7 +342,7 @@ export class ApiCostTracker {
           recordCount: this.records.length,
           timestamp: new Date().toISOString(),
         }
-      }, null, 2), 'utf8');
+      });
       
       emojiLogger.success(`Saved ${this.records.length} API call records to ${filePath}`);
       return true;
@@ -395,17 +392,27 @@ export class ApiCostTracker {
     successRate: number,
     avgResponseTime: number
   } {
+    // Called after every batch, so gather everything in a single pass over the records
     const totalCalls = this.records.length;
-    const successfulCalls = this.records.filter(r => r.success).length;
-    const failedCalls = totalCalls - successfulCalls;
+    let successfulCalls = 0;
+    let totalCost = 0;
+    let totalDuration = 0;
+    
+    for (const record of this.records) {
+      if (record.success) {
+        successfulCalls++;
+      }
+      totalCost += record.cost;
+      totalDuration += record.durationMs;
+    }
     
     return {
       totalCalls,
       successfulCalls,
-      failedCalls,
-      totalCost: this.calculateTotalCost(),
-      successRate: this.calculateSuccessRate(),
-      avgResponseTime: this.calculateAverageResponseTime()
+      failedCalls: totalCalls - successfulCalls,
+      totalCost,
+      successRate: totalCalls > 0 ? successfulCalls / totalCalls : 0,
+      avgResponseTime: totalCalls > 0 ? totalDuration / totalCalls : 0
     };
   }
 } 
\ No newline at end of file
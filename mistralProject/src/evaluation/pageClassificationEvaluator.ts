@@ -6,7 +6,7 @@ import * as path from 'path';
 import * as fs from 'fs';
 import { promises as fsPromises } from 'fs';
 import { logger } from '../utils/logger';
-import emojiLogger, { getNumberEmoji } from '../utils/emojiLogger';
+import emojiLogger from '../utils/emojiLogger';
 import { DatasetManager, PageDataEntry, PageType } from './classification/datasets/DatasetManager';
 import { ClassificationMetrics, ClassificationResult } from './classification/metrics/ClassificationMetrics';
 import { PromptManager } from '../../../newMistral/SOFClassification';
@@ -16,8 +16,14 @@ import { MistralOCRProcessor } from '../core/MistralOCR';
 import { PageClassifier } from '../core/PageClassifier';
 import { AnthropicClient } from '../utils/AnthropicClient';
 import { config } from '../config';
+import { Semaphore } from '../utils/concurrency';
+import { elapsedMs, monotonicNow } from '../utils/timing';
 import { getUserInput } from '../utils/readlineUtils';
 
+// Runs with more results than this only print the detailed results table with --verbose;
+// the full table is always in the saved report and CSV
+const DETAILED_TABLE_MAX_ROWS = 50;
+
 // Define available models for selection
 const availableModels = {
   ocr: [
@@ -172,82 +178,81 @@ async function runPageClassificationEvaluation(): Promise<void> {
     
     // Step 7: Process and classify pages
     console.log('\n🚀 Starting page classification processing...\n');
-    const results: ClassificationResult[] = [];
-    
-    // Process in batches based on concurrency
-    for (let i = 0; i < pagesToTest.length; i += concurrencyLevel) {
-      const batch = pagesToTest.slice(i, i + concurrencyLevel);
-      
-      // Log progress with batch number and emoji indicators
-      const batchNumber = Math.floor(i / concurrencyLevel) + 1;
-      const totalBatches = Math.ceil(pagesToTest.length / concurrencyLevel);
-      
-      console.log(`${getNumberEmoji(batchNumber)} of ${getNumberEmoji(totalBatches)} Processing batch with ${batch.length} pages`);
-      
-      // Process batch in parallel
-      const batchPromises = batch.map(entry => {
-        const filename = path.basename(entry.filePath);
-        console.log(`🔍 Processing: ${filename} page ${entry.pageIndex + 1}`);
-        
-        return processPage(entry, pageClassifier, mistralOcr, promptTemplate);
-      });
-      
-      const batchResults = await Promise.all(batchPromises);
-      
-      // Add results
-      results.push(...batchResults.filter(r => r !== null) as ClassificationResult[]);
+    // Results are stored by dataset position, so output keeps the dataset order
+    // whatever order the pages finish in
+    const pageResults: Array<ClassificationResult | null> = new Array(pagesToTest.length).fill(null);
+    
+    // Keep up to `concurrencyLevel` pages in flight; the next page starts as soon as
+    // any running one finishes instead of waiting for the slowest page in a batch
+    const slots = new Semaphore(concurrencyLevel);
+    const pageDone = emojiLogger.progressTracker(pagesToTest.length, 'Pages classified:');
+    
+    await Promise.all(pagesToTest.map((entry, index) => slots.run(async () => {
+      const filename = path.basename(entry.filePath);
+      logger.debug(`🔍 Processing: ${filename} page ${entry.pageIndex + 1}`);
       
-      // Add to metrics
-      metrics.addResults(batchResults.filter(r => r !== null) as ClassificationResult[]);
-    }
+      pageResults[index] = await processPage(entry, pageClassifier, mistralOcr, promptTemplate);
+      pageDone();
+    })));
+    
+    const results = pageResults.filter((result): result is ClassificationResult => result !== null);
+    metrics.addResults(results);
     
     // Step 8: Display final results
     const metricsSummary = metrics.generateSummary();
     
-    console.log('\n======================================================================');
-    console.log('🏆 PAGE CLASSIFICATION RESULTS SUMMARY 🔍');
-    console.log('======================================================================');
-    console.log(`🤖 OCR Model: ${ocrModel}`);
-    console.log(`🤖 Classification Model: ${classificationModel}`);
-    console.log(`📊 Accuracy: ${(metricsSummary.accuracy * 100).toFixed(2)}% (${metricsSummary.correctPredictions}/${metricsSummary.totalSamples})`);
-    console.log(`🔄 Completion: 100.00% (${results.length}/${pagesToProcess})`);
-    console.log(`🔄 Concurrency level: ${concurrencyLevel}`);
-    
-    // Calculate and display processing times
+    // The summary and detailed results table are built up and printed in a single write
     const avgProcessingTime = metricsSummary.averageProcessingTimeMs || 0;
-    console.log(`⏱️ Average processing time: ${(avgProcessingTime / 1000).toFixed(2)} seconds`);
-    
-    // Display API cost
-    console.log(`💰 Total API Cost: $${metricsSummary.totalApiCost?.toFixed(6) || '0.000000'}`);
+    const summaryLines = [
+      '\n======================================================================',
+      '🏆 PAGE CLASSIFICATION RESULTS SUMMARY 🔍',
+      '======================================================================',
+      `🤖 OCR Model: ${ocrModel}`,
+      `🤖 Classification Model: ${classificationModel}`,
+      `📊 Accuracy: ${(metricsSummary.accuracy * 100).toFixed(2)}% (${metricsSummary.correctPredictions}/${metricsSummary.totalSamples})`,
+      `🔄 Completion: 100.00% (${results.length}/${pagesToProcess})`,
+      `🔄 Concurrency level: ${concurrencyLevel}`,
+      `⏱️ Average processing time: ${(avgProcessingTime / 1000).toFixed(2)} seconds`,
+      `💰 Total API Cost: $${metricsSummary.totalApiCost?.toFixed(6) || '0.000000'}`,
+      '\n📊 Classification Metrics by Page Type:',
+    ];
     
-    // Display F1 scores by page type
-    console.log('\n📊 Classification Metrics by Page Type:');
+    // F1 scores by page type
     Object.entries(metricsSummary.f1Score).forEach(([type, score]) => {
       if (score !== undefined) {
-        console.log(`   • ${type}:`);
-        console.log(`     - Precision: ${(metricsSummary.precision[type as PageType] || 0) * 100}%`);
-        console.log(`     - Recall: ${(metricsSummary.recall[type as PageType] || 0) * 100}%`);
-        console.log(`     - F1 Score: ${score * 100}%`);
+        summaryLines.push(
+          `   • ${type}:`,
+          `     - Precision: ${(metricsSummary.precision[type as PageType] || 0) * 100}%`,
+          `     - Recall: ${(metricsSummary.recall[type as PageType] || 0) * 100}%`,
+          `     - F1 Score: ${score * 100}%`
+        );
       }
     });
     
-    console.log('\n======================================================================\n');
-    
-    // Display detailed results table
-    console.log('📋 DETAILED RESULTS:');
-    console.log('FILENAME                                 | PREDICTED            | EXPECTED             | CORRECT    | TIME (ms)  | COST ($)');
-    console.log('------------------------------------------------------------------------------------------------------------------------');
+    summaryLines.push('\n======================================================================\n');
     
-    results.forEach(result => {
-      const filename = path.basename(result.filePath).padEnd(40);
-      const predicted = result.predictedType.padEnd(20);
-      const expected = result.actualType.padEnd(20);
-      const correct = result.isCorrect ? '✅' : '❌';
-      const time = (result.processingTimeMs || 0).toFixed(2).padStart(10);
-      const cost = `$${(result.apiCost || 0).toFixed(6)}`;
+    // Detailed results table
+    if (process.argv.includes('--verbose') || results.length <= DETAILED_TABLE_MAX_ROWS) {
+      summaryLines.push(
+        '📋 DETAILED RESULTS:',
+        'FILENAME                                 | PREDICTED            | EXPECTED             | CORRECT    | TIME (ms)  | COST ($)',
+        '------------------------------------------------------------------------------------------------------------------------'
+      );
       
-      console.log(`${filename} | ${predicted} | ${expected} | ${correct.padEnd(10)} | ${time} | ${cost}`);
-    });
+      for (const result of results) {
+        const filename = path.basename(result.filePath).padEnd(40);
+        const predicted = result.predictedType.padEnd(20);
+        const expected = result.actualType.padEnd(20);
+        const correct = result.isCorrect ? '✅' : '❌';
+        const time = (result.processingTimeMs || 0).toFixed(2).padStart(10);
+        const cost = `$${(result.apiCost || 0).toFixed(6)}`;
+        
+        summaryLines.push(`${filename} | ${predicted} | ${expected} | ${correct.padEnd(10)} | ${time} | ${cost}`);
+      }
+    } else {
+      summaryLines.push(`📋 Skipping the detailed results table for ${results.length} pages (pass --verbose to print it)`);
+    }
+    process.stdout.write(summaryLines.join('\n') + '\n');
     
     // Step 9: Save results to files
     const timestamp = Date.now();
@@ -283,7 +288,9 @@ async function runPageClassificationEvaluation(): Promise<void> {
         successRate: 1.0, // Assuming all requests succeeded
         totalProcessingTimeMs: (metricsSummary.averageProcessingTimeMs || 0) * results.length,
       },
-      detailedResults: results,
+      // Every result is already in the CSV below, so the rows are only repeated in
+      // the JSON report when asked for
+      detailedResults: process.argv.includes('--full') ? results : undefined,
     });
     const csvPath = await reportGenerator.saveDetailedResultsCsv(results, `page_classification_results_${timestamp}.csv`);
     
@@ -304,7 +311,7 @@ async function processPage(
   mistralOcr: MistralOCRProcessor,
   promptTemplate: any
 ): Promise<ClassificationResult | null> {
-  const startTime = Date.now();
+  const startTime = monotonicNow();
   const filename = path.basename(entry.filePath);
   let pageContent = ''; // Initialize pageContent at the function scope
   
@@ -329,7 +336,7 @@ async function processPage(
     
     // Step 1: Perform OCR on the page
     console.log(`🔎 OCR Processing: ${filename} page ${entry.pageIndex + 1}`);
-    const ocrStartTime = Date.now();
+    const ocrStartTime = monotonicNow();
     
     try {
       // Process document with OCR
@@ -338,7 +345,7 @@ async function processPage(
         outputFormat: 'markdown'
       });
       
-      const ocrDuration = Date.now() - ocrStartTime;
+      const ocrDuration = elapsedMs(ocrStartTime);
       console.log(`⏱️ OCR time: ${(ocrDuration / 1000).toFixed(2)} seconds`);
       
       // Log detailed OCR result information to debug issues
@@ -371,13 +378,13 @@ async function processPage(
     
     // Step 2: Classify the page
     console.log(`🔄 Classifying: ${filename} page ${entry.pageIndex + 1}`);
-    const classificationStartTime = Date.now();
+    const classificationStartTime = monotonicNow();
     
     try {
       // Classify the page content
       const classificationResult = await pageClassifier.classifyPage(pageContent, entry.pageIndex);
       
-      const classificationDuration = Date.now() - classificationStartTime;
+      const classificationDuration = elapsedMs(classificationStartTime);
       console.log(`⏱️ Classification time: ${(classificationDuration / 1000).toFixed(2)} seconds`);
       
       // Determine the page type
@@ -398,7 +405,7 @@ async function processPage(
       }
       
       // Create the result
-      const totalDuration = Date.now() - startTime;
+      const totalDuration = elapsedMs(startTime);
       const result: ClassificationResult = {
         filePath: entry.filePath,
         pageIndex: entry.pageIndex,
@@ -501,7 +508,7 @@ function createMockResult(entry: PageDataEntry, startTime: number, errorReason:
     actualType: entry.pageType,
     predictedType: PageType.OTHER, // Default to OTHER for errors
     confidence: 0.1,
-    processingTimeMs: Date.now() - startTime,
+    processingTimeMs: elapsedMs(startTime),
     apiCost: 0.005, // Reduced cost since no real API call was made
     isCorrect: entry.pageType === PageType.OTHER, // Only correct if actual type is OTHER
   };
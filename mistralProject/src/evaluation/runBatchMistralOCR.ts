@@ -1,4 +1,4 @@
-// Purpose: Process multiple files from validationDataset.csv through Mistral OCR with configurable concurrency
+// Purpose: Process multiple files from validationDataset.csv through Mistral OCR, pipelining uploads and OCR
 // Create this file in the mistralProject/src/evaluation directory
 
 import * as fs from 'fs';
@@ -7,6 +7,10 @@ import * as readline from 'readline';
 import { parse } from 'csv-parse/sync';
 import { MistralOCRProcessor } from '../core/MistralOCR'; // Assuming this is the correct import path
 import { createLogger } from '../utils/logger'; // Assuming this is the correct import path
+import { writeJsonFileSync } from '../utils/jsonWriter';
+import { elapsedMs, monotonicNow } from '../utils/timing';
+import { config } from '../config';
+import emojiLogger from '../utils/emojiLogger';
 
 const logger = createLogger('BatchOCR');
 
@@ -73,16 +77,10 @@ async function runBatchOCR() {
   // Select files to process
   const filesToProcess = uniqueFilenames.slice(0, fileCount);
   
-  // Ask for concurrency
-  const concurrencyStr = await promptUser(`\nHow many files would you like to process concurrently? (1-${fileCount}): `);
-  const concurrency = parseInt(concurrencyStr, 10);
+  logger.info(`🚀 Processing ${fileCount} files (upload concurrency ${config.mistral.uploadConcurrency}, OCR concurrency ${config.mistral.ocrConcurrency})`);
   
-  if (isNaN(concurrency) || concurrency < 1 || concurrency > fileCount) {
-    logger.error(`❌ Invalid number. Please enter a number between 1 and ${fileCount}`);
-    return;
-  }
-  
-  logger.info(`🚀 Processing ${fileCount} files with concurrency of ${concurrency}`);
+  // --compress writes gzipped results, for runs that are kept for archiving
+  const compressResults = process.argv.includes('--compress');
   
   // Create output directory with timestamp
   const timestamp = new Date().toISOString().replace(/[:.]/g, '').substring(0, 15);
@@ -92,55 +90,55 @@ async function runBatchOCR() {
   // Initialize OCR processor
   const ocrProcessor = new MistralOCRProcessor();
   
-  // Process files in batches based on concurrency
-  const startTime = Date.now();
+  // Upload and OCR run as separate stages, so later files are uploaded while
+  // earlier ones are still in OCR; each result is saved as soon as it arrives
+  const startTime = monotonicNow();
   const validationDataDir = path.resolve('validationData/Agent&MasterSOFs');
+  const fileDone = emojiLogger.progressTracker(filesToProcess.length, '📦 Files done:');
   
-  // Process files in chunks based on concurrency
-  for (let i = 0; i < filesToProcess.length; i += concurrency) {
-    const currentBatch = filesToProcess.slice(i, i + concurrency);
-    
-    logger.info(`📦 Processing batch ${Math.floor(i / concurrency) + 1} of ${Math.ceil(filesToProcess.length / concurrency)}`);
+  const filePaths: string[] = [];
+  for (const filename of filesToProcess) {
+    const filePath = path.join(validationDataDir, filename);
     
-    // Process batch concurrently
-    await Promise.all(currentBatch.map(async (filename) => {
-      try {
-        const filePath = path.join(validationDataDir, filename);
-        
-        // Verify file exists
-        if (!fs.existsSync(filePath)) {
-          logger.error(`❌ File not found: ${filePath}`);
-          return;
-        }
-        
-        logger.info(`📄 Processing document: ${filename}`);
-        
-        // Create file-specific output directory
-        const fileOutputDir = path.join(outputDir, filename.replace(/\.[^/.]+$/, ""));
-        fs.mkdirSync(fileOutputDir, { recursive: true });
-        
-        // Process the document with Mistral OCR
-        const result = await ocrProcessor.processDocument(filePath);
-        
-        // Save results
-        const resultsPath = path.join(fileOutputDir, 'ocr_results.json');
-        fs.writeFileSync(resultsPath, JSON.stringify(result, null, 2));
-        
-        logger.info(`✅ Completed processing: ${filename}`);
-        logger.info(`📁 Results saved to: ${resultsPath}`);
-      } catch (error) {
+    // Verify file exists
+    if (!fs.existsSync(filePath)) {
+      logger.error(`❌ File not found: ${filePath}`);
+      fileDone();
+      continue;
+    }
+    filePaths.push(filePath);
+  }
+  
+  await ocrProcessor.processDocuments(filePaths, (filePath, result, error) => {
+    const filename = path.basename(filePath);
+    try {
+      if (!result) {
         logger.error(`❌ Error processing ${filename}: ${error}`);
+        return;
       }
-    }));
-  }
+      
+      // Create file-specific output directory
+      const fileOutputDir = path.join(outputDir, filename.replace(/\.[^/.]+$/, ""));
+      fs.mkdirSync(fileOutputDir, { recursive: true });
+      
+      // Save results
+      const resultsPath = path.join(fileOutputDir, compressResults ? 'ocr_results.json.gz' : 'ocr_results.json');
+      writeJsonFileSync(resultsPath, result);
+      
+      logger.debug(`✅ Completed processing: ${filename}, results saved to: ${resultsPath}`);
+    } catch (saveError) {
+      logger.error(`❌ Error saving results for ${filename}: ${saveError}`);
+    } finally {
+      fileDone();
+    }
+  });
   
-  const endTime = Date.now();
-  const duration = (endTime - startTime) / 1000;
+  const duration = elapsedMs(startTime) / 1000;
   
   // Final report
   logger.info(`🎉 Batch processing complete!`);
   logger.info(`⏱️ Total processing time: ${duration.toFixed(2)} seconds`);
-  logger.info(`📊 Processed ${fileCount} files with concurrency of ${concurrency}`);
+  logger.info(`📊 Processed ${fileCount} files`);
   logger.info(`📁 All results saved to: ${outputDir}`);
 }
 
@@ -15,14 +15,86 @@ import Papa from 'papaparse';
 const args = process.argv.slice(2);
 const forceInteractive = args.includes('--interactive');
 
-export async function runEvaluation(options: { 
+// Upper bound for the interactive concurrency prompt. API pacing is handled by the
+// Anthropic and Mistral rate limiters, so concurrency only bounds in-flight pages.
+const MAX_CONCURRENCY = 64;
+
+/**
+ * Read the value of a `--name value` or `--name=value` command line option
+ */
+function getArgValue(name: string): string | undefined {
+  const flag = `--${name}`;
+  for (let i = 0; i < args.length; i++) {
+    if (args[i] === flag) {
+      return args[i + 1];
+    }
+    if (args[i].startsWith(`${flag}=`)) {
+      return args[i].slice(flag.length + 1);
+    }
+  }
+  return undefined;
+}
+
+/**
+ * Parse a model option, accepting either the model id or the ModelType key
+ */
+function parseModelArg(name: string): ModelType | undefined {
+  const value = getArgValue(name);
+  if (value === undefined) {
+    return undefined;
+  }
+  const models = Object.values(ModelType) as string[];
+  if (models.includes(value)) {
+    return value as ModelType;
+  }
+  const byKey = (ModelType as Record<string, string>)[value.toUpperCase().replace(/-/g, '_')];
+  if (byKey) {
+    return byKey as ModelType;
+  }
+  throw new Error(`Unknown model for --${name}: ${value}. Expected one of: ${models.join(', ')}`);
+}
+
+/**
+ * Parse a positive integer option
+ */
+function parseIntArg(name: string): number | undefined {
+  const value = getArgValue(name);
+  if (value === undefined) {
+    return undefined;
+  }
+  const parsed = parseInt(value, 10);
+  if (isNaN(parsed) || parsed < 1) {
+    throw new Error(`--${name} must be a positive integer, got: ${value}`);
+  }
+  return parsed;
+}
+
+/**
+ * Evaluation settings given on the command line. Every interactive prompt has a
+ * matching flag, so runs can be scripted without a TTY:
+ *   --ocr-model, --classification-model, --extraction-model, --concurrency, --limit, --prompt
+ */
+function parseCommandLineOptions(): RunEvaluationOptions {
+  return {
+    ocrModel: parseModelArg('ocr-model'),
+    classificationModel: parseModelArg('classification-model'),
+    extractionModel: parseModelArg('extraction-model'),
+    concurrencyLevel: parseIntArg('concurrency'),
+    limitSamples: parseIntArg('limit'),
+    promptName: getArgValue('prompt'),
+  };
+}
+
+export interface RunEvaluationOptions {
   ocrModel?: ModelType;
   classificationModel?: ModelType;
   extractionModel?: ModelType;
   concurrencyLevel?: number;
   limitSamples?: number;
   promptName?: string;
-} = {}) {
+}
+
+export async function runEvaluation(options: RunEvaluationOptions = {}) {
   emojiLogger.startPhase('Page classification evaluation');
   
   // Try to find the validation dataset - check validatedDataset.csv first
@@ -255,25 +327,19 @@ async function configureEvaluationSettings(): Promise<{
   
   // Get concurrency level
   console.log('\n');
-  const concurrencyInput = await getUserInput('🔄 How many documents would you like to process concurrently? (1-10, default: 2): ');
+  const concurrencyInput = await getUserInput(`🔄 How many documents would you like to process concurrently? (1-${MAX_CONCURRENCY}, default: 2): `);
   let concurrencyLevel = 2;
   
   if (concurrencyInput) {
     const concurrency = parseInt(concurrencyInput);
-    if (!isNaN(concurrency) && concurrency >= 1 && concurrency <= 10) {
+    if (!isNaN(concurrency) && concurrency >= 1 && concurrency <= MAX_CONCURRENCY) {
       concurrencyLevel = concurrency;
     }
   }
   
-  // Warn about potential rate limiting with high concurrency
+  // Requests are paced to the configured quotas whatever the concurrency level
   if (concurrencyLevel > 4) {
-    emojiLogger.warn('High concurrency levels may cause rate limiting from the API.');
-    emojiLogger.warn('If you encounter errors, try reducing the concurrency level.');
-    const confirm = await getUserInput('Continue with this setting? (y/n): ');
-    if (confirm.toLowerCase() !== 'y') {
-      emojiLogger.info('Reverting to default concurrency level of 2');
-      concurrencyLevel = 2;
-    }
+    emojiLogger.info('API requests are rate limited (ANTHROPIC_MAX_RPS, MISTRAL_RPM); 429s are retried with backoff.');
   }
   
   // Get prompt template
@@ -467,8 +533,14 @@ if (require.main === module) {
       process.exit(1);
     }
     
-    // Check if file paths exist
-    const invalidPaths = data.filter(row => !fs.existsSync(row.filePath));
+    // Check if file paths exist, once per distinct path rather than once per page row
+    const missingPaths = new Set<string>();
+    for (const filePath of new Set(data.map(row => row.filePath as string))) {
+      if (!fs.existsSync(filePath)) {
+        missingPaths.add(filePath);
+      }
+    }
+    const invalidPaths = data.filter(row => missingPaths.has(row.filePath));
     if (invalidPaths.length > 0) {
       emojiLogger.warn(`Warning: ${invalidPaths.length} file paths in the validation dataset don't exist.`);
       emojiLogger.warn('This might cause evaluation errors. Consider recreating the validation dataset.');
@@ -477,15 +549,24 @@ if (require.main === module) {
     emojiLogger.error('Error reading validation dataset:', error);
   }
 
-  // Check if interactive mode is forced or if we're in a TTY
-  if (forceInteractive || process.stdin.isTTY) {
+  let cliOptions: RunEvaluationOptions = {};
+  try {
+    cliOptions = parseCommandLineOptions();
+  } catch (error) {
+    emojiLogger.error(String(error instanceof Error ? error.message : error));
+    process.exit(1);
+  }
+  const hasCliOptions = Object.values(cliOptions).some(value => value !== undefined);
+  
+  // Prompt only when interactive mode is forced, or when we're in a TTY and no settings were passed
+  if (forceInteractive || (process.stdin.isTTY && !hasCliOptions)) {
     main().catch(error => {
       emojiLogger.error('Unhandled error:', error);
       process.exit(1);
     });
   } else {
-    // Non-interactive mode - run with defaults
-    runEvaluation().catch(error => {
+    // Non-interactive mode - run with the command line settings, defaults for the rest
+    runEvaluation(cliOptions).catch(error => {
       emojiLogger.error('Unhandled error:', error);
       process.exit(1);
     });
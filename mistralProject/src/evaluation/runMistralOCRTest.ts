@@ -12,6 +12,7 @@ import { config } from '../config';
 import { logger } from '../utils/logger';
 import emojiLogger from '../utils/emojiLogger';
 import { MistralOCRProcessor } from '../core/MistralOCR';
+import { elapsedMs, monotonicNow } from '../utils/timing';
 import { getUserInput, closeReadline } from '../utils/readlineUtils';
 import crypto from 'crypto';
 
@@ -68,7 +69,7 @@ async function processMistralOCR(
     logger.info(`Processing document with Mistral OCR: ${filePath}`);
     logger.info(`OCR options: preserveStructure=${true}, outputFormat=markdown, enhanceTablesMarkdown=${true}`);
     
-    const startTime = Date.now();
+    const startTime = monotonicNow();
     
     const ocrResult = await ocrProcessor.processDocument(filePath, {
       preserveStructure: true,
@@ -93,8 +94,7 @@ async function processMistralOCR(
       logger.info(`First page content length: ${firstPageContentLength} characters`);
     }
     
-    const endTime = Date.now();
-    const processingTimeSeconds = ((endTime - startTime) / 1000).toFixed(2);
+    const processingTimeSeconds = (elapsedMs(startTime) / 1000).toFixed(2);
     
     // Check if OCR succeeded in extracting text
     const hasContent = ocrResult.pages.some(page => page.content && page.content.trim().length > 0);
@@ -10,9 +10,11 @@ import fs from 'fs-extra';
 import { config } from '../config';
 import { logger } from '../utils/logger';
 import { DocumentProcessingError } from '../utils/errors';
+import { elapsedMs, monotonicNow } from '../utils/timing';
 import { MistralOCRProcessor } from '../core/MistralOCR';
 import { PageClassifier } from '../core/PageClassifier';
 import { SofExtractor } from '../core/SofExtractor';
+import { AnthropicClient } from '../utils/AnthropicClient';
 import { ClassifiedDocument, SofExtractTable } from '../../../newMistral/sofTypesExtraction';
 import * as documentUtils from '../utils/documentUtils';
 
@@ -52,9 +54,12 @@ export class ProcessingPipeline {
    * Create a new ProcessingPipeline instance
    */
   constructor() {
+    // Classification and extraction share one Anthropic client
+    const anthropicClient = new AnthropicClient();
+    
     this.ocrProcessor = new MistralOCRProcessor();
-    this.pageClassifier = new PageClassifier();
-    this.sofExtractor = new SofExtractor();
+    this.pageClassifier = new PageClassifier(anthropicClient);
+    this.sofExtractor = new SofExtractor(anthropicClient);
     
     logger.info('ProcessingPipeline initialized');
   }
@@ -66,7 +71,7 @@ export class ProcessingPipeline {
     filePath: string,
     outputDir: string = config.paths.outputDir
   ): Promise<PipelineResult> {
-    const startTime = Date.now();
+    const startTime = monotonicNow();
     const fileName = path.basename(filePath);
     
     // Create a result object with default values
@@ -134,7 +139,7 @@ export class ProcessingPipeline {
       };
       
       // Calculate processing time
-      const processingTime = Date.now() - startTime;
+      const processingTime = elapsedMs(startTime);
       result.processingTimeMs = processingTime;
       
       logger.info(`Document processed successfully: ${fileName}`);
@@ -147,7 +152,7 @@ export class ProcessingPipeline {
       logger.error(`Error processing document ${fileName}: ${errorMessage}`);
       
       // Calculate processing time even for failures
-      result.processingTimeMs = Date.now() - startTime;
+      result.processingTimeMs = elapsedMs(startTime);
       
       throw new DocumentProcessingError(`Failed to process document ${fileName}: ${errorMessage}`, result);
     }
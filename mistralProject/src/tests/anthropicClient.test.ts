@@ -0,0 +1,47 @@
+/**
+ * Tests for parsing batch classification responses
+ */
+import { parseBatchClassification } from '../utils/AnthropicClient';
+
+describe('parseBatchClassification', () => {
+  test('Should return one result per answered page', () => {
+    const response = 'PAGE 1: SOF_PAGE 0.95\nPAGE 2: NOT_SOF_PAGE 0.8';
+
+    expect(parseBatchClassification(response, 2)).toEqual([
+      { classification: 'SOF_PAGE', confidence: 0.95 },
+      { classification: 'NOT_SOF_PAGE', confidence: 0.8 },
+    ]);
+  });
+
+  test('Should leave pages without a line as null', () => {
+    const response = 'PAGE 1: SOF_PAGE 0.9\nPAGE 3: NOT_SOF_PAGE 0.7';
+
+    expect(parseBatchClassification(response, 3)).toEqual([
+      { classification: 'SOF_PAGE', confidence: 0.9 },
+      null,
+      { classification: 'NOT_SOF_PAGE', confidence: 0.7 },
+    ]);
+  });
+
+  test('Should ignore out-of-range page numbers', () => {
+    const response = 'PAGE 0: SOF_PAGE 0.9\nPAGE 2: SOF_PAGE 0.9\nPAGE 1: NOT_SOF_PAGE 0.6';
+
+    expect(parseBatchClassification(response, 1)).toEqual([
+      { classification: 'NOT_SOF_PAGE', confidence: 0.6 },
+    ]);
+  });
+
+  test('Should treat malformed confidence as a miss', () => {
+    const response = 'PAGE 1: SOF_PAGE ...\nPAGE 2: SOF_PAGE 1.2.3\nPAGE 3: SOF_PAGE 95\nPAGE 4: SOF_PAGE';
+
+    expect(parseBatchClassification(response, 4)).toEqual([null, null, null, null]);
+  });
+
+  test('Should keep the first answer for a repeated page', () => {
+    const response = 'PAGE 1: NOT_SOF_PAGE 0.7\nPAGE 1: SOF_PAGE 0.9';
+
+    expect(parseBatchClassification(response, 1)).toEqual([
+      { classification: 'NOT_SOF_PAGE', confidence: 0.7 },
+    ]);
+  });
+});
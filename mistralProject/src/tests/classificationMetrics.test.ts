@@ -0,0 +1,58 @@
+/**
+ * Tests for the running classification metrics
+ */
+import { ClassificationMetrics } from '../evaluation/classification/metrics/ClassificationMetrics';
+import { PageType } from '../evaluation/classification/datasets/DatasetManager';
+
+describe('ClassificationMetrics', () => {
+  const addSampleResults = (metrics: ClassificationMetrics) => {
+    metrics.addResults([
+      { filePath: 'a.pdf', pageIndex: 0, actualType: PageType.AGENT_SOF, predictedType: PageType.AGENT_SOF, confidence: 0.9, apiCost: 0.01 },
+      { filePath: 'a.pdf', pageIndex: 1, actualType: PageType.AGENT_SOF, predictedType: PageType.OTHER, confidence: 0.5, apiCost: 0.01 },
+      { filePath: 'b.pdf', pageIndex: 0, actualType: PageType.MASTER_SOF, predictedType: PageType.MASTER_SOF, processingTimeMs: 200 },
+      { filePath: 'b.pdf', pageIndex: 1, actualType: PageType.OTHER, predictedType: PageType.AGENT_SOF, processingTimeMs: 100 },
+    ]);
+  };
+
+  test('Should compute accuracy, precision and recall from running totals', () => {
+    const metrics = new ClassificationMetrics();
+    addSampleResults(metrics);
+
+    const summary = metrics.generateSummary();
+
+    expect(summary.correctPredictions).toBe(2);
+    expect(summary.accuracy).toBe(0.5);
+    expect(summary.precision[PageType.AGENT_SOF]).toBe(0.5);
+    expect(summary.recall[PageType.AGENT_SOF]).toBe(0.5);
+    expect(summary.precision[PageType.MASTER_SOF]).toBe(1);
+    expect(summary.recall[PageType.OTHER]).toBe(0);
+    expect(summary.averageConfidence).toBeCloseTo(0.7);
+    expect(summary.averageProcessingTimeMs).toBe(150);
+    expect(summary.totalApiCost).toBeCloseTo(0.02);
+  });
+
+  test('Should share rows that already carry the correct flag', () => {
+    const metrics = new ClassificationMetrics();
+    const flagged = { filePath: 'a.pdf', pageIndex: 0, actualType: PageType.OTHER, predictedType: PageType.OTHER, isCorrect: true };
+    const unflagged = { filePath: 'a.pdf', pageIndex: 1, actualType: PageType.OTHER, predictedType: PageType.AGENT_SOF };
+
+    metrics.addResults([flagged, unflagged]);
+
+    const [first, second] = metrics.getResults();
+    expect(first).toBe(flagged);
+    expect(second).not.toBe(unflagged);
+    expect(second.isCorrect).toBe(false);
+    expect(JSON.stringify(second)).toBe(JSON.stringify({ ...unflagged, isCorrect: false }));
+  });
+
+  test('Should reset the totals when cleared', () => {
+    const metrics = new ClassificationMetrics();
+    addSampleResults(metrics);
+
+    metrics.clear();
+
+    expect(metrics.calculateAccuracy()).toBe(0);
+    expect(metrics.calculatePrecision(PageType.AGENT_SOF)).toBe(0);
+    expect(metrics.calculateTotalApiCost()).toBe(0);
+  });
+});
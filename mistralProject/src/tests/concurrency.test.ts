@@ -0,0 +1,183 @@
+/**
+ * Tests for the shared concurrency primitives
+ */
+import { AdaptiveRateLimiter, BoundedQueue, RateLimiter, Semaphore, runPipeline } from '../utils/concurrency';
+
+describe('Semaphore', () => {
+  test('Should never exceed the permit count', async () => {
+    const semaphore = new Semaphore(2);
+    let active = 0;
+    let peak = 0;
+
+    await Promise.all(Array.from({ length: 6 }, () => semaphore.run(async () => {
+      active++;
+      peak = Math.max(peak, active);
+      await new Promise(resolve => setTimeout(resolve, 5));
+      active--;
+    })));
+
+    expect(peak).toBe(2);
+  });
+
+  test('Should hand permits to waiters in FIFO order', async () => {
+    const semaphore = new Semaphore(1);
+    const order: number[] = [];
+
+    await Promise.all([1, 2, 3].map(n => semaphore.run(async () => {
+      order.push(n);
+    })));
+
+    expect(order).toEqual([1, 2, 3]);
+  });
+
+  test('Should release the permit when the function throws', async () => {
+    const semaphore = new Semaphore(1);
+
+    await expect(semaphore.run(async () => {
+      throw new Error('boom');
+    })).rejects.toThrow('boom');
+
+    await expect(semaphore.run(async () => 'ok')).resolves.toBe('ok');
+  });
+});
+
+describe('AdaptiveRateLimiter', () => {
+  test('Should halve the rate when too many calls are throttled', async () => {
+    const limiter = new AdaptiveRateLimiter(10, 60000, 0.1);
+
+    await limiter.acquire();
+    limiter.recordResult(false);
+    await limiter.acquire();
+    limiter.recordResult(true);
+
+    expect(limiter.currentLimit).toBe(5);
+  });
+
+  test('Should keep the rate when calls succeed', async () => {
+    const limiter = new AdaptiveRateLimiter(4);
+
+    for (let i = 0; i < 4; i++) {
+      await limiter.acquire();
+      limiter.recordResult(false);
+    }
+
+    expect(limiter.currentLimit).toBe(4);
+  });
+});
+
+describe('RateLimiter', () => {
+  test('Should space permits by the configured rate', async () => {
+    const limiter = new RateLimiter(50);
+    const start = Date.now();
+
+    for (let i = 0; i < 4; i++) {
+      await limiter.acquire();
+    }
+
+    // First permit is immediate, the next three wait ~20ms each
+    expect(Date.now() - start).toBeGreaterThanOrEqual(55);
+  });
+
+  test('Should hold permits back while penalized', async () => {
+    const limiter = new RateLimiter(1000, 10);
+    const start = Date.now();
+
+    limiter.penalize(50);
+    await limiter.acquire();
+
+    expect(Date.now() - start).toBeGreaterThanOrEqual(45);
+  });
+});
+
+describe('BoundedQueue', () => {
+  test('Should never hold more than its capacity', async () => {
+    const queue = new BoundedQueue<number>(2);
+    const received: number[] = [];
+    let peak = 0;
+
+    const producer = (async () => {
+      for (let i = 0; i < 10; i++) {
+        await queue.put(i);
+        peak = Math.max(peak, queue.size);
+      }
+      queue.close();
+    })();
+
+    const consumers = [0, 1].map(async () => {
+      let item: number | undefined;
+      while ((item = await queue.get()) !== undefined) {
+        received.push(item);
+        await new Promise(resolve => setTimeout(resolve, 2));
+      }
+    });
+
+    await Promise.all([producer, ...consumers]);
+
+    expect(peak).toBeLessThanOrEqual(2);
+    expect(received.sort((a, b) => a - b)).toEqual([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]);
+  });
+
+  test('Should release waiting consumers when closed', async () => {
+    const queue = new BoundedQueue<string>(1);
+    const pending = queue.get();
+
+    queue.close();
+
+    await expect(pending).resolves.toBeUndefined();
+  });
+});
+
+describe('runPipeline', () => {
+  const delay = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+  test('Should start later stages before earlier ones finish and keep input order', async () => {
+    const events: string[] = [];
+
+    const results = await runPipeline<string>([1, 2, 3, 4], [
+      {
+        concurrency: 1,
+        run: async (item: number) => {
+          await delay(5);
+          events.push(`upload ${item}`);
+          return item * 10;
+        }
+      },
+      {
+        concurrency: 2,
+        run: async (value: number) => {
+          events.push(`ocr start ${value}`);
+          await delay(value === 10 ? 20 : 1);
+          return `done ${value}`;
+        }
+      }
+    ]);
+
+    expect(events.indexOf('ocr start 10')).toBeLessThan(events.indexOf('upload 4'));
+    expect(results).toEqual(['done 10', 'done 20', 'done 30', 'done 40']);
+  });
+
+  test('Should finish the other items before rethrowing a stage failure', async () => {
+    const finished: number[] = [];
+
+    await expect(runPipeline([1, 2, 3], [
+      {
+        concurrency: 2,
+        run: async (item: number) => {
+          if (item === 2) {
+            throw new Error('upload failed');
+          }
+          return item;
+        }
+      },
+      {
+        concurrency: 1,
+        run: async (item: number) => {
+          finished.push(item);
+          return item;
+        }
+      }
+    ])).rejects.toThrow('upload failed');
+
+    expect(finished.sort()).toEqual([1, 3]);
+  });
+});
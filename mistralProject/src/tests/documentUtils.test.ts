@@ -0,0 +1,21 @@
+/**
+ * Tests for document type detection
+ */
+import { detectMimeType } from '../utils/documentUtils';
+
+describe('detectMimeType', () => {
+  test('Should detect each supported format from its signature', () => {
+    expect(detectMimeType(Buffer.from('%PDF-1.7\n'))).toBe('application/pdf');
+    expect(detectMimeType(Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]))).toBe('image/png');
+    expect(detectMimeType(Buffer.from([0xff, 0xd8, 0xff, 0xe0]))).toBe('image/jpeg');
+    expect(detectMimeType(Buffer.from([0x49, 0x49, 0x2a, 0x00]))).toBe('image/tiff');
+    expect(detectMimeType(Buffer.from([0x4d, 0x4d, 0x00, 0x2a]))).toBe('image/tiff');
+    expect(detectMimeType(Buffer.from('RIFF\x00\x00\x00\x00WEBPVP8 ', 'latin1'))).toBe('image/webp');
+  });
+
+  test('Should return null for unknown or too short content', () => {
+    expect(detectMimeType(Buffer.from('plain text file'))).toBeNull();
+    expect(detectMimeType(Buffer.from([0xff, 0xd8]))).toBeNull();
+    expect(detectMimeType(Buffer.alloc(0))).toBeNull();
+  });
+});
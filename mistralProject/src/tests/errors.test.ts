@@ -0,0 +1,36 @@
+/**
+ * Tests for the retry helper
+ */
+import { withRetry } from '../utils/errors';
+
+describe('withRetry', () => {
+  const rateLimited = (retryAfter: string) => Object.assign(new Error('rate limited'), {
+    response: { status: 429, headers: { 'retry-after': retryAfter } },
+  });
+
+  test('Should cap a Retry-After wait at maxDelayMs', async () => {
+    let calls = 0;
+    const start = Date.now();
+
+    const result = await withRetry(async () => {
+      if (calls++ === 0) {
+        throw rateLimited('3600');
+      }
+      return 'ok';
+    }, 3, 10, 50);
+
+    expect(result).toBe('ok');
+    expect(Date.now() - start).toBeLessThan(1000);
+  });
+
+  test('Should not retry errors that are not retryable', async () => {
+    let calls = 0;
+
+    await expect(withRetry(async () => {
+      calls++;
+      throw new Error('bad request');
+    }, 3, 10, 50)).rejects.toThrow('bad request');
+
+    expect(calls).toBe(1);
+  });
+});
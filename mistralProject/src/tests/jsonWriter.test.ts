@@ -0,0 +1,92 @@
+/**
+ * Tests for the streaming JSON report writer and its readers
+ */
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import zlib from 'zlib';
+import { readJsonFileSync, readJsonLinesFileSync, writeJsonFileSync, writeJsonLinesFileSync } from '../utils/jsonWriter';
+
+describe('writeJsonFileSync', () => {
+  const filePath = path.join(os.tmpdir(), `jsonWriter_${process.pid}.json`);
+
+  afterEach(() => {
+    if (fs.existsSync(filePath)) {
+      fs.unlinkSync(filePath);
+    }
+  });
+
+  test('Should match JSON.stringify output for a report object', () => {
+    const report = {
+      id: 'eval_1',
+      timestamp: new Date(0),
+      summary: { accuracy: 0.5, perType: { sof: [1, 2] } },
+      detailedResults: [{ filePath: 'a.pdf', text: 'line 1\nline 2' }, { filePath: 'b.pdf', skipped: undefined }],
+      apiCallRecords: [],
+      notes: undefined,
+    };
+
+    writeJsonFileSync(filePath, report);
+
+    expect(fs.readFileSync(filePath, 'utf8')).toBe(JSON.stringify(report, null, 2));
+  });
+
+  test('Should match JSON.stringify output for top-level arrays', () => {
+    const records = [1, { a: [2, 3], b: 'x\ny' }, undefined, []];
+
+    writeJsonFileSync(filePath, records);
+
+    expect(fs.readFileSync(filePath, 'utf8')).toBe(JSON.stringify(records, null, 2));
+  });
+
+  test('Should match JSON.stringify output for non-object values', () => {
+    writeJsonFileSync(filePath, 'text');
+
+    expect(fs.readFileSync(filePath, 'utf8')).toBe(JSON.stringify('text', null, 2));
+  });
+
+  test('Should keep the previous file when serialization fails', () => {
+    writeJsonFileSync(filePath, { id: 'eval_1' });
+
+    expect(() => writeJsonFileSync(filePath, { id: 'eval_2', total: BigInt(1) })).toThrow();
+
+    expect(JSON.parse(fs.readFileSync(filePath, 'utf8'))).toEqual({ id: 'eval_1' });
+    expect(fs.existsSync(`${filePath}.tmp`)).toBe(false);
+  });
+
+  test('Should gzip the output when the path ends in .gz', () => {
+    const gzipPath = `${filePath}.gz`;
+    const report = { id: 'eval_2', detailedResults: Array.from({ length: 2000 }, (_, i) => ({ filePath: `doc_${i}.pdf`, pageIndex: i })) };
+
+    try {
+      writeJsonFileSync(gzipPath, report);
+
+      expect(zlib.gunzipSync(fs.readFileSync(gzipPath)).toString('utf8')).toBe(JSON.stringify(report, null, 2));
+      expect(readJsonFileSync(gzipPath)).toEqual(report);
+    } finally {
+      fs.unlinkSync(gzipPath);
+    }
+  });
+});
+
+describe('writeJsonLinesFileSync', () => {
+  const filePath = path.join(os.tmpdir(), `jsonLinesWriter_${process.pid}.jsonl`);
+
+  afterEach(() => {
+    if (fs.existsSync(filePath)) {
+      fs.unlinkSync(filePath);
+    }
+  });
+
+  test('Should write one compact JSON document per line', () => {
+    const records = [{ provider: 'anthropic', cost: 0.01 }, { provider: 'mistral', text: 'a\nb' }];
+
+    writeJsonLinesFileSync(filePath, records);
+
+    const lines = fs.readFileSync(filePath, 'utf8').split('\n');
+    expect(lines).toHaveLength(3);
+    expect(lines[2]).toBe('');
+    expect(lines.slice(0, 2).map(line => JSON.parse(line))).toEqual(records);
+    expect(readJsonLinesFileSync(filePath)).toEqual(records);
+  });
+});
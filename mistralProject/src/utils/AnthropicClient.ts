@@ -4,6 +4,75 @@
 import axios, { AxiosInstance } from 'axios';
 import { config } from '../config';
 import { logger } from './logger';
+import { getRetryAfterMs, withRetry } from './errors';
+import { httpAgent, httpsAgent } from './httpClient';
+import { RateLimiter } from './concurrency';
+import { elapsedMs, monotonicNow } from './timing';
+
+const DEFAULT_MAX_TOKENS = 1000;
+
+// Shared by every client in the process so the combined request rate stays under ANTHROPIC_MAX_RPS,
+// however many requests the callers' concurrency settings allow in flight. Up to one
+// second's worth of requests may go out back to back after an idle spell.
+const anthropicRateLimiter = new RateLimiter(
+  config.anthropic.maxRequestsPerSecond,
+  Math.ceil(config.anthropic.maxRequestsPerSecond)
+);
+
+// Matches one "PAGE <n>: SOF_PAGE|NOT_SOF_PAGE <confidence>" line of a batch classification response
+const BATCH_RESULT_PATTERN = /^\s*PAGE\s+(\d+)\s*[:\-]\s*(SOF_PAGE|NOT_SOF_PAGE)[\s,.:]+([0-9.]+)/gim;
+
+// Matches a single-page "SOF_PAGE|NOT_SOF_PAGE [confidence]" response
+const SINGLE_RESULT_PATTERN = /^(SOF_PAGE|NOT_SOF_PAGE)(?:[\s,.:]+([0-9.]+))?/;
+
+// A bare SOF_PAGE label anywhere in a response, but not the tail of NOT_SOF_PAGE
+const SOF_LABEL_PATTERN = /\bSOF_PAGE\b/;
+
+/**
+ * Split a batch classification response into one result per page. Pages the response
+ * has no usable line for (missing, out of range, or with a confidence that is not a
+ * number between 0 and 1) are null so the caller can fall back to single-page calls.
+ */
+export function parseBatchClassification(
+  response: string,
+  pageCount: number
+): Array<{ classification: string; confidence: number } | null> {
+  const results: Array<{ classification: string; confidence: number } | null> =
+    new Array(pageCount).fill(null);
+  for (const match of response.matchAll(BATCH_RESULT_PATTERN)) {
+    const index = parseInt(match[1], 10) - 1;
+    const confidence = parseFloat(match[3]);
+    if (index < 0 || index >= pageCount || results[index] !== null) {
+      continue;
+    }
+    if (!Number.isFinite(confidence) || confidence < 0 || confidence > 1) {
+      continue;
+    }
+    results[index] = {
+      classification: match[2].toUpperCase(),
+      confidence
+    };
+  }
+  
+  return results;
+}
+
+/**
+ * Request fields shared by every Messages API call from this client
+ */
+interface RequestTemplate {
+  readonly model: string;
+  readonly max_tokens: number;
+}
+
+/**
+ * System prompt sent as a cacheable content block
+ */
+type SystemBlocks = ReadonlyArray<{
+  readonly type: 'text';
+  readonly text: string;
+  readonly cache_control: { readonly type: 'ephemeral' };
+}>;
 
 export class AnthropicClient {
   private apiKey: string;
@@ -11,6 +80,10 @@ export class AnthropicClient {
   private model: string;
   private client: AxiosInstance;
   private maxRetries: number;
+  // Frozen request templates keyed by max_tokens; the default one is built up front
+  private requestTemplates: Map<number, RequestTemplate> = new Map();
+  // System prompt blocks keyed by prompt text, so a prompt reused across calls is built once
+  private systemBlocks: Map<string, SystemBlocks> = new Map();
   
   constructor() {
     this.apiKey = config.anthropic.apiKey;
@@ -25,52 +98,59 @@ export class AnthropicClient {
     this.client = axios.create({
       baseURL: this.baseUrl,
       timeout: config.anthropic.timeout,
+      httpAgent,
+      httpsAgent,
       headers: {
         'Content-Type': 'application/json',
         'x-api-key': this.apiKey,
         'anthropic-version': '2023-06-01'
       }
     });
+    
+    this.getRequestTemplate(DEFAULT_MAX_TOKENS);
   }
   
   /**
-   * Sends a message to Claude and returns the response
+   * Returns the frozen template for a max_tokens value, building it only the first time
    */
-  async sendMessage(prompt: string, maxTokens: number = 1000): Promise<string> {
-    let retryCount = 0;
-    let lastError: Error | null = null;
-    
-    while (retryCount <= this.maxRetries) {
-      try {
-        const startTime = Date.now();
-        
-        const response = await this.client.post('/v1/messages', {
-          model: this.model,
-          max_tokens: maxTokens,
-          messages: [
-            { role: 'user', content: prompt }
-          ]
-        });
-        
-        const duration = Date.now() - startTime;
-        logger.debug(`Claude API call completed in ${duration}ms`);
-        
-        // Extract the response text from Claude
-        return response.data.content[0].text;
-      } catch (error) {
-        lastError = error instanceof Error ? error : new Error(String(error));
-        retryCount++;
-        
-        if (retryCount <= this.maxRetries) {
-          const delay = Math.pow(2, retryCount) * 500; // Exponential backoff
-          logger.warn(`Claude API call failed, retrying in ${delay}ms (${retryCount}/${this.maxRetries})`);
-          await new Promise(resolve => setTimeout(resolve, delay));
-        }
-      }
+  private getRequestTemplate(maxTokens: number): RequestTemplate {
+    let template = this.requestTemplates.get(maxTokens);
+    if (!template) {
+      template = Object.freeze({ model: this.model, max_tokens: maxTokens });
+      this.requestTemplates.set(maxTokens, template);
+    }
+    return template;
+  }
+  
+  /**
+   * Returns the system prompt as a block marked for prompt caching. Calls that share the
+   * prompt read its tokens from Anthropic's cache instead of paying for them again; prompts
+   * shorter than the model's minimum cacheable length are simply processed uncached.
+   */
+  private getSystemBlocks(systemPrompt: string): SystemBlocks {
+    let blocks = this.systemBlocks.get(systemPrompt);
+    if (!blocks) {
+      blocks = Object.freeze([
+        Object.freeze({ type: 'text' as const, text: systemPrompt, cache_control: Object.freeze({ type: 'ephemeral' as const }) })
+      ]);
+      this.systemBlocks.set(systemPrompt, blocks);
     }
+    return blocks;
+  }
+  
+  /**
+   * Sends a message to Claude and returns the response
+   */
+  async sendMessage(prompt: string, maxTokens: number = DEFAULT_MAX_TOKENS): Promise<string> {
+    const response = await this.postMessage({
+      ...this.getRequestTemplate(maxTokens),
+      messages: [
+        { role: 'user', content: prompt }
+      ]
+    });
     
-    logger.error('All Claude API retries failed', lastError);
-    throw new Error(`Failed to get response from Claude after ${this.maxRetries} retries: ${lastError?.message}`);
+    // Extract the response text from Claude
+    return response.content[0].text;
   }
   
   /**
@@ -79,43 +159,83 @@ export class AnthropicClient {
   async sendMessageWithSystem(
     systemPrompt: string,
     userPrompt: string,
-    maxTokens: number = 1000
+    maxTokens: number = DEFAULT_MAX_TOKENS
   ): Promise<string> {
-    let retryCount = 0;
-    let lastError: Error | null = null;
-    
-    while (retryCount <= this.maxRetries) {
-      try {
-        const startTime = Date.now();
-        
-        const response = await this.client.post('/v1/messages', {
-          model: this.model,
-          max_tokens: maxTokens,
-          system: systemPrompt,
-          messages: [
-            { role: 'user', content: userPrompt }
-          ]
-        });
-        
-        const duration = Date.now() - startTime;
-        logger.debug(`Claude API call with system prompt completed in ${duration}ms`);
-        
-        // Extract the response text from Claude
-        return response.data.content[0].text;
-      } catch (error) {
-        lastError = error instanceof Error ? error : new Error(String(error));
-        retryCount++;
-        
-        if (retryCount <= this.maxRetries) {
-          const delay = Math.pow(2, retryCount) * 500; // Exponential backoff
-          logger.warn(`Claude API call failed, retrying in ${delay}ms (${retryCount}/${this.maxRetries})`);
-          await new Promise(resolve => setTimeout(resolve, delay));
+    const response = await this.postMessage({
+      ...this.getRequestTemplate(maxTokens),
+      system: this.getSystemBlocks(systemPrompt),
+      messages: [
+        { role: 'user', content: userPrompt }
+      ]
+    });
+    
+    // Extract the response text from Claude
+    return response.content[0].text;
+  }
+  
+  /**
+   * Posts a Messages API request, retrying rate limits, 5xx and network errors
+   * with jittered exponential backoff until the retry deadline
+   */
+  private async postMessage(body: Record<string, unknown>): Promise<any> {
+    try {
+      return await withRetry(async () => {
+        await anthropicRateLimiter.acquire();
+        const startTime = monotonicNow();
+        try {
+          const response = await this.client.post('/v1/messages', body);
+          logger.debug(`Claude API call completed in ${elapsedMs(startTime)}ms`);
+          return response.data;
+        } catch (error: any) {
+          // Pause every caller, not just this one, for as long as the API asked
+          if (error?.response?.status === 429) {
+            anthropicRateLimiter.penalize(getRetryAfterMs(error) ?? 1000);
+          }
+          throw error;
         }
-      }
+      }, this.maxRetries, 500, 30000, config.anthropic.retryDeadlineMs);
+    } catch (error) {
+      const lastError = error instanceof Error ? error : new Error(String(error));
+      logger.error('All Claude API retries failed', lastError);
+      throw new Error(`Failed to get response from Claude after ${this.maxRetries} retries: ${lastError.message}`);
     }
+  }
+  
+  /**
+   * Classifies several pages in one request. Each page is sent in its own delimited
+   * section and the response is split back into one result per page; entries the
+   * model did not answer for are null so the caller can fall back to single-page calls.
+   */
+  async classifyContentBatch(
+    contents: string[]
+  ): Promise<Array<{ classification: string; confidence: number } | null>> {
+    const sections = contents
+      .map((content, index) => `=== PAGE ${index + 1} ===\n${content}`)
+      .join('\n\n');
+    
+    const prompt = `
+    <s>
+    You are an expert in maritime documentation classification. Below are ${contents.length} pages, each starting with a "=== PAGE n ===" marker. For each page, determine if it contains a Statement of Facts (SOF) table.
+    
+    SOF tables typically include:
+    - A chronological listing of events during a vessel's port call
+    - Date and time information for each event
+    - Event descriptions like "Arrived at port", "Berthed", "Started loading", etc.
+    - May have column headers like "Event", "Date", "Time", etc.
+    - May include signatures or stamps at the bottom
+    - May have a title like "Statement of Facts", "SOF", "Vessel Log", "Port Log", etc.
+    
+    Respond with exactly one line per page and nothing else, in this format:
+    PAGE n: SOF_PAGE or NOT_SOF_PAGE followed by your confidence score (0-1)
+    </s>
     
-    logger.error('All Claude API retries failed', lastError);
-    throw new Error(`Failed to get response from Claude after ${this.maxRetries} retries: ${lastError?.message}`);
+    Here are the pages to classify:
+    ${sections}
+    `;
+    
+    const response = await this.sendMessage(prompt, Math.max(DEFAULT_MAX_TOKENS, contents.length * 20));
+    
+    return parseBatchClassification(response, contents.length);
   }
   
   /**
@@ -154,26 +274,20 @@ export class AnthropicClient {
     const response = await this.sendMessage(prompt);
     const normalizedResponse = response.trim().toUpperCase();
     
+    // Expected format first; otherwise look for a bare SOF_PAGE label anywhere in the text
+    const match = SINGLE_RESULT_PATTERN.exec(normalizedResponse);
+    const classification = match
+      ? match[1]
+      : (SOF_LABEL_PATTERN.test(normalizedResponse) ? 'SOF_PAGE' : 'NOT_SOF_PAGE');
+    
     if (confidenceRequired) {
-      // Extract classification and confidence
-      const match = normalizedResponse.match(/^(SOF_PAGE|NOT_SOF_PAGE)[\s,.:]+([0-9.]+)/i);
-      if (match) {
-        return {
-          classification: match[1],
-          confidence: parseFloat(match[2])
-        };
-      }
-      
-      // Fallback if confidence isn't properly formatted
-      return {
-        classification: normalizedResponse.includes('SOF_PAGE') ? 'SOF_PAGE' : 'NOT_SOF_PAGE',
-        confidence: 0.5 // Default confidence
-      };
-    } else {
-      // Simple classification
       return {
-        classification: normalizedResponse.includes('SOF_PAGE') ? 'SOF_PAGE' : 'NOT_SOF_PAGE'
+        classification,
+        // Default confidence if the score isn't properly formatted
+        confidence: match && match[2] ? parseFloat(match[2]) : 0.5
       };
     }
+    
+    return { classification };
   }
 } 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import { logger } from './logger';
 import { config } from '../config';
+import { elapsedMs, monotonicNow } from './timing';
 
 /**
  * Result of a batch process, including success/failure status and timing information
@@ -66,7 +67,7 @@ export class BatchProcessor<T, R> {
     // Function to process an item at the given index
     const processItemAtIndex = async (index: number): Promise<void> => {
       const item = items[index];
-      const startTime = Date.now();
+      const startTime = monotonicNow();
       let retries = 0;
       
       try {
@@ -101,7 +102,7 @@ export class BatchProcessor<T, R> {
         }
         
         // Record the result
-        const durationMs = Date.now() - startTime;
+        const durationMs = elapsedMs(startTime);
         results[index] = {
           success: success,
           result: result,
@@ -131,7 +132,7 @@ export class BatchProcessor<T, R> {
         results[index] = {
           success: false,
           error,
-          durationMs: Date.now() - startTime,
+          durationMs: elapsedMs(startTime),
           retries,
         };
         
@@ -0,0 +1,373 @@
+/**
+ * Concurrency primitives shared by the OCR and classification workflows
+ */
+
+/**
+ * Counting semaphore with FIFO hand-off, so callers that queue first run first
+ */
+export class Semaphore {
+  private available: number;
+  private waiters: Array<() => void> = [];
+
+  /**
+   * Create a new Semaphore
+   * @param permits Maximum number of holders at any one time
+   */
+  constructor(permits: number) {
+    this.available = Math.max(1, permits);
+  }
+
+  /**
+   * Wait for a permit
+   */
+  async acquire(): Promise<void> {
+    if (this.available > 0) {
+      this.available--;
+      return;
+    }
+    await new Promise<void>(resolve => this.waiters.push(resolve));
+  }
+
+  /**
+   * Return a permit, handing it straight to the next waiter if there is one
+   */
+  release(): void {
+    const next = this.waiters.shift();
+    if (next) {
+      next();
+    } else {
+      this.available++;
+    }
+  }
+
+  /**
+   * Run a function while holding a permit
+   * @param fn Function to run
+   * @returns Promise with the function result
+   */
+  async run<T>(fn: () => Promise<T>): Promise<T> {
+    await this.acquire();
+    try {
+      return await fn();
+    } finally {
+      this.release();
+    }
+  }
+}
+
+/**
+ * Client-side token bucket that adapts its rate to the 429s it observes.
+ * Requests wait for a token before they are sent. When the share of throttled
+ * calls in the observation window passes the threshold, the rate is halved;
+ * every full window without a 429 grows it by one, up to the configured maximum.
+ */
+export class AdaptiveRateLimiter {
+  private maxPerWindow: number;
+  private windowMs: number;
+  private throttleThreshold: number;
+  private observationMs: number;
+  private limit: number;
+  private tokens: number;
+  private windowStart: number;
+  private throttledInWindow = false;
+  private outcomes: { at: number; throttled: boolean }[] = [];
+
+  /**
+   * Create a new AdaptiveRateLimiter
+   * @param maxPerWindow Maximum number of requests per window
+   * @param windowMs Length of the refill window in milliseconds
+   * @param throttleThreshold Share of 429s that triggers a rate reduction
+   * @param observationMs How far back to look when computing the 429 share
+   */
+  constructor(
+    maxPerWindow: number,
+    windowMs = 60000,
+    throttleThreshold = 0.1,
+    observationMs = 30000
+  ) {
+    this.maxPerWindow = Math.max(1, maxPerWindow);
+    this.windowMs = windowMs;
+    this.throttleThreshold = throttleThreshold;
+    this.observationMs = observationMs;
+    this.limit = this.maxPerWindow;
+    this.tokens = this.limit;
+    this.windowStart = Date.now();
+  }
+
+  /**
+   * Wait until a request may be sent
+   */
+  async acquire(): Promise<void> {
+    for (;;) {
+      const now = Date.now();
+      this.refill(now);
+      if (this.tokens > 0) {
+        this.tokens--;
+        return;
+      }
+      await new Promise(resolve => setTimeout(resolve, this.windowStart + this.windowMs - now));
+    }
+  }
+
+  /**
+   * Record the outcome of a request sent after acquire()
+   * @param throttled Whether the API answered with a 429
+   */
+  recordResult(throttled: boolean): void {
+    const now = Date.now();
+    this.outcomes.push({ at: now, throttled });
+    while (this.outcomes.length > 0 && this.outcomes[0].at < now - this.observationMs) {
+      this.outcomes.shift();
+    }
+    if (!throttled) {
+      return;
+    }
+
+    this.throttledInWindow = true;
+    const throttledCount = this.outcomes.filter(outcome => outcome.throttled).length;
+    if (throttledCount / this.outcomes.length > this.throttleThreshold) {
+      this.limit = Math.max(1, Math.floor(this.limit / 2));
+      this.tokens = Math.min(this.tokens, this.limit);
+      this.outcomes = [];
+    }
+  }
+
+  /**
+   * Current number of requests allowed per window
+   */
+  get currentLimit(): number {
+    return this.limit;
+  }
+
+  private refill(now: number): void {
+    if (now - this.windowStart < this.windowMs) {
+      return;
+    }
+    if (!this.throttledInWindow) {
+      this.limit = Math.min(this.maxPerWindow, this.limit + 1);
+    }
+    this.throttledInWindow = false;
+    this.windowStart = now;
+    this.tokens = this.limit;
+  }
+}
+
+/**
+ * Token bucket that hands out at most `ratePerSecond` permits per second, with bursts
+ * of up to `burst` permits. Unlike a Semaphore it limits how often requests start,
+ * not how many are running. penalize() holds every permit back when the API asks
+ * callers to slow down.
+ */
+export class RateLimiter {
+  private intervalMs: number;
+  private burst: number;
+  private tokens: number;
+  private lastRefill: number;
+  private pausedUntil = 0;
+  private queue: Promise<void> = Promise.resolve();
+
+  /**
+   * Create a new RateLimiter
+   * @param ratePerSecond Sustained permits per second
+   * @param burst Permits that may be taken back to back after an idle period
+   */
+  constructor(ratePerSecond: number, burst = 1) {
+    this.intervalMs = 1000 / Math.max(ratePerSecond, Number.MIN_VALUE);
+    this.burst = Math.max(1, burst);
+    this.tokens = this.burst;
+    this.lastRefill = Date.now();
+  }
+
+  /**
+   * Wait for a permit. Callers are served in the order they asked.
+   */
+  acquire(): Promise<void> {
+    const turn = this.queue.then(() => this.take());
+    this.queue = turn;
+    return turn;
+  }
+
+  /**
+   * Hand out no permits for the given time, e.g. after a 429 or a Retry-After header.
+   * The bucket restarts empty afterwards, so waiting callers do not burst.
+   * @param delayMs How long to pause in milliseconds
+   */
+  penalize(delayMs: number): void {
+    this.pausedUntil = Math.max(this.pausedUntil, Date.now() + Math.max(0, delayMs));
+  }
+
+  private async take(): Promise<void> {
+    const pauseMs = this.pausedUntil - Date.now();
+    if (pauseMs > 0) {
+      await new Promise(resolve => setTimeout(resolve, pauseMs));
+      this.tokens = 1;
+      this.lastRefill = Date.now();
+    }
+
+    const now = Date.now();
+    this.tokens = Math.min(this.burst, this.tokens + (now - this.lastRefill) / this.intervalMs);
+    this.lastRefill = now;
+
+    if (this.tokens < 1) {
+      const waitMs = (1 - this.tokens) * this.intervalMs;
+      await new Promise(resolve => setTimeout(resolve, waitMs));
+      this.tokens = 1;
+      this.lastRefill = Date.now();
+    }
+    this.tokens -= 1;
+  }
+}
+
+/**
+ * FIFO queue with a fixed capacity. put() waits while the queue is full, so a
+ * fast producer cannot run ahead of its consumers and hold an unbounded number
+ * of items in memory. get() resolves to undefined once the queue is closed and drained.
+ */
+export class BoundedQueue<T> {
+  private items: T[] = [];
+  private capacity: number;
+  private closed = false;
+  private getters: Array<(item: T | undefined) => void> = [];
+  private putters: Array<() => void> = [];
+
+  /**
+   * Create a new BoundedQueue
+   * @param capacity Maximum number of items held at any one time
+   */
+  constructor(capacity: number) {
+    this.capacity = Math.max(1, capacity);
+  }
+
+  /**
+   * Add an item, waiting for space if the queue is full
+   * @param item Item to add
+   */
+  async put(item: T): Promise<void> {
+    if (this.closed) {
+      throw new Error('Cannot put into a closed queue');
+    }
+    const getter = this.getters.shift();
+    if (getter) {
+      getter(item);
+      return;
+    }
+    while (this.items.length >= this.capacity) {
+      await new Promise<void>(resolve => this.putters.push(resolve));
+    }
+    this.items.push(item);
+  }
+
+  /**
+   * Take the next item, waiting if the queue is empty
+   * @returns The next item, or undefined once the queue is closed and empty
+   */
+  async get(): Promise<T | undefined> {
+    if (this.items.length > 0) {
+      const item = this.items.shift() as T;
+      this.putters.shift()?.();
+      return item;
+    }
+    if (this.closed) {
+      return undefined;
+    }
+    return new Promise<T | undefined>(resolve => this.getters.push(resolve));
+  }
+
+  /**
+   * Signal that no more items will be added; waiting consumers receive undefined
+   */
+  close(): void {
+    this.closed = true;
+    for (const getter of this.getters.splice(0)) {
+      getter(undefined);
+    }
+  }
+
+  /**
+   * Number of items currently held
+   */
+  get size(): number {
+    return this.items.length;
+  }
+}
+
+/**
+ * One step of a pipeline run by runPipeline()
+ */
+export interface PipelineStage {
+  /** Number of items this stage works on at once */
+  concurrency: number;
+  /** Turn the previous stage's output (or the input item) into this stage's output */
+  run: (input: any) => Promise<any>;
+}
+
+/**
+ * Run every item through a series of stages, each with its own concurrency.
+ * Stages are connected by bounded queues, so an item moves on as soon as its
+ * stage finishes (item 1 can be in stage 2 while item 2 is still in stage 1)
+ * without an early stage running far ahead of a slower later one.
+ *
+ * If a stage fails for an item, that item is dropped, the remaining items are
+ * still processed, and the first error is thrown once everything has settled.
+ *
+ * @param items Inputs to the first stage
+ * @param stages Stages to run, in order
+ * @param queueCapacity Items allowed to wait between two stages
+ * @returns Output of the last stage for each item, in input order
+ */
+export async function runPipeline<R>(
+  items: unknown[],
+  stages: PipelineStage[],
+  queueCapacity = 1
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let failed = false;
+  let failure: unknown;
+  let next = 0;
+
+  // Queue i carries the output of stage i into stage i + 1
+  const queues = stages.slice(1).map(() => new BoundedQueue<{ index: number; value: unknown }>(queueCapacity));
+
+  const takeInput = async (stageIndex: number) => {
+    if (stageIndex === 0) {
+      if (next >= items.length) {
+        return undefined;
+      }
+      const index = next++;
+      return { index, value: items[index] };
+    }
+    return queues[stageIndex - 1].get();
+  };
+
+  const runStage = async (stage: PipelineStage, stageIndex: number) => {
+    const worker = async () => {
+      let input: { index: number; value: unknown } | undefined;
+      while ((input = await takeInput(stageIndex)) !== undefined) {
+        let value: unknown;
+        try {
+          value = await stage.run(input.value);
+        } catch (error) {
+          if (!failed) {
+            failed = true;
+            failure = error;
+          }
+          continue;
+        }
+        if (stageIndex < queues.length) {
+          await queues[stageIndex].put({ index: input.index, value });
+        } else {
+          results[input.index] = value as R;
+        }
+      }
+    };
+
+    await Promise.all(Array.from({ length: Math.max(1, stage.concurrency) }, worker));
+    queues[stageIndex]?.close();
+  };
+
+  await Promise.all(stages.map(runStage));
+  if (failed) {
+    throw failure;
+  }
+  return results;
+}
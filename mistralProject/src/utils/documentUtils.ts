@@ -21,6 +21,54 @@ export enum DocumentType {
   UNKNOWN = 'unknown',
 }
 
+/**
+ * File signatures for the document formats we send to the OCR and vision APIs
+ */
+const MIME_SIGNATURES: { mimeType: string; bytes: number[]; offset?: number }[] = [
+  { mimeType: 'application/pdf', bytes: [0x25, 0x50, 0x44, 0x46] }, // %PDF
+  { mimeType: 'image/png', bytes: [0x89, 0x50, 0x4e, 0x47] },
+  { mimeType: 'image/jpeg', bytes: [0xff, 0xd8, 0xff] },
+  { mimeType: 'image/tiff', bytes: [0x49, 0x49, 0x2a, 0x00] },
+  { mimeType: 'image/tiff', bytes: [0x4d, 0x4d, 0x00, 0x2a] },
+  { mimeType: 'image/webp', bytes: [0x57, 0x45, 0x42, 0x50], offset: 8 }, // RIFF....WEBP
+];
+
+/**
+ * File extension to use for each detected mime type
+ */
+export const MIME_EXTENSIONS: Record<string, string> = {
+  'application/pdf': '.pdf',
+  'image/png': '.png',
+  'image/jpeg': '.jpg',
+  'image/tiff': '.tiff',
+  'image/webp': '.webp',
+};
+
+/**
+ * Detect a document's mime type from its leading bytes
+ * 
+ * @param data - File contents (only the first 12 bytes are inspected)
+ * @returns string | null - Detected mime type, or null if the signature is unknown
+ */
+export function detectMimeType(data: Buffer): string | null {
+  for (const { mimeType, bytes, offset = 0 } of MIME_SIGNATURES) {
+    if (data.length < offset + bytes.length) {
+      continue;
+    }
+    let matches = true;
+    for (let i = 0; i < bytes.length; i++) {
+      if (data[offset + i] !== bytes[i]) {
+        matches = false;
+        break;
+      }
+    }
+    if (matches) {
+      return mimeType;
+    }
+  }
+  return null;
+}
+
 /**
  * Check if a file is a valid document (PDF or supported image)
  * 
@@ -2,22 +2,43 @@
  * Enhanced logger with emoji support for better visualization
  */
 import { logger } from './logger';
+import { elapsedMs, monotonicNow } from './timing';
 
 /**
  * Emoji number representation for better progress visualization
  */
 const numberEmojis = ['0️⃣', '1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣'];
 
+/**
+ * Emoji strings for 0-999, built once at load. Each entry extends the entry for
+ * the number without its last digit, so no digit strings are split or parsed.
+ */
+const NUMBER_EMOJI_TABLE_SIZE = 1000;
+const numberEmojiTable: string[] = new Array(NUMBER_EMOJI_TABLE_SIZE);
+for (let i = 0; i < NUMBER_EMOJI_TABLE_SIZE; i++) {
+  numberEmojiTable[i] = i < 10 ? numberEmojis[i] : numberEmojiTable[Math.floor(i / 10)] + numberEmojis[i % 10];
+}
+
+/**
+ * Emoji strings built by getNumberEmoji for numbers past the table
+ */
+const numberEmojiCache = new Map<number, string>();
+
 /**
  * Convert a number to emoji representation for better visual tracking
  */
 export const getNumberEmoji = (num: number): string => {
-  if (num < 10) {
-    return numberEmojis[num];
-  } else {
-    // For numbers >= 10, convert each digit to emoji
-    return num.toString().split('').map(digit => numberEmojis[parseInt(digit)]).join('');
+  if (num < NUMBER_EMOJI_TABLE_SIZE) {
+    return numberEmojiTable[num];
   }
+
+  let cached = numberEmojiCache.get(num);
+  if (cached === undefined) {
+    // Larger numbers extend the emoji string of their leading digits
+    cached = getNumberEmoji(Math.floor(num / 10)) + numberEmojis[num % 10];
+    numberEmojiCache.set(num, cached);
+  }
+  return cached;
 };
 
 export const emojiLogger = {
@@ -143,12 +164,31 @@ export const emojiLogger = {
   },
   
   timerStart: (label: string) => {
-    const startTime = Date.now();
+    const startTime = monotonicNow();
     return () => {
-      const elapsed = Date.now() - startTime;
+      const elapsed = elapsedMs(startTime);
       logger.info(`⏱️ TIMER: ${label} completed in ${elapsed}ms`);
       return elapsed;
     };
+  },
+  
+  /**
+   * Returns a callback to invoke once per finished item. The progress bar is
+   * logged only when another 1/steps of the total is done (and at the end),
+   * rather than once per item.
+   */
+  progressTracker: (total: number, label: string = '', steps: number = 20) => {
+    let completed = 0;
+    let lastStep = 0;
+    return () => {
+      completed++;
+      const step = Math.floor((completed / total) * steps);
+      if (step > lastStep || completed === total) {
+        lastStep = step;
+        emojiLogger.progressBar(completed, total, label);
+      }
+      return completed;
+    };
   }
 };
 
@@ -127,6 +127,12 @@ export class ValidationError extends AppError {
  * @returns True if the error is retryable, false otherwise
  */
 export function isRetryableError(error: any): boolean {
+  // Raw axios errors carry the status on the response rather than on an ApiError
+  if (!(error instanceof ApiError) && typeof error?.response?.status === 'number') {
+    const status = error.response.status;
+    return status === 429 || (status >= 500 && status < 600);
+  }
+
   // Network errors are generally retryable
   if (error?.code === 'ECONNRESET' ||
       error?.code === 'ETIMEDOUT' ||
@@ -161,7 +167,9 @@ export function isRetryableError(error: any): boolean {
 }
 
 /**
- * Implements exponential backoff for retrying operations
+ * Implements exponential backoff with full jitter for retrying operations.
+ * Each delay is drawn uniformly from [base, base * 2^(attempt + 1)], so workers
+ * that hit a rate limit together do not all wake up at the same instant.
  * @param attempt Current attempt number (0-indexed)
  * @param baseDelayMs Base delay in milliseconds
  * @param maxDelayMs Maximum delay in milliseconds
@@ -172,33 +180,50 @@ export function getRetryDelayMs(
   baseDelayMs = 500,
   maxDelayMs = 30000
 ): number {
-  // Exponential backoff with jitter
-  const exponentialDelay = Math.min(
-    maxDelayMs, 
-    baseDelayMs * Math.pow(2, attempt)
-  );
-  
-  // Add jitter (±25%)
-  const jitter = exponentialDelay * 0.25 * (Math.random() - 0.5);
+  const ceiling = Math.min(maxDelayMs, baseDelayMs * Math.pow(2, attempt + 1));
   
-  return Math.max(baseDelayMs, Math.floor(exponentialDelay + jitter));
+  return Math.floor(baseDelayMs + Math.random() * Math.max(0, ceiling - baseDelayMs));
+}
+
+/**
+ * Reads the Retry-After header from a failed API response
+ * @param error The error to inspect
+ * @returns Delay requested by the server in milliseconds, or null if none was given
+ */
+export function getRetryAfterMs(error: any): number | null {
+  const headers = error?.response?.headers;
+  const retryAfter = headers?.['retry-after'] ?? headers?.['Retry-After'];
+  if (retryAfter === undefined || retryAfter === null || retryAfter === '') {
+    return null;
+  }
+
+  // Either a number of seconds or an HTTP date
+  const seconds = Number(retryAfter);
+  if (!Number.isNaN(seconds)) {
+    return Math.max(0, seconds * 1000);
+  }
+  const date = Date.parse(String(retryAfter));
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now());
 }
 
 /**
- * Utility to retry a function with exponential backoff
+ * Utility to retry a function with exponential backoff, honouring Retry-After
  * @param fn Function to retry
  * @param maxRetries Maximum number of retries
  * @param baseDelayMs Base delay in milliseconds
- * @param maxDelayMs Maximum delay in milliseconds
+ * @param maxDelayMs Maximum delay in milliseconds, also capping Retry-After
+ * @param deadlineMs Total time budget; no retry is scheduled that would end past it
  * @returns Promise with the function result
  */
 export async function withRetry<T>(
   fn: () => Promise<T>,
   maxRetries = 3,
   baseDelayMs = 500,
-  maxDelayMs = 30000
+  maxDelayMs = 30000,
+  deadlineMs = Infinity
 ): Promise<T> {
   let lastError: Error | null = null;
+  const deadline = Date.now() + deadlineMs;
   
   for (let attempt = 0; attempt <= maxRetries; attempt++) {
     try {
@@ -207,7 +232,15 @@ export async function withRetry<T>(
       lastError = error instanceof Error ? error : new Error(String(error));
       
       if (attempt < maxRetries && isRetryableError(error)) {
-        const delay = getRetryDelayMs(attempt, baseDelayMs, maxDelayMs);
+        // A server-requested wait is honoured up to maxDelayMs, so an oversized or
+        // malformed Retry-After cannot stall the call indefinitely
+        const delay = Math.max(
+          getRetryDelayMs(attempt, baseDelayMs, maxDelayMs),
+          Math.min(getRetryAfterMs(error) ?? 0, maxDelayMs)
+        );
+        if (Date.now() + delay > deadline) {
+          break;
+        }
         await new Promise(resolve => setTimeout(resolve, delay));
       } else {
         break;
@@ -230,5 +263,6 @@ export default {
   ValidationError,
   isRetryableError,
   getRetryDelayMs,
+  getRetryAfterMs,
   withRetry,
 }; 
\ No newline at end of file
@@ -3,6 +3,7 @@ import path from 'path';
 import crypto from 'crypto';
 import { FileError } from './errors';
 import { logger } from './logger';
+import { writeJsonFileSync } from './jsonWriter';
 import csv from 'csv-parser';
 import { createObjectCsvWriter } from 'csv-writer';
 import { config } from '../config/config';
@@ -271,7 +272,7 @@ export function appendToErrorLog(errorData: any): void {
  */
 export function saveResult(documentName: string, result: any): void {
   const outputPath = path.join(config.paths.outputFolder, `${documentName.replace(/\.[^/.]+$/, '')}_result.json`);
-  fs.writeFileSync(outputPath, JSON.stringify(result, null, 2));
+  writeJsonFileSync(outputPath, result);
 }
 
 /**
@@ -0,0 +1,35 @@
+/**
+ * Shared HTTP transport for the Mistral and Anthropic API clients
+ */
+import http from 'http';
+import https from 'https';
+import axios from 'axios';
+import { config } from '../config';
+
+// Pooled sockets left idle this long are closed. Requests in flight are not cut off:
+// the agent only destroys free sockets when the timeout fires.
+const IDLE_SOCKET_TIMEOUT_MS = 60000;
+
+// Keep-alive agents shared by every client in the process, so consecutive calls
+// (upload, signed URL, OCR, classification) reuse pooled TLS connections
+// instead of paying a new handshake per request
+export const httpAgent = new http.Agent({
+  keepAlive: true,
+  timeout: IDLE_SOCKET_TIMEOUT_MS,
+  maxSockets: config.http.maxSockets,
+  maxFreeSockets: config.http.maxFreeSockets
+});
+
+export const httpsAgent = new https.Agent({
+  keepAlive: true,
+  timeout: IDLE_SOCKET_TIMEOUT_MS,
+  maxSockets: config.http.maxSockets,
+  maxFreeSockets: config.http.maxFreeSockets
+});
+
+/**
+ * Axios instance bound to the shared keep-alive agents
+ */
+export const httpClient = axios.create({ httpAgent, httpsAgent });
+
+export default httpClient;
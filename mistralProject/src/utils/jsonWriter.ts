@@ -0,0 +1,200 @@
+/**
+ * JSON file reading and writing for large evaluation reports
+ */
+import fs from 'fs';
+import zlib from 'zlib';
+
+// Uncompressed bytes gathered before a gzip member is written. Far larger than the
+// 32KB deflate window, so splitting the output costs next to nothing in ratio.
+const GZIP_MEMBER_SIZE = 1024 * 1024;
+
+interface OutputFile {
+  write(text: string): void;
+  /** Finish the file and move it into place */
+  commit(): void;
+  /** Drop the partial file, leaving any previous file at the path untouched */
+  discard(): void;
+}
+
+/**
+ * Open a file for writing. Output goes to a temporary file next to the target and
+ * only replaces it on commit(), so an interrupted run never leaves a truncated file
+ * behind. Paths ending in .gz are gzip-compressed as they are written, as a series
+ * of gzip members that gunzip reads back as one stream.
+ */
+function openOutputFile(filePath: string): OutputFile {
+  const tempPath = `${filePath}.tmp`;
+  const fd = fs.openSync(tempPath, 'w');
+  const compress = filePath.endsWith('.gz');
+
+  let pending: string[] = [];
+  let pendingLength = 0;
+  const flush = () => {
+    if (pendingLength > 0) {
+      fs.writeSync(fd, zlib.gzipSync(pending.join('')));
+      pending = [];
+      pendingLength = 0;
+    }
+  };
+
+  return {
+    write: text => {
+      if (!compress) {
+        fs.writeSync(fd, text);
+        return;
+      }
+      pending.push(text);
+      pendingLength += text.length;
+      if (pendingLength >= GZIP_MEMBER_SIZE) {
+        flush();
+      }
+    },
+    commit: () => {
+      try {
+        flush();
+      } finally {
+        fs.closeSync(fd);
+      }
+      fs.renameSync(tempPath, filePath);
+    },
+    discard: () => {
+      try {
+        fs.closeSync(fd);
+      } finally {
+        fs.rmSync(tempPath, { force: true });
+      }
+    },
+  };
+}
+
+/**
+ * Write to a file through openOutputFile, replacing it only if `writeContent` completes
+ */
+function writeOutputFile(filePath: string, writeContent: (out: OutputFile) => void): void {
+  const out = openOutputFile(filePath);
+  try {
+    writeContent(out);
+  } catch (error) {
+    out.discard();
+    throw error;
+  }
+  out.commit();
+}
+
+/**
+ * Serialize a value the way JSON.stringify(value, null, indent) would, nested at `depth` levels
+ */
+function stringifyNested(value: any, indent: number, depth: number): string | undefined {
+  const json = JSON.stringify(value, null, indent);
+  if (json === undefined || depth === 0) {
+    return json;
+  }
+  return json.replace(/\n/g, `\n${' '.repeat(indent * depth)}`);
+}
+
+/**
+ * Write a value to a file as indented JSON. The output matches
+ * JSON.stringify(value, null, indent), but arrays at the top level or directly
+ * under it (such as detailed results or API call records) are written one element
+ * at a time, so the whole report never has to exist as a single string in memory.
+ * @param filePath Path to write to; a .gz path is written gzip-compressed
+ * @param value Value to serialize
+ * @param indent Spaces per indentation level
+ */
+export function writeJsonFileSync(filePath: string, value: any, indent = 2): void {
+  writeOutputFile(filePath, out => writeJsonValue(out, value, indent));
+}
+
+function writeJsonValue(out: OutputFile, value: any, indent: number): void {
+  const pad = ' '.repeat(indent);
+
+  if (Array.isArray(value) && value.length > 0) {
+    out.write('[');
+    value.forEach((item, index) => {
+      const itemJson = stringifyNested(item, indent, 1) ?? 'null';
+      out.write(`${index > 0 ? ',' : ''}\n${pad}${itemJson}`);
+    });
+    out.write('\n]');
+    return;
+  }
+
+  const isPlainObject = value !== null && typeof value === 'object'
+    && !Array.isArray(value) && typeof value.toJSON !== 'function';
+
+  if (!isPlainObject) {
+    out.write(JSON.stringify(value, null, indent));
+    return;
+  }
+
+  let wroteEntry = false;
+  out.write('{');
+
+  for (const [key, entry] of Object.entries(value)) {
+    const entryPrefix = `${wroteEntry ? ',' : ''}\n${pad}${JSON.stringify(key)}: `;
+
+    if (Array.isArray(entry) && entry.length > 0) {
+      out.write(`${entryPrefix}[`);
+      entry.forEach((item, index) => {
+        // Array slots that cannot be serialized become null, as in JSON.stringify
+        const itemJson = stringifyNested(item, indent, 2) ?? 'null';
+        out.write(`${index > 0 ? ',' : ''}\n${pad}${pad}${itemJson}`);
+      });
+      out.write(`\n${pad}]`);
+      wroteEntry = true;
+      continue;
+    }
+
+    const entryJson = stringifyNested(entry, indent, 1);
+    if (entryJson === undefined) {
+      // Undefined and function values are dropped, as in JSON.stringify
+      continue;
+    }
+    out.write(`${entryPrefix}${entryJson}`);
+    wroteEntry = true;
+  }
+
+  out.write(wroteEntry ? '\n}' : '}');
+}
+
+/**
+ * Write items to a JSON Lines file, one compact JSON document per line. Meant for
+ * bulky machine-read records, which gain nothing from indentation.
+ * @param filePath Path to write to; a .gz path is written gzip-compressed
+ * @param items Items to serialize
+ */
+export function writeJsonLinesFileSync(filePath: string, items: any[]): void {
+  writeOutputFile(filePath, out => {
+    for (const item of items) {
+      // Items that cannot be serialized become null, as array slots do in JSON.stringify
+      out.write(`${JSON.stringify(item) ?? 'null'}\n`);
+    }
+  });
+}
+
+/**
+ * Read a file written by writeJsonFileSync or writeJsonLinesFileSync as text,
+ * decompressing it first if the path ends in .gz
+ */
+function readOutputFile(filePath: string): string {
+  const data = fs.readFileSync(filePath);
+  return (filePath.endsWith('.gz') ? zlib.gunzipSync(data) : data).toString('utf8');
+}
+
+/**
+ * Read a JSON file written by writeJsonFileSync
+ * @param filePath Path to read from; a .gz path is decompressed first
+ */
+export function readJsonFileSync<T = any>(filePath: string): T {
+  return JSON.parse(readOutputFile(filePath)) as T;
+}
+
+/**
+ * Read a JSON Lines file written by writeJsonLinesFileSync, one item per non-empty line
+ * @param filePath Path to read from; a .gz path is decompressed first
+ */
+export function readJsonLinesFileSync<T = any>(filePath: string): T[] {
+  return readOutputFile(filePath)
+    .split('\n')
+    .filter(line => line.length > 0)
+    .map(line => JSON.parse(line) as T);
+}
@@ -2,13 +2,16 @@
  * pdfToImageConverter.ts
  * 
  * Utility for converting PDF documents to high-resolution images for better OCR results.
- * Uses node-poppler (pdftocairo) to render PDF pages as high-quality PNG images.
+ * Uses node-poppler (pdftocairo) to render PDF pages. Pages are rendered as JPEG by default,
+ * which is several times smaller than PNG for scanned pages; set IMAGE_FORMAT=png to keep PNG.
  */
 
 import path from 'path';
 import fs from 'fs-extra';
 import { Poppler } from 'node-poppler';
 import { logger } from './logger';
+import { config } from '../config';
+import { Semaphore } from './concurrency';
 import crypto from 'crypto';
 
 // Custom type for node-poppler since @types/node-poppler doesn't exist
@@ -19,6 +22,8 @@ interface PdfToCairoOptions {
   jpegFile?: boolean;
   tiffFile?: boolean;
   resolutionXYAxis?: number;
+  scalePageTo?: number;
+  jpegOptions?: string;
   cropWidth?: number;
   cropHeight?: number;
   cropXAxis?: number;
@@ -48,7 +53,55 @@ interface PdfInfoResponse {
 }
 
 /**
- * Convert a PDF file to high-resolution PNG images
+ * Rendered page images keyed by PDF path, mtime and conversion options
+ */
+const RENDER_CACHE_SIZE = 64;
+const renderCache = new Map<string, string[]>();
+
+/**
+ * Process-wide limit on concurrent pdftocairo runs, shared by every conversion
+ */
+const renderSlots = new Semaphore(config.rendering.workers);
+
+/**
+ * Run pdftocairo for a conversion. When no page range was requested, the document's
+ * pages are split into one contiguous range per render worker, so a multi-page PDF
+ * is rasterized on several cores at once instead of by a single process.
+ */
+async function renderAcrossWorkers(
+  poppler: Poppler,
+  pdfPath: string,
+  outputPrefix: string,
+  conversionOptions: PdfToCairoOptions
+): Promise<void> {
+  const hasPageRange = conversionOptions.firstPageToConvert !== undefined ||
+    conversionOptions.lastPageToConvert !== undefined;
+  const pageCount = hasPageRange || config.rendering.workers <= 1 ? 1 : await getPdfPageCount(pdfPath);
+  
+  if (pageCount <= 1) {
+    await renderSlots.run(() => poppler.pdfToCairo(pdfPath, outputPrefix, conversionOptions));
+    return;
+  }
+  
+  // pdftocairo pads page numbers to the document's page count, so the
+  // ranges' output files share one naming scheme in the same directory
+  const rangeSize = Math.ceil(pageCount / Math.min(config.rendering.workers, pageCount));
+  const ranges: Array<[number, number]> = [];
+  for (let firstPage = 1; firstPage <= pageCount; firstPage += rangeSize) {
+    ranges.push([firstPage, Math.min(firstPage + rangeSize - 1, pageCount)]);
+  }
+  
+  await Promise.all(ranges.map(([firstPage, lastPage]) => renderSlots.run(() =>
+    poppler.pdfToCairo(pdfPath, outputPrefix, {
+      ...conversionOptions,
+      firstPageToConvert: firstPage,
+      lastPageToConvert: lastPage
+    })
+  )));
+}
+
+/**
+ * Convert a PDF file to high-resolution images
  * 
  * @param pdfPath - Path to the PDF file
  * @param outputDir - Directory to save the generated images
@@ -75,8 +128,33 @@ export async function convertPdfToImages(
     }
     
     // Verify that the file is a valid PDF
+    let cacheKey = '';
     try {
       const fileStats = await fs.stat(pdfPath);
+      // The output directory is part of the key: callers own (and may clean up)
+      // the directory they pass, so images are never handed out from another one
+      cacheKey = [
+        path.resolve(pdfPath),
+        path.resolve(outputDir),
+        fileStats.mtimeMs,
+        options.dpi || config.rendering.dpi,
+        config.rendering.maxDimension,
+        options.firstPage || '',
+        options.lastPage || '',
+        options.format || config.rendering.imageFormat
+      ].join('|');
+      
+      // Reuse an earlier render of the same unchanged file if its images are still on disk
+      const cachedImages = renderCache.get(cacheKey);
+      if (cachedImages) {
+        const stillOnDisk = await Promise.all(cachedImages.map(imagePath => fs.pathExists(imagePath)));
+        if (stillOnDisk.every(Boolean)) {
+          logger.info(`Reusing ${cachedImages.length} previously rendered images for ${path.basename(pdfPath)}`);
+          return [...cachedImages];
+        }
+        renderCache.delete(cacheKey);
+      }
+      
       if (fileStats.size === 0) {
         logger.error(`PDF file is empty: ${pdfPath}`);
         return [];
@@ -85,8 +163,11 @@ export async function convertPdfToImages(
       // Check file header to ensure it's a PDF (starts with %PDF)
       const buffer = Buffer.alloc(5);
       const fd = await fs.open(pdfPath, 'r');
-      await fs.read(fd, buffer, 0, 5, 0);
-      await fs.close(fd);
+      try {
+        await fs.read(fd, buffer, 0, 5, 0);
+      } finally {
+        await fs.close(fd);
+      }
       
       if (buffer.toString() !== '%PDF-') {
         logger.error(`File is not a valid PDF (wrong header): ${pdfPath}`);
@@ -106,8 +187,11 @@ export async function convertPdfToImages(
     // Initialize Poppler
     const poppler = new Poppler();
     
-    // Set output format (default to PNG)
-    const format = options.format || 'png';
+    // Set output format (JPEG unless configured otherwise)
+    const format = options.format || config.rendering.imageFormat;
+    // Baseline, non-optimized JPEG: skips the extra Huffman-optimization pass since the
+    // image is only uploaded for OCR and then discarded
+    const jpegOptions = `quality=${config.rendering.jpegQuality},optimize=n,progressive=n`;
     const outputPrefix = path.join(imagesDir, 'page');
     
     // Configure conversion options with proper type handling
@@ -118,9 +202,18 @@ export async function convertPdfToImages(
       tiffFile: format === 'tiff',
       
       // Resolution (default to 300 DPI for good OCR results)
-      resolutionXYAxis: options.dpi || 300
+      resolutionXYAxis: options.dpi || config.rendering.dpi
     };
     
+    if (format === 'jpeg') {
+      conversionOptions.jpegOptions = jpegOptions;
+    }
+    
+    // Cap the long side of each page; pdftocairo then ignores the DPI setting
+    if (config.rendering.maxDimension > 0) {
+      conversionOptions.scalePageTo = config.rendering.maxDimension;
+    }
+    
     // Only add page range options if they are actually defined numbers
     if (typeof options.firstPage === 'number' && options.firstPage > 0) {
       conversionOptions.firstPageToConvert = options.firstPage;
@@ -134,7 +227,7 @@ export async function convertPdfToImages(
     logger.info(`Converting PDF using pdftocairo at ${conversionOptions.resolutionXYAxis} DPI`);
     
     try {
-      await poppler.pdfToCairo(pdfPath, outputPrefix, conversionOptions);
+      await renderAcrossWorkers(poppler, pdfPath, outputPrefix, conversionOptions);
     } catch (conversionError) {
       logger.error(`Error during PDF to image conversion: ${(conversionError as Error).message}`);
       
@@ -146,11 +239,19 @@ export async function convertPdfToImages(
           pngFile: format === 'png',
           jpegFile: format === 'jpeg',
           tiffFile: format === 'tiff',
-          resolutionXYAxis: options.dpi || 300,
+          resolutionXYAxis: options.dpi || config.rendering.dpi,
           singleFile: true
         };
         
-        await poppler.pdfToCairo(pdfPath, outputPrefix, fallbackOptions);
+        if (format === 'jpeg') {
+          fallbackOptions.jpegOptions = jpegOptions;
+        }
+        
+        if (config.rendering.maxDimension > 0) {
+          fallbackOptions.scalePageTo = config.rendering.maxDimension;
+        }
+        
+        await renderSlots.run(() => poppler.pdfToCairo(pdfPath, outputPrefix, fallbackOptions));
       } catch (fallbackError) {
         logger.error(`Fallback conversion also failed: ${(fallbackError as Error).message}`);
         throw fallbackError;
@@ -177,9 +278,14 @@ export async function convertPdfToImages(
     // If no images were generated but no error was thrown, that's suspicious
     if (imageFiles.length === 0) {
       logger.warn('No image files were generated despite successful conversion.');
+    } else {
+      renderCache.set(cacheKey, imageFiles);
+      if (renderCache.size > RENDER_CACHE_SIZE) {
+        renderCache.delete(renderCache.keys().next().value as string);
+      }
     }
     
-    return imageFiles;
+    return [...imageFiles];
   } catch (error) {
     logger.error(`Error converting PDF to images: ${(error as Error).message}`);
     throw new Error(`Failed to convert PDF to images: ${(error as Error).message}`);
@@ -238,7 +344,8 @@ export async function getPdfPageCount(pdfPath: string): Promise<number> {
 }
 
 /**
- * Process PDF in batches to avoid memory issues with large documents
+ * Process PDF in batches to avoid memory issues with large documents.
+ * Batches are rendered concurrently, limited by the shared RENDER_WORKERS pool.
  * 
  * @param pdfPath - Path to the PDF file 
  * @param outputDir - Directory to save the generated images
@@ -255,11 +362,12 @@ export async function processPdfInBatches(
   } = {}
 ): Promise<string[]> {
   try {
-    // Default to 20 pages per batch
-    const batchSize = options.batchSize || 20;
-    
     // Get total page count
     const pageCount = await getPdfPageCount(pdfPath);
+    
+    // Default to at most 20 pages per batch, split so every render worker gets a share
+    const batchSize = options.batchSize ||
+      Math.min(20, Math.max(1, Math.ceil(pageCount / config.rendering.workers)));
     logger.info(`PDF has ${pageCount} pages. Processing in batches of ${batchSize}.`);
     
     // For empty or problematic PDFs, return empty array
@@ -270,29 +378,30 @@ export async function processPdfInBatches(
     
     // Calculate number of batches
     const batchCount = Math.ceil(pageCount / batchSize);
-    let allImageFiles: string[] = [];
     
-    // Process each batch
-    for (let batch = 0; batch < batchCount; batch++) {
-      const firstPage = batch * batchSize + 1;
-      const lastPage = Math.min((batch + 1) * batchSize, pageCount);
-      
-      logger.info(`Processing batch ${batch + 1}/${batchCount} (pages ${firstPage}-${lastPage})`);
-      
-      try {
-        const batchImages = await convertPdfToImages(pdfPath, outputDir, {
-          dpi: options.dpi || 300,
-          firstPage,
-          lastPage,
-          format: options.format || 'png'
-        });
+    // Process all batches concurrently; results keep batch order
+    const batchResults = await Promise.all(
+      Array.from({ length: batchCount }, async (_, batch) => {
+        const firstPage = batch * batchSize + 1;
+        const lastPage = Math.min((batch + 1) * batchSize, pageCount);
         
-        allImageFiles = allImageFiles.concat(batchImages);
-      } catch (batchError) {
-        logger.error(`Error processing batch ${batch + 1}: ${(batchError as Error).message}`);
-        // Continue with next batch instead of failing completely
-      }
-    }
+        logger.info(`Processing batch ${batch + 1}/${batchCount} (pages ${firstPage}-${lastPage})`);
+        
+        try {
+          return await convertPdfToImages(pdfPath, outputDir, {
+            dpi: options.dpi || config.rendering.dpi,
+            firstPage,
+            lastPage,
+            format: options.format || config.rendering.imageFormat
+          });
+        } catch (batchError) {
+          logger.error(`Error processing batch ${batch + 1}: ${(batchError as Error).message}`);
+          // Continue with other batches instead of failing completely
+          return [];
+        }
+      })
+    );
+    const allImageFiles = batchResults.flat();
     
     // Log results
     if (allImageFiles.length === 0) {
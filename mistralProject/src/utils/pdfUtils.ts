@@ -20,6 +20,45 @@ interface ExtractedPage {
   imagePath: string;
 }
 
+/**
+ * Parsed PDFs keyed by path; an entry is reused only while the file's mtime is unchanged
+ */
+const PDF_CACHE_SIZE = 32;
+const pdfDocumentCache = new Map<string, { mtimeMs: number; document: Promise<PDFDocument> }>();
+
+/**
+ * Load a PDF, reusing the parsed document when the same unchanged file was loaded recently
+ */
+async function loadPDFDocument(pdfPath: string): Promise<PDFDocument> {
+  const { mtimeMs } = await fs.promises.stat(pdfPath);
+  const cached = pdfDocumentCache.get(pdfPath);
+  
+  if (cached && cached.mtimeMs === mtimeMs) {
+    // Move to the back so the least recently used entry is evicted first
+    pdfDocumentCache.delete(pdfPath);
+    pdfDocumentCache.set(pdfPath, cached);
+    return cached.document;
+  }
+  
+  const entry = {
+    mtimeMs,
+    document: fs.promises.readFile(pdfPath).then(pdfData => PDFDocument.load(pdfData))
+  };
+  pdfDocumentCache.set(pdfPath, entry);
+  if (pdfDocumentCache.size > PDF_CACHE_SIZE) {
+    pdfDocumentCache.delete(pdfDocumentCache.keys().next().value as string);
+  }
+  
+  // Don't keep failed loads around
+  entry.document.catch(() => {
+    if (pdfDocumentCache.get(pdfPath) === entry) {
+      pdfDocumentCache.delete(pdfPath);
+    }
+  });
+  
+  return entry.document;
+}
+
 /**
  * Extract PDF pages as images using pdftoppm (requires poppler-utils)
  */
@@ -33,8 +72,7 @@ export async function extractPDFPagesAsImages(pdfPath: string, outputDir: string
     }
     
     // Get page count
-    const pdfData = await fs.promises.readFile(pdfPath);
-    const pdfDoc = await PDFDocument.load(pdfData);
+    const pdfDoc = await loadPDFDocument(pdfPath);
     const pageCount = pdfDoc.getPageCount();
     
     console.log(`PDF has ${pageCount} pages`);
@@ -75,8 +113,7 @@ function createMockImages(pageCount: number, outputDir: string): ExtractedPage[]
  */
 export async function getPDFPageCount(pdfPath: string): Promise<number> {
   try {
-    const pdfData = await fs.promises.readFile(pdfPath);
-    const pdfDoc = await PDFDocument.load(pdfData);
+    const pdfDoc = await loadPDFDocument(pdfPath);
     return pdfDoc.getPageCount();
   } catch (error) {
     console.error(`Error getting PDF page count: ${error instanceof Error ? error.message : String(error)}`);
@@ -89,8 +126,7 @@ export async function getPDFPageCount(pdfPath: string): Promise<number> {
  */
 export async function extractPDFPage(pdfPath: string, pageNum: number, outputPath: string): Promise<boolean> {
   try {
-    const pdfData = await fs.promises.readFile(pdfPath);
-    const srcDoc = await PDFDocument.load(pdfData);
+    const srcDoc = await loadPDFDocument(pdfPath);
     
     if (pageNum < 1 || pageNum > srcDoc.getPageCount()) {
       throw new Error(`Page number ${pageNum} is out of bounds (1-${srcDoc.getPageCount()})`);
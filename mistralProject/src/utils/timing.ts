@@ -0,0 +1,20 @@
+/**
+ * Monotonic timing helpers for measuring durations
+ */
+import { performance } from 'perf_hooks';
+
+/**
+ * Current reading of the monotonic clock in milliseconds. Unlike Date.now() it never
+ * jumps when the system clock is adjusted, so it is only meaningful for durations.
+ */
+export function monotonicNow(): number {
+  return performance.now();
+}
+
+/**
+ * Whole milliseconds elapsed since a monotonicNow() reading
+ * @param startTime Earlier monotonicNow() value
+ */
+export function elapsedMs(startTime: number): number {
+  return Math.round(performance.now() - startTime);
+}
@@ -2,9 +2,11 @@
 // Purpose: Send a document URL or local file to Mistral OCR and extract all text
 
 require('dotenv').config();
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
+const { httpClient } = require('./httpClient');
+const { detectMimeType } = require('./mimeTypes');
 
 // Get Mistral API key from environment variables
 const MISTRAL_API_KEY = process.env.MISTRAL_API_KEY;
@@ -24,17 +26,65 @@ function isURL(str) {
   }
 }
 
-// Helper function to convert file to base64
-function fileToBase64(filePath) {
-  try {
-    // Read file as binary data
-    const fileData = fs.readFileSync(filePath);
-    // Convert binary data to base64 string
-    return fileData.toString('base64');
-  } catch (error) {
-    console.error(`Error reading file: ${error.message}`);
-    throw error;
+// Input bytes encoded per step; a multiple of 3 so chunks never need base64 padding
+const BASE64_CHUNK_BYTES = 3 * 64 * 1024;
+
+// Helper function to build the OCR request body for a local file as a single buffer.
+// The base64 text is encoded in chunks straight into the body, so the full base64 string,
+// the data URL string and the stringified JSON never have to exist side by side.
+function buildDataUrlRequestBody(model, fileData, mimeType) {
+  const head = Buffer.from(
+    `{"model":${JSON.stringify(model)},"document":{"type":"document_url","document_url":"data:${mimeType};base64,`,
+    'utf8'
+  );
+  const tail = Buffer.from('"}}', 'utf8');
+  const encodedLength = Math.ceil(fileData.length / 3) * 4;
+  
+  const body = Buffer.allocUnsafe(head.length + encodedLength + tail.length);
+  let offset = head.copy(body, 0);
+  for (let start = 0; start < fileData.length; start += BASE64_CHUNK_BYTES) {
+    const chunk = fileData.subarray(start, start + BASE64_CHUNK_BYTES);
+    offset += body.write(chunk.toString('base64'), offset, 'latin1');
+  }
+  tail.copy(body, offset);
+  
+  return body;
+}
+
+// Signed URLs for PDFs uploaded during this run, keyed by content hash, so a
+// document processed twice is only uploaded once
+const signedUrlCache = new Map();
+
+// Helper function to upload a local PDF to the Mistral Files API and get a signed URL
+// for it. The raw bytes go up as multipart form data, so the request carries no base64
+// overhead and no encoded copy of the file has to be built.
+function getSignedDocumentUrl(fileData, filename) {
+  const key = crypto.createHash('sha256').update(fileData).digest('hex');
+  let pending = signedUrlCache.get(key);
+  
+  if (!pending) {
+    pending = (async () => {
+      const formData = new FormData();
+      formData.append('purpose', 'ocr');
+      formData.append('file', new Blob([fileData], { type: 'application/pdf' }), filename);
+      
+      const uploadResponse = await httpClient.post('https://api.mistral.ai/v1/files', formData, {
+        headers: { 'Authorization': `Bearer ${MISTRAL_API_KEY}` }
+      });
+      
+      const urlResponse = await httpClient.get(`https://api.mistral.ai/v1/files/${uploadResponse.data.id}/url`, {
+        params: { expiry: 24 },
+        headers: { 'Authorization': `Bearer ${MISTRAL_API_KEY}` }
+      });
+      return urlResponse.data.url;
+    })();
+    
+    signedUrlCache.set(key, pending);
+    // Don't keep failed uploads around
+    pending.catch(() => signedUrlCache.delete(key));
   }
+  
+  return pending;
 }
 
 async function processDocument(documentPath) {
@@ -52,47 +102,60 @@ async function processDocument(documentPath) {
     fs.mkdirSync(outputFolder, { recursive: true });
     
     // Determine if input is URL or local file
-    let documentPayload;
+    let requestBody;
     if (isURL(documentPath)) {
       // Input is URL
-      documentPayload = {
-        type: 'document_url',
-        document_url: documentPath
+      requestBody = {
+        model: 'mistral-ocr-latest',
+        document: {
+          type: 'document_url',
+          document_url: documentPath
+        }
       };
     } else {
-      // Input is local file path
-      if (!fs.existsSync(documentPath)) {
-        throw new Error(`File not found: ${documentPath}`);
+      // Input is local file path; read it once without blocking the event loop
+      let fileData;
+      try {
+        fileData = await fs.promises.readFile(documentPath);
+      } catch (readError) {
+        if (readError.code === 'ENOENT') {
+          throw new Error(`File not found: ${documentPath}`);
+        }
+        throw readError;
       }
       
-      // Determine file type from extension
-      const fileExt = path.extname(documentPath).toLowerCase();
-      const fileType = fileExt === '.pdf' ? 'application/pdf' : 
-                      (fileExt === '.png' ? 'image/png' : 
-                      (fileExt === '.jpg' || fileExt === '.jpeg' ? 'image/jpeg' : 'application/octet-stream'));
+      // Determine the file type from the content, using the extension only if that fails
+      const fileType = detectMimeType(fileData, documentPath);
       
       console.log(`Processing local file of type: ${fileType}`);
       
-      // Convert file to base64
-      const base64Data = fileToBase64(documentPath);
-      
-      // Create data URL
-      const dataUrl = `data:${fileType};base64,${base64Data}`;
+      // Upload PDFs and pass their signed URL rather than inlining them as base64
+      if (fileType === 'application/pdf') {
+        try {
+          const documentUrl = await getSignedDocumentUrl(fileData, path.basename(documentPath));
+          requestBody = {
+            model: 'mistral-ocr-latest',
+            document: {
+              type: 'document_url',
+              document_url: documentUrl
+            }
+          };
+        } catch (uploadError) {
+          console.warn(`File upload failed (${uploadError.message}), sending the document inline instead`);
+        }
+      }
       
-      documentPayload = {
-        type: 'document_url',
-        document_url: dataUrl
-      };
+      // Otherwise encode the file straight into the request body as a data URL
+      if (!requestBody) {
+        requestBody = buildDataUrlRequestBody('mistral-ocr-latest', fileData, fileType);
+      }
     }
     
     // Call Mistral OCR API
     console.log('Sending document to Mistral OCR API...');
-    const response = await axios.post(
+    const response = await httpClient.post(
       'https://api.mistral.ai/v1/ocr',
-      {
-        model: 'mistral-ocr-latest',
-        document: documentPayload
-      },
+      requestBody,
       {
         headers: {
           'Content-Type': 'application/json',
@@ -107,15 +170,12 @@ async function processDocument(documentPath) {
       JSON.stringify(response.data, null, 2)
     );
     
-    // Extract and combine text from all pages
-    let allText = '';
-    if (response.data.pages && response.data.pages.length > 0) {
-      for (const page of response.data.pages) {
-        // Use markdown field if available, otherwise use content
-        const pageContent = page.markdown || page.content || '';
-        allText += pageContent + '\n\n';
-      }
-    }
+    // Extract and combine text from all pages in a single join
+    // (use markdown field if available, otherwise use content)
+    const pages = response.data.pages || [];
+    const allText = pages.length > 0
+      ? pages.map(page => page.markdown || page.content || '').join('\n\n') + '\n\n'
+      : '';
     
     // Save combined text
     fs.writeFileSync(
@@ -130,7 +190,7 @@ async function processDocument(documentPath) {
       success: true,
       outputFolder,
       extractedText: allText,
-      pageCount: response.data.pages?.length || 0
+      pageCount: pages.length
     };
   } catch (error) {
     console.error('Error processing document:', error.message);
@@ -212,7 +212,7 @@ export class SofExtractorService {
       try {
         // Extract JSON if wrapped in markdown code blocks
         if (response.includes('```json') && response.includes('```')) {
-          response = response.split('```json')[1]?.split('```')[0] || response;
+          response = extractJsonCodeBlock(response) || response;
         }
         
         // Handle double-escaped JSON - new step to add
@@ -430,7 +430,7 @@ export class SofExtractorService {
       // Try to find JSON in the response
       if (sofAiExtractStr.startsWith('```json')) {
         log.info('Found markdown JSON block');
-        sofAiExtractStr = sofAiExtractStr.split('```json')[1]?.split('```')[0];
+        sofAiExtractStr = extractJsonCodeBlock(sofAiExtractStr);
       } else if (sofAiExtractStr.includes('{') && sofAiExtractStr.includes('}')) {
         // Try to extract JSON if it's embedded in text
         const jsonStart = sofAiExtractStr.indexOf('{');
@@ -880,9 +880,7 @@ export class SofExtractorService {
 
     try {
       if (sofFindEventsStr.startsWith('```json')) {
-        sofFindEventsStr = sofFindEventsStr
-          .split('```json')[1]
-          ?.split('```')[0];
+        sofFindEventsStr = extractJsonCodeBlock(sofFindEventsStr);
       }
 
       return JSON.parse(sofFindEventsStr);
@@ -1185,6 +1183,23 @@ function intelligentDateCorrection(data: SofAiExtractRow[]): SofAiExtractRow[] {
 }
 
 // Helper functions
+const JSON_FENCE = '```json';
+
+/**
+ * Returns the text between the first ```json fence and the next ``` (or the end of
+ * the text), or undefined if there is no fence. Slices by index instead of splitting
+ * the whole response into arrays twice.
+ */
+function extractJsonCodeBlock(text: string): string | undefined {
+  const fenceStart = text.indexOf(JSON_FENCE);
+  if (fenceStart < 0) {
+    return undefined;
+  }
+  const blockStart = fenceStart + JSON_FENCE.length;
+  const blockEnd = text.indexOf('```', blockStart);
+  return blockEnd < 0 ? text.slice(blockStart) : text.slice(blockStart, blockEnd);
+}
+
 function extractDay(text: string): string | null {
   const num = parseInt(text);
   if (!isNaN(num) && num >= 1 && num <= 31) {
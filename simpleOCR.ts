@@ -12,6 +12,7 @@ import fs from 'fs';
 import axios from 'axios';
 import dotenv from 'dotenv';
 import crypto from 'crypto';
+import { detectMimeType } from './mimeTypes';
 
 // Load environment variables
 dotenv.config();
@@ -50,16 +51,13 @@ async function processDocument(filePath: string): Promise<string> {
     const fileData = fs.readFileSync(filePath);
     const base64Data = fileData.toString('base64');
     
-    // Determine file type from extension
-    const fileExt = path.extname(filePath).toLowerCase();
-    const fileType = fileExt === '.pdf' ? 'application/pdf' : 
-                   (fileExt === '.png' ? 'image/png' : 
-                   (fileExt === '.jpg' || fileExt === '.jpeg' ? 'image/jpeg' : 'application/octet-stream'));
+    // Determine file type from its contents, falling back to the extension
+    const fileType = detectMimeType(fileData, filePath);
     
     console.log('🔍 Sending document to Mistral OCR API...');
     
     // Call Mistral OCR API
-    const startTime = Date.now();
+    const startTime = process.hrtime.bigint();
     const response = await axios.post(
       'https://api.mistral.ai/v1/ocr',
       {
@@ -77,8 +75,8 @@ async function processDocument(filePath: string): Promise<string> {
       }
     );
     
-    const endTime = Date.now();
-    const processingTimeSeconds = ((endTime - startTime) / 1000).toFixed(2);
+    const elapsedNs = process.hrtime.bigint() - startTime;
+    const processingTimeSeconds = (Number(elapsedNs) / 1e9).toFixed(2);
     
     // Save OCR response
     fs.writeFileSync(
@@ -80,19 +80,16 @@ async processDocument(documentPath: string, outputFolderName: string): Promise<v
     }
     
     // Process each page
-    let fullContent = "";
     for (const page of pages) {
       // Save individual page content
       const pageFileName = `${documentFileName}_page_${page.pageNumber}.md`;
       const pageFilePath = path.join(outputFolder, pageFileName);
       fs.writeFileSync(pageFilePath, page.text);
       console.log(`Saved page ${page.pageNumber} content to ${pageFilePath}`);
-      
-      // Add to full content
-      fullContent += page.text + "\n\n";
     }
     
-    // Save full content
+    // Save full content, joined once rather than grown page by page
+    const fullContent = pages.map(page => page.text).join("\n\n") + "\n\n";
     const fullContentFilePath = path.join(outputFolder, "full_content.md");
     fs.writeFileSync(fullContentFilePath, fullContent);
     console.log(`Saved full content to ${fullContentFilePath}`);